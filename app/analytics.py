@@ -0,0 +1,140 @@
+"""Spending-by-category analytics served from the category_rollups table.
+
+Triggers on transactions (migration 010) keep one row per account, month,
+category and direction up to date, so a summary reads a few buckets per
+account and month no matter how long the ledger is.
+
+Rebuild the rollups from the ledger (e.g. after editing transactions by
+hand with triggers disabled):
+
+    python -m app.analytics backfill [--family smith]
+"""
+
+import argparse
+import os
+from datetime import date
+from app import models
+from app.models import get_db
+from app.tenants import tenancy_enabled, list_tenants, tenant_path
+
+# Longest range /api/analytics/categories will summarize
+MAX_ANALYTICS_MONTHS = 120
+
+
+def backfill_category_rollups(db):
+    """
+    Recompute every rollup bucket from the transactions table.
+
+    Runs in one transaction, so readers see either the old or the new totals.
+
+    Returns:
+        Number of buckets written
+    """
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        db.execute('DELETE FROM category_rollups')
+        cursor = db.execute('''
+            INSERT INTO category_rollups (account_id, month, category, direction, total, count)
+            SELECT account_id, month, category, direction, SUM(amount), COUNT(*)
+            FROM (
+                SELECT to_account_id AS account_id, substr(created_at, 1, 7) AS month,
+                       COALESCE(category, 'General') AS category, 'in' AS direction, amount
+                FROM transactions
+                WHERE to_account_id IS NOT NULL AND status IN ('completed', 'approved')
+                  AND transaction_type != 'transfer'
+                UNION ALL
+                SELECT from_account_id, substr(created_at, 1, 7), COALESCE(category, 'General'), 'out', amount
+                FROM transactions
+                WHERE from_account_id IS NOT NULL AND status IN ('completed', 'approved')
+                  AND transaction_type != 'transfer'
+            )
+            GROUP BY account_id, month, category, direction
+        ''')
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return cursor.rowcount
+
+
+def month_key(value):
+    """Validate a YYYY-MM string; raises ValueError if malformed."""
+    parsed = date.fromisoformat(f'{value}-01')
+    return parsed.strftime('%Y-%m')
+
+
+def months_back(end_month, months):
+    """Return the YYYY-MM that is months - 1 months before end_month."""
+    year, month = map(int, end_month.split('-'))
+    index = year * 12 + (month - 1) - (months - 1)
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def get_category_summary(db, account_ids, start_month, end_month):
+    """
+    Summarize money in and out by category for accounts over a month range.
+
+    Returns:
+        Dict with 'categories' (totals per category, largest spend first,
+        with icon and color) and 'months' (per-month totals per category).
+        Amounts are integer cents.
+    """
+    placeholders = ','.join('?' * len(account_ids))
+    rows = db.execute(f'''
+        SELECT r.month, r.category, r.direction, SUM(r.total) AS total, SUM(r.count) AS count,
+               c.icon, c.color
+        FROM category_rollups r
+        LEFT JOIN categories c ON c.name = r.category
+        WHERE r.account_id IN ({placeholders}) AND r.month BETWEEN ? AND ?
+        GROUP BY r.month, r.category, r.direction
+        ORDER BY r.month, r.category
+    ''', (*account_ids, start_month, end_month)).fetchall()
+
+    categories = {}
+    months = []
+    for row in rows:
+        category = categories.setdefault(row['category'], {
+            'category': row['category'], 'icon': row['icon'], 'color': row['color'],
+            'spent': 0, 'received': 0, 'count': 0,
+        })
+        category['spent' if row['direction'] == 'out' else 'received'] += row['total']
+        category['count'] += row['count']
+        months.append({
+            'month': row['month'], 'category': row['category'],
+            'direction': row['direction'], 'amount': row['total'],
+        })
+
+    return {
+        'categories': sorted(categories.values(), key=lambda c: (-c['spent'], -c['received'], c['category'])),
+        'months': months,
+    }
+
+
+def _backfill(path):
+    db = get_db(path)
+    try:
+        buckets = backfill_category_rollups(db)
+    finally:
+        db.close()
+    print(f"✅ Rebuilt category rollups in {path}: {buckets} buckets")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Family Bank analytics maintenance')
+    parser.add_argument('command', choices=['backfill'])
+    parser.add_argument('--family', help='only this family (default: every family when TENANTS_DIR is set)')
+    args = parser.parse_args(argv)
+
+    # app.models read DATABASE_PATH and TENANTS_DIR before .env was loaded
+    from dotenv import load_dotenv
+    load_dotenv()
+    models.TENANTS_DIR = os.environ.get('TENANTS_DIR') or None
+    if not tenancy_enabled():
+        _backfill(os.environ.get('DATABASE_PATH', models.DATABASE_PATH))
+        return
+    for family in [args.family] if args.family else list_tenants():
+        _backfill(tenant_path(family))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""Optional ASGI server mode for the read-heavy and streaming endpoints.
+
+    pip install -r requirements-asgi.txt
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Under gunicorn every open request holds one of a worker's threads, so a few
+slow statement downloads or live-update streams can use all of them. In this
+mode GET /api/dashboard, /api/accounts/<id>/transactions, /api/export and
+/api/events are async handlers on the event loop. They borrow a thread from
+a small DatabaseExecutor only while SQLite is working, so one process can
+hold thousands of idle connections. Every other route is the unchanged
+Flask app, served through a2wsgi on its own thread pool.
+
+The async handlers sign in from the Flask session cookie, route to the
+family's database like the Flask hooks, answer with the same functions
+(app/reads.py) and record the same per-route metrics.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from itsdangerous import BadSignature
+from werkzeug.http import parse_cookie
+from app import models
+from app.events import change_bus, stream_events_async
+from app.export import EXPORT_FORMATS, parse_export_request, statement_filename, stream_statement
+from app.metrics import metrics, start_query_stats, stop_query_stats
+from app.reads import dashboard, load_principal, parse_account_ids, resolve_account_ids, transactions_page
+from app.tenants import tenancy_enabled, tenant_exists, tenant_path
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # pip install -r requirements-asgi.txt
+    WSGIMiddleware = None
+
+# Threads running SQLite work for the async handlers (per process)
+ASGI_DB_THREADS = int(os.environ.get('ASGI_DB_THREADS', models.POOL_SIZE))
+
+# Threads serving the Flask routes (per process), like gunicorn's 2 x 4
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 8))
+
+# Live-update streams per process; async streams hold no thread
+ASGI_MAX_STREAMS = int(os.environ.get('ASGI_MAX_STREAMS', 1000))
+
+# (path pattern, Flask rule used as the metrics label, handler method)
+ASYNC_ROUTES = (
+    (re.compile(r'/api/dashboard'), '/api/dashboard', '_dashboard'),
+    (re.compile(r'/api/accounts/(?P<account_id>\d+)/transactions'),
+     '/api/accounts/<int:account_id>/transactions', '_transactions'),
+    (re.compile(r'/api/export'), '/api/export', '_export'),
+    (re.compile(r'/api/events'), '/api/events', '_events'),
+)
+
+
+def _with_connection(path, work, *args):
+    pool = models.get_pool(path)
+    db = pool.acquire()
+    try:
+        return work(db, *args)
+    finally:
+        pool.release(db)
+
+
+def _prepare(path):
+    token = models.route_database(path)
+    try:
+        models.prepare_database()
+    finally:
+        models.unroute_database(token)
+
+
+class DatabaseExecutor:
+    """Small thread pool that runs blocking SQLite work for the async handlers."""
+
+    def __init__(self, threads=ASGI_DB_THREADS):
+        self._threads = ThreadPoolExecutor(threads, thread_name_prefix='asgi-db')
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on a database thread, in a copy of the caller's context."""
+        # The copy carries the request's query stats into the thread
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._threads, context.run, fn, *args)
+
+    async def query(self, path, work, *args):
+        """Run work(db, *args) with a pooled connection to the database at path."""
+        return await self.run(_with_connection, path, work, *args)
+
+    def shutdown(self):
+        self._threads.shutdown(wait=False)
+
+
+class AsyncRequest:
+    """The parts of an ASGI HTTP request the async handlers read."""
+
+    def __init__(self, scope):
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', ())}
+        self.args = {}
+        for name, value in parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True):
+            self.args.setdefault(name, []).append(value)
+
+    def arg(self, name, default=None):
+        values = self.args.get(name)
+        return values[0] if values else default
+
+    def int_arg(self, name, default):
+        try:
+            return int(self.arg(name, default))
+        except ValueError:
+            return default
+
+    def arg_list(self, name):
+        """Every value of a repeatable param."""
+        return self.args.get(name, [])
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+class AsgiApp:
+    """ASGI application: async handlers for the routes above, Flask for the rest."""
+
+    def __init__(self, flask_app, db_threads=ASGI_DB_THREADS, wsgi_threads=ASGI_WSGI_THREADS,
+                 max_streams=ASGI_MAX_STREAMS):
+        self.flask_app = flask_app
+        self.db = DatabaseExecutor(db_threads)
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_threads) if WSGIMiddleware else None
+        self._serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+        self._session_max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        # Async streams don't tie up threads, so this process can hold many
+        self.max_streams = max_streams
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, rule, handler in ASYNC_ROUTES:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    await self._handle(rule, getattr(self, handler), match, scope, receive, send)
+                    return
+        if self.wsgi is None:
+            raise RuntimeError('Serving the Flask routes over ASGI needs a2wsgi: pip install -r requirements-asgi.txt')
+        await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.db.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle(self, rule, handler, match, scope, receive, send):
+        started = time.perf_counter()
+        stats, token = start_query_stats()
+        status = 500
+        try:
+            request = AsyncRequest(scope)
+            user, path, tenant = await self._sign_in(request)
+            if user is None:
+                status = await self._send_json(send, 401, {'error': 'Not authenticated'})
+            else:
+                params = {name: int(value) for name, value in match.groupdict().items()}
+                status = await handler(request, receive, send, user, path, tenant, **params)
+        finally:
+            stop_query_stats(token)
+            metrics.observe_request('GET', rule, status, time.perf_counter() - started, stats)
+
+    # ── Session and Routing ─────────────────────────────────────────
+
+    def _session(self, request):
+        """The signed Flask session from the request's cookie, or {}."""
+        cookie = parse_cookie(request.headers.get('cookie', '')).get(self.flask_app.config['SESSION_COOKIE_NAME'])
+        if not cookie or self._serializer is None:
+            return {}
+        try:
+            return dict(self._serializer.loads(cookie, max_age=self._session_max_age))
+        except BadSignature:
+            return {}
+
+    async def _sign_in(self, request):
+        """
+        Returns (principal, database path, family) for the signed-in user,
+        or (None, None, None).
+
+        Unlike the Flask views these handlers never set cookies: a refreshed
+        role is used for this request and saved by the next Flask response.
+        """
+        session = self._session(request)
+        if 'user_id' not in session:
+            return None, None, None
+        tenant = None
+        if tenancy_enabled():
+            tenant = session.get('tenant')
+            if not tenant_exists(tenant):
+                return None, None, None
+            path = tenant_path(tenant)
+            await self.db.run(_prepare, path)
+        else:
+            path = models.DATABASE_PATH
+        user = await self.db.query(path, load_principal, path, session)
+        return user, path, tenant
+
+    # ── Responses ───────────────────────────────────────────────────
+
+    async def _send_json(self, send, status, payload):
+        # Compact, like jsonify() outside debug mode
+        body = f"{self.flask_app.json.dumps(payload, separators=(',', ':'))}\n".encode()
+        await send({'type': 'http.response.start', 'status': status, 'headers': [
+            (b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+        ]})
+        await send({'type': 'http.response.body', 'body': body})
+        return status
+
+    async def _send_stream(self, receive, send, mimetype, chunks, headers=()):
+        """
+        Stream an async iterator of text chunks until it ends or the client goes.
+
+        A gone client is noticed at the next chunk (event streams send a
+        heartbeat at least every HEARTBEAT_SECONDS).
+        """
+        content_type = f'{mimetype}; charset=utf-8' if mimetype.startswith('text/') else mimetype
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', content_type.encode()), *headers]})
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            async for chunk in chunks:
+                if disconnected.done():
+                    break
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+            else:
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            await chunks.aclose()
+        return 200
+
+    async def _in_threads(self, chunks):
+        """Drive a blocking generator one chunk at a time on database threads."""
+        try:
+            while True:
+                chunk = await self.db.run(next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await self.db.run(chunks.close)
+
+    # ── Handlers ────────────────────────────────────────────────────
+
+    async def _dashboard(self, request, receive, send, user, path, tenant):
+        return await self._send_json(send, 200, await self.db.query(path, dashboard, user))
+
+    async def _transactions(self, request, receive, send, user, path, tenant, account_id):
+        page, error = await self.db.query(
+            path, transactions_page, user, account_id, request.int_arg('limit', 50), request.arg('cursor')
+        )
+        if error:
+            return await self._send_json(send, error[1], {'error': error[0]})
+        return await self._send_json(send, 200, page)
+
+    async def _export(self, request, receive, send, user, path, tenant):
+        fmt = request.arg('format', 'csv')
+        bounds, error = parse_export_request(fmt, request.arg('start'), request.arg('end'))
+        if error is None:
+            requested, error = parse_account_ids(request.arg_list('account_id'))
+        if error is None:
+            account_ids, error = await self.db.query(path, resolve_account_ids, user, requested)
+        if error:
+            return await self._send_json(send, error[1], {'error': error[0]})
+
+        start, end = bounds
+        chunks = stream_statement(functools.partial(models.get_db, path), account_ids, start, end, fmt)
+        disposition = f'attachment; filename="{statement_filename(fmt)}"'.encode()
+        return await self._send_stream(receive, send, EXPORT_FORMATS[fmt][0], self._in_threads(chunks),
+                                       [(b'content-disposition', disposition)])
+
+    async def _events(self, request, receive, send, user, path, tenant):
+        subscription = change_bus.subscribe(user['id'], user['role'], request.headers.get('last-event-id'),
+                                            scope=tenant, max_streams=self.max_streams)
+        if subscription is None:
+            return await self._send_json(send, 503, {'error': 'Too many event streams'})
+        return await self._send_stream(receive, send, 'text/event-stream', stream_events_async(change_bus, subscription),
+                                       [(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')])
+
+
+def create_asgi_app(flask_app, **options):
+    """Wrap a create_app() Flask app for an ASGI server (see AsgiApp for options)."""
+    return AsgiApp(flask_app, **options)
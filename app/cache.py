@@ -0,0 +1,104 @@
+"""In-process caches for rarely changing tables, invalidated by version rows."""
+
+import threading
+import time
+
+
+class VersionedCache:
+    """
+    Process-wide cache of one table's contents per database file.
+
+    Every lookup does a single primary-key read of the table's counter in
+    cache_versions and only reloads the data when that counter has moved.
+    Triggers bump the counter on writes, so changes made by other worker
+    processes are picked up on their next lookup.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, db, key):
+        """
+        Return (version, data) for the database identified by key.
+
+        Args:
+            db: Open connection to the database
+            key: Identifies the database (its file path)
+        """
+        row = db.execute('SELECT version FROM cache_versions WHERE name = ?', (self.name,)).fetchone()
+        version = row['version'] if row else None
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == version and version is not None:
+            return entry
+
+        entry = (version, self.loader(db))
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, key=None):
+        """Drop the cached copy for one database, or for all of them."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class VersionCounter:
+    """
+    Process-local view of a cache_versions counter.
+
+    The counter is re-read from the database at most once every ttl seconds,
+    so most lookups cost nothing. invalidate() forces the next lookup to hit
+    the database, which is how writes made by this process take effect
+    immediately; writes from other processes are seen within ttl seconds.
+    """
+
+    def __init__(self, name, ttl):
+        self.name = name
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def current(self, db, key):
+        """Return the counter for the database identified by key."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and now - entry[1] < self.ttl:
+            return entry[0]
+
+        row = db.execute('SELECT version FROM cache_versions WHERE name = ?', (self.name,)).fetchone()
+        version = row['version'] if row else None
+        with self._lock:
+            self._entries[key] = (version, now)
+        return version
+
+    def invalidate(self, key=None):
+        """Forget the counter for one database, or for all of them."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def _load_settings(db):
+    return {row['key']: row['value'] for row in db.execute('SELECT key, value FROM settings')}
+
+
+def _load_categories(db):
+    return [dict(row) for row in db.execute('SELECT * FROM categories ORDER BY name')]
+
+
+settings_cache = VersionedCache('settings', _load_settings)
+categories_cache = VersionedCache('categories', _load_categories)
+
+# Sessions re-validate their role against the users table when this moves
+users_version = VersionCounter('users', ttl=5)
@@ -0,0 +1,201 @@
+"""In-process change bus feeding the /api/events Server-Sent Events stream.
+
+Write handlers publish small change events (a balance moved, a withdrawal is
+waiting for approval, a request was approved or rejected) after they commit.
+Each open event stream subscribes with the signed-in user's id and role and
+only receives events addressed to that user or, for parents, to all parents.
+When families have their own databases, events and streams also carry the
+family (scope), since user ids repeat from one family to the next.
+
+The bus lives in one process, so a stream only sees writes handled by the
+same worker; clients treat it as a hint and still load full data from the
+REST endpoints. Streams are capped per process (each holds a worker thread),
+end after STREAM_SECONDS and are resumed by the browser. Recent events are
+kept so a reconnect with Last-Event-ID replays what it missed. Under the
+ASGI server mode streams are async (stream_events_async) and hold no thread.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque, namedtuple
+
+# Open streams per process; each one occupies a server thread
+EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS', 2))
+
+# A stream is closed after this long and reopened by the browser
+STREAM_SECONDS = 300
+
+# Comment line sent when idle so proxies don't drop the connection
+HEARTBEAT_SECONDS = 25
+
+# Milliseconds the browser waits before reconnecting
+RECONNECT_MS = 3000
+
+# Recent events kept for Last-Event-ID replay
+REPLAY_BUFFER = 256
+
+# Events a subscriber may fall behind by before its stream is closed
+SUBSCRIBER_QUEUE_SIZE = 100
+
+Event = namedtuple('Event', 'id name data user_ids parents scope')
+
+
+class Subscription:
+    """One open event stream."""
+
+    def __init__(self, user_id, role, scope=None):
+        self.user_id = user_id
+        self.role = role
+        self.scope = scope
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+        # Called after each delivery, from the publishing thread
+        self.notify = None
+
+    def wants(self, event):
+        if event.scope != self.scope:
+            return False
+        return self.user_id in event.user_ids or (event.parents and self.role == 'parent')
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Too far behind: end the stream, the reconnect replays from history
+            self.overflowed = True
+        if self.notify is not None:
+            self.notify()
+
+
+class ChangeBus:
+    """Fan change events out to the streams of the users they concern."""
+
+    def __init__(self, max_streams=EVENTS_MAX_STREAMS, history=REPLAY_BUFFER):
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        # Event ids are only meaningful to the process that issued them
+        self._prefix = uuid.uuid4().hex[:8]
+
+    def publish(self, name, data, user_ids=(), parents=False, scope=None):
+        """
+        Send an event to the given users and, if parents is True, every parent,
+        within one family (scope).
+        """
+        with self._lock:
+            event = Event(f'{self._prefix}-{next(self._ids)}', name, data, frozenset(user_ids), parents, scope)
+            self._history.append(event)
+            for subscription in self._subscribers:
+                if subscription.wants(event):
+                    subscription.deliver(event)
+
+    def subscribe(self, user_id, role, last_event_id=None, scope=None, max_streams=None):
+        """
+        Open a subscription, replaying events after last_event_id if known.
+
+        max_streams overrides the bus's own limit for this call; the ASGI
+        server mode passes its higher one, since its streams hold no thread.
+
+        Returns:
+            Subscription, or None if this process already has max_streams open
+        """
+        limit = self.max_streams if max_streams is None else max_streams
+        subscription = Subscription(user_id, role, scope)
+        with self._lock:
+            if len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscription)
+            for event in self._replay_after(last_event_id):
+                if subscription.wants(event):
+                    subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _replay_after(self, last_event_id):
+        prefix, _, number = (last_event_id or '').partition('-')
+        if prefix != self._prefix or not number.isdigit():
+            return []
+        return [event for event in self._history if int(event.id.split('-')[1]) > int(number)]
+
+
+def format_event(event):
+    """Render an event in text/event-stream format."""
+    return f'id: {event.id}\nevent: {event.name}\ndata: {json.dumps(event.data)}\n\n'
+
+
+def stream_events(bus, subscription, lifetime=STREAM_SECONDS, heartbeat=HEARTBEAT_SECONDS):
+    """Yield a subscription's events as SSE text until the lifetime runs out."""
+    deadline = time.monotonic() + lifetime
+    try:
+        yield f'retry: {RECONNECT_MS}\n\n'
+        while not subscription.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = subscription.queue.get(timeout=min(heartbeat, remaining))
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        bus.unsubscribe(subscription)
+
+
+async def stream_events_async(bus, subscription, lifetime=STREAM_SECONDS, heartbeat=HEARTBEAT_SECONDS):
+    """
+    stream_events for an event loop: waits for events without holding a thread.
+
+    Publishers run on other threads, so deliveries wake the stream through
+    the loop's call_soon_threadsafe.
+    """
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+
+    def notify():
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:  # the loop has shut down
+            pass
+
+    subscription.notify = notify
+    deadline = time.monotonic() + lifetime
+    try:
+        yield f'retry: {RECONNECT_MS}\n\n'
+        while not subscription.overflowed:
+            try:
+                event = subscription.queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wakeup.clear()
+                if not subscription.queue.empty():
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        subscription.notify = None
+        bus.unsubscribe(subscription)
+
+
+change_bus = ChangeBus()
@@ -0,0 +1,152 @@
+"""Streaming statement export (CSV or NDJSON).
+
+A statement lists every transaction touching a set of accounts, one line per
+account side: a transfer between two exported accounts appears once as a
+debit and once as a credit. Each account side is read in date order
+straight from its (account, created_at) index, and the sides are merged in
+Python, so SQLite never sorts the history and memory stays flat however long
+it is. Rows are read on a dedicated connection, so a slow download never
+holds a pooled request connection.
+"""
+
+import csv
+import heapq
+import io
+import json
+from datetime import date, timedelta
+from app.money import format_amount, to_dollars
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Rows fetched from SQLite and written to the client at a time
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_COLUMNS = (
+    'date', 'transaction_id', 'account_id', 'owner', 'account', 'type',
+    'category', 'description', 'status', 'amount'
+)
+
+
+def _side_query(column, start, end):
+    """
+    SQL and date parameters for one account's side of the ledger.
+
+    With the account pinned by equality, idx_transactions_{from,to}_account
+    (plus its rowid tail) already yields rows in (created_at, id) order.
+    """
+    conditions = ''
+    range_params = []
+    if start is not None:
+        conditions += ' AND created_at >= ?'
+        range_params.append(start.isoformat())
+    if end is not None:
+        conditions += ' AND created_at < ?'
+        range_params.append((end + timedelta(days=1)).isoformat())
+    query = f'''
+        SELECT created_at, id, transaction_type, category, description, status, amount
+        FROM transactions
+        WHERE {column} = ?{conditions}
+        ORDER BY created_at, id
+    '''
+    return query, range_params
+
+
+def _side_rows(db, account_id, column, sign, start, end):
+    """Yield (created_at, id, signed amount, account_id, row) for one side, in order."""
+    query, range_params = _side_query(column, start, end)
+    for row in db.execute(query, (account_id, *range_params)):
+        yield row['created_at'], row['id'], sign * row['amount'], account_id, row
+
+
+def _statement_rows(db, account_ids, start, end):
+    """
+    Every side of every transaction touching account_ids, ordered by date,
+    transaction and amount (a transfer's debit before its credit).
+    """
+    if not account_ids:
+        return
+    placeholders = ','.join('?' * len(account_ids))
+    accounts = {row['id']: row for row in db.execute(f'''
+        SELECT a.id, u.display_name AS owner, COALESCE(a.nickname, a.account_type) AS account
+        FROM accounts a JOIN users u ON u.id = a.user_id
+        WHERE a.id IN ({placeholders})
+    ''', list(account_ids))}
+    sides = []
+    for account_id in accounts:
+        sides.append(_side_rows(db, account_id, 'to_account_id', 1, start, end))
+        sides.append(_side_rows(db, account_id, 'from_account_id', -1, start, end))
+    for created_at, transaction_id, amount, account_id, row in heapq.merge(*sides, key=lambda side: side[:3]):
+        account = accounts[account_id]
+        yield {
+            'created_at': created_at, 'transaction_id': transaction_id, 'account_id': account_id,
+            'owner': account['owner'], 'account': account['account'], 'type': row['transaction_type'],
+            'category': row['category'], 'description': row['description'], 'status': row['status'],
+            'amount': amount,
+        }
+
+
+def parse_export_request(fmt, start, end):
+    """
+    Validate the format and optional YYYY-MM-DD bounds of an export request.
+
+    Returns:
+        Tuple of ((start date, end date), None) or (None, (error, status))
+    """
+    if fmt not in EXPORT_FORMATS:
+        return None, ('format must be csv or ndjson', 400)
+    try:
+        start = date.fromisoformat(start) if start is not None else None
+        end = date.fromisoformat(end) if end is not None else None
+    except ValueError:
+        return None, ('Dates must be YYYY-MM-DD', 400)
+    if start and end and start > end:
+        return None, ('start must be on or before end', 400)
+    return (start, end), None
+
+
+def statement_filename(fmt):
+    return f'family-bank-statement-{date.today().isoformat()}.{EXPORT_FORMATS[fmt][1]}'
+
+
+def stream_statement(open_db, account_ids, start=None, end=None, fmt='csv'):
+    """
+    Yield a statement for account_ids as CSV or NDJSON text chunks.
+
+    Args:
+        open_db: Callable returning a new connection; it is closed when the
+            generator finishes or the client disconnects
+        account_ids: Accounts to include
+        start, end: Optional inclusive date bounds
+        fmt: 'csv' or 'ndjson'
+    """
+    db = open_db()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == 'csv':
+            writer.writerow(EXPORT_COLUMNS)
+
+        for count, row in enumerate(_statement_rows(db, account_ids, start, end), 1):
+            if fmt == 'csv':
+                writer.writerow((
+                    row['created_at'], row['transaction_id'], row['account_id'], row['owner'],
+                    row['account'], row['type'], row['category'], row['description'],
+                    row['status'], format_amount(row['amount'])
+                ))
+            else:
+                record = {'date': row['created_at'], **{column: row[column] for column in EXPORT_COLUMNS[1:]}}
+                record['amount'] = to_dollars(row['amount'])
+                buffer.write(json.dumps(record) + '\n')
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        # A CSV export with no transactions still has its header
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
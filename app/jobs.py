@@ -1,7 +1,31 @@
 """Scheduled jobs for allowance payments and interest calculation."""
 
+import calendar
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, date
-from app.models import get_db
+from decimal import Decimal
+from app.models import get_db, current_database_path, route_database, unroute_database
+from app.ledger import record_balance_snapshots
+from app.money import apply_rate, split_cents
+
+# Upper bound on missed periods paid per config in one run; anything older is
+# picked up by the next run so a stale schedule can't flood the ledger at once
+MAX_CATCH_UP_PERIODS = 120
+
+# Length of a daily/weekly compounding period; monthly periods are calendar months
+INTEREST_PERIOD_DAYS = {'daily': 1, 'weekly': 7}
+
+# Compounding periods per year, used to derive the per-period rate
+PERIODS_PER_YEAR = {'daily': 365, 'weekly': 52, 'monthly': 12}
+
+# Configs written per transaction; bounds memory and write-lock hold time
+JOB_CHUNK_SIZE = 500
+
+# Worker processes for a job run; 1 runs everything in the calling process
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
 
 
 def _get_next_day_of_week(from_date, target_day_of_week):
@@ -41,186 +65,631 @@ def _get_next_day_of_month(from_date, target_day):
         next_year += 1
 
     # Handle months with fewer days (e.g., asking for 31st in February)
-    import calendar
     max_day = calendar.monthrange(next_year, next_month)[1]
     actual_day = min(target_day, max_day)
 
     return date(next_year, next_month, actual_day)
 
 
-def process_allowances():
-    """Process due allowance payments with support for multiple account splits."""
-    db = get_db()
-    today = date.today().isoformat()
+def _next_payment_date(config, current_date):
+    """
+    Calculate the payment date that follows current_date for a config.
+
+    Args:
+        config: Mapping with frequency, day_of_week and day_of_month keys;
+            monthly configs need day_of_month (see _load_due_allowances)
+        current_date: The payment date being processed
+
+    Returns:
+        The next scheduled payment date
+    """
+    if config['frequency'] == 'weekly':
+        # If day_of_week is set, use it; otherwise just add 7 days
+        if config['day_of_week'] is not None:
+            # Add 1 day to ensure we get the next occurrence (not the same day)
+            return _get_next_day_of_week(current_date + timedelta(days=1), config['day_of_week'])
+        return current_date + timedelta(weeks=1)
+
+    if config['frequency'] == 'biweekly':
+        # If day_of_week is set, find next occurrence at least 2 weeks out
+        if config['day_of_week'] is not None:
+            return _get_next_day_of_week(current_date + timedelta(weeks=2), config['day_of_week'])
+        return current_date + timedelta(weeks=2)
+
+    # Monthly: always the configured day, so a schedule clamped to a short
+    # month (31st -> Feb 28) goes back to the 31st afterwards
+    return _get_next_day_of_month(current_date, config['day_of_month'])
+
+
+def _user_range_sql(column, user_range):
+    """SQL condition and parameters limiting column to a [first, end) user id range."""
+    if user_range is None:
+        return '', ()
+    first, end = user_range
+    if end is None:
+        return f' AND {column} >= ?', (first,)
+    return f' AND {column} >= ? AND {column} < ?', (first, end)
+
+
+def _load_due_allowances(db, today, after_id=0, limit=-1, user_range=None):
+    """
+    Load due allowance configs together with their splits in one query.
+
+    Configs without splits fall back to the user's default account of the
+    configured target type, matching the original single-account behavior.
+    Monthly configs without a day_of_month are anchored on the day of their
+    next_payment_date.
 
-    # Get all due allowance configs
-    due_configs = db.execute('''
-        SELECT ac.*, u.display_name
+    Args:
+        db: Database connection
+        today: ISO date; configs with next_payment_date on or before it are due
+        after_id: Only load configs with a greater id (keyset for chunking)
+        limit: Maximum number of configs to load (-1 for all)
+        user_range: Optional (first, end) user id range to load configs for
+
+    Returns:
+        List of config dicts ordered by id, each with a 'splits' list
+    """
+    range_sql, range_params = _user_range_sql('user_id', user_range)
+    rows = db.execute(f'''
+        SELECT ac.id, ac.user_id, ac.amount, ac.frequency, ac.next_payment_date,
+               ac.day_of_week, ac.day_of_month,
+               s.account_id AS split_account_id, s.percentage, sa.nickname AS split_nickname,
+               (SELECT da.id FROM accounts da
+                WHERE da.user_id = ac.user_id AND da.account_type = ac.target_account_type
+                  AND da.is_default = 1
+                LIMIT 1) AS default_account_id
         FROM allowance_config ac
         JOIN users u ON ac.user_id = u.id
-        WHERE ac.active = 1 AND ac.amount > 0 AND ac.next_payment_date <= ?
-    ''', (today,)).fetchall()
-
-    count = 0
-    for config in due_configs:
-        # Get allowance splits for this config
-        splits = db.execute('''
-            SELECT s.*, a.nickname
-            FROM allowance_splits s
-            JOIN accounts a ON s.account_id = a.id
-            WHERE s.allowance_config_id = ?
-        ''', (config['id'],)).fetchall()
-
-        if not splits:
+        LEFT JOIN allowance_splits s ON s.allowance_config_id = ac.id
+        LEFT JOIN accounts sa ON s.account_id = sa.id
+        WHERE ac.id IN (
+            SELECT id FROM allowance_config
+            WHERE active = 1 AND amount > 0 AND next_payment_date <= ? AND id > ?{range_sql}
+            ORDER BY id LIMIT ?
+        )
+        ORDER BY ac.id, s.id
+    ''', (today, after_id, *range_params, limit)).fetchall()
+
+    configs = {}
+    for row in rows:
+        config = configs.get(row['id'])
+        if config is None:
+            config = configs[row['id']] = {
+                'id': row['id'],
+                'amount': row['amount'],
+                'frequency': row['frequency'],
+                'next_payment_date': row['next_payment_date'],
+                'day_of_week': row['day_of_week'],
+                'day_of_month': row['day_of_month'],
+                'default_account_id': row['default_account_id'],
+                'splits': [],
+            }
+        # Splits pointing at a deleted account are ignored, like the old inner join
+        if row['split_account_id'] is not None and row['split_nickname'] is not None:
+            config['splits'].append({
+                'account_id': row['split_account_id'],
+                'percentage': row['percentage'],
+                'nickname': row['split_nickname'],
+            })
+
+    for config in configs.values():
+        if config['frequency'] == 'monthly' and config['day_of_month'] is None:
+            # Anchor on the day the schedule is at; process_allowances stores it
+            config['day_of_month'] = date.fromisoformat(config['next_payment_date']).day
+        if not config['splits'] and config['default_account_id'] is not None:
             # Fallback: if no splits defined, use the old behavior (target_account_type)
-            account = db.execute(
-                'SELECT id FROM accounts WHERE user_id = ? AND account_type = ? AND is_default = 1',
-                (config['user_id'], config['target_account_type'])
-            ).fetchone()
-
-            if account:
-                splits = [{'account_id': account['id'], 'percentage': 100.0, 'nickname': 'Main'}]
-            else:
-                print(f"⚠️  No account found for allowance config {config['id']}, skipping")
-                continue
+            config['splits'] = [{'account_id': config['default_account_id'], 'percentage': 100.0, 'nickname': 'Main'}]
 
-        # Distribute allowance across splits
-        total_distributed = 0.0
-        description_base = f"{config['frequency'].capitalize()} allowance - {date.today().strftime('%b %d, %Y')}"
-
-        for i, split in enumerate(splits):
-            # Calculate amount for this split
-            if i == len(splits) - 1:
-                # Last split gets remainder to handle rounding
-                split_amount = config['amount'] - total_distributed
-            else:
-                split_amount = round(config['amount'] * (split['percentage'] / 100.0), 2)
-                total_distributed += split_amount
-
-            if split_amount > 0:
-                # Create allowance transaction
-                description = f"{description_base}"
-                if len(splits) > 1:
-                    description += f" ({split['nickname']}: {split['percentage']}%)"
-
-                db.execute('''
-                    INSERT INTO transactions (to_account_id, amount, transaction_type, category, description, status)
-                    VALUES (?, ?, 'allowance', 'Allowance', ?, 'completed')
-                ''', (split['account_id'], split_amount, description))
-
-                # Update balance
-                db.execute(
-                    'UPDATE accounts SET balance = balance + ? WHERE id = ?',
-                    (split_amount, split['account_id'])
-                )
+    return list(configs.values())
 
-        # Calculate next payment date using schedule preferences
-        current_date = date.fromisoformat(config['next_payment_date'])
-
-        if config['frequency'] == 'weekly':
-            # If day_of_week is set, use it; otherwise just add 7 days
-            if config.get('day_of_week') is not None:
-                # Add 1 day to ensure we get the next occurrence (not the same day)
-                next_date = _get_next_day_of_week(current_date + timedelta(days=1), config['day_of_week'])
-            else:
-                next_date = current_date + timedelta(weeks=1)
-
-        elif config['frequency'] == 'biweekly':
-            # If day_of_week is set, find next occurrence at least 2 weeks out
-            if config.get('day_of_week') is not None:
-                next_date = _get_next_day_of_week(current_date + timedelta(weeks=2), config['day_of_week'])
-            else:
-                next_date = current_date + timedelta(weeks=2)
-
-        elif config['frequency'] == 'monthly':
-            # If day_of_month is set, use it; otherwise advance by one month
-            if config.get('day_of_month') is not None:
-                next_date = _get_next_day_of_month(current_date, config['day_of_month'])
-            else:
-                # Advance by one month
-                month = current_date.month + 1
-                year = current_date.year
-                if month > 12:
-                    month = 1
-                    year += 1
-                next_date = current_date.replace(year=year, month=month)
-
-        db.execute(
-            'UPDATE allowance_config SET next_payment_date = ? WHERE id = ?',
-            (next_date.isoformat(), config['id'])
-        )
-        count += 1
 
-    db.commit()
-    db.close()
-    return count
+def _due_occurrences(config, today, catch_up):
+    """
+    Expand the payment dates owed by a config up to and including today.
+
+    Args:
+        config: Due allowance config dict
+        today: Date the job is running for
+        catch_up: If False, only the oldest missed occurrence is returned
 
+    Returns:
+        Tuple of (list of payment dates to pay, next payment date to store)
+    """
+    occurrence = date.fromisoformat(config['next_payment_date'])
+    occurrences = []
+    while occurrence <= today:
+        occurrences.append(occurrence)
+        occurrence = _next_payment_date(config, occurrence)
+        if not catch_up or len(occurrences) >= MAX_CATCH_UP_PERIODS:
+            break
+    return occurrences, occurrence
+
+
+def _paid_periods(db, job, config_ids, since):
+    """Return the (config_id, period_date) keys already in the payout ledger."""
+    placeholders = ','.join('?' * len(config_ids))
+    rows = db.execute(f'''
+        SELECT config_id, period_date FROM job_payouts
+        WHERE job = ? AND config_id IN ({placeholders}) AND period_date >= ?
+    ''', (job, *config_ids, since)).fetchall()
+    return {(row['config_id'], row['period_date']) for row in rows}
+
+
+def process_allowances(timings=None, catch_up=True, chunk_size=JOB_CHUNK_SIZE, user_range=None):
+    """
+    Process due allowance payments with support for multiple account splits.
+
+    Due configs are handled in chunks of chunk_size. Each chunk is loaded
+    with a single query, its payouts and next payment dates are computed in
+    memory, and every write is issued with executemany inside one short
+    BEGIN IMMEDIATE transaction that also records each paid (config, period)
+    in job_payouts. The committed next_payment_date is the checkpoint: a
+    crash loses at most the chunk in flight, the next run resumes from it,
+    and a period already in the ledger is never paid twice.
 
-def process_interest():
-    """Process interest payments on savings accounts."""
+    Args:
+        timings: Optional dict that receives per-phase durations in seconds
+            ('load', 'compute', 'write'), summed over all chunks
+        catch_up: Pay every missed period in this run (backdated to the day it
+            was due) instead of one period per config per run
+        chunk_size: Number of configs written per transaction
+        user_range: Optional (first, end) user id range; only those users'
+            configs are paid (see run_partitioned)
+
+    Returns:
+        Number of allowance configs paid
+    """
     db = get_db()
-    now = datetime.now()
+    today = date.today()
+    phase_totals = {'load': 0.0, 'compute': 0.0, 'write': 0.0}
+    paid_configs = 0
+    last_id = 0
+
+    try:
+        while True:
+            phase_start = time.perf_counter()
+            db.execute('BEGIN IMMEDIATE')
+            due_configs = _load_due_allowances(db, today.isoformat(), last_id, chunk_size, user_range)
+            if not due_configs:
+                db.rollback()
+                break
+            last_id = due_configs[-1]['id']
+            already_paid = _paid_periods(
+                db, 'allowance', [config['id'] for config in due_configs],
+                min(config['next_payment_date'] for config in due_configs)
+            )
+            load_done = time.perf_counter()
+
+            transaction_rows = []
+            balance_changes = {}
+            schedule_rows = []
+            skipped_rows = []
+            payout_rows = []
+
+            for config in due_configs:
+                splits = config['splits']
+                if not splits:
+                    # Nothing to pay into: move the schedule past today so the
+                    # config isn't due again (and the scheduler doesn't spin on it)
+                    next_date = date.fromisoformat(config['next_payment_date'])
+                    while next_date <= today:
+                        next_date = _next_payment_date(config, next_date)
+                    print(f"⚠️  No account found for allowance config {config['id']}, skipping to {next_date}")
+                    skipped_rows.append((next_date.isoformat(), config['day_of_month'], config['id']))
+                    continue
+
+                occurrences, next_date = _due_occurrences(config, today, catch_up)
+                split_amounts = split_cents(config['amount'], [split['percentage'] for split in splits])
+
+                for occurrence in occurrences:
+                    period_key = (config['id'], occurrence.isoformat())
+                    if period_key in already_paid:
+                        print(f"⚠️  Allowance config {config['id']} already paid for {occurrence}, skipping")
+                        continue
+                    payout_rows.append(('allowance', *period_key))
+
+                    if catch_up and occurrence < today:
+                        # Backdate missed periods so history shows when they were owed
+                        payment_label = occurrence.strftime('%b %d, %Y')
+                        created_at = f"{occurrence.isoformat()} 00:00:00"
+                    else:
+                        payment_label = today.strftime('%b %d, %Y')
+                        created_at = None
+
+                    description = f"{config['frequency'].capitalize()} allowance - {payment_label}"
+                    for split, split_amount in zip(splits, split_amounts):
+                        if split_amount > 0:
+                            split_description = description
+                            if len(splits) > 1:
+                                split_description += f" ({split['nickname']}: {split['percentage']}%)"
+                            transaction_rows.append((split['account_id'], split_amount, split_description, created_at))
+                            balance_changes[split['account_id']] = balance_changes.get(split['account_id'], 0) + split_amount
+
+                schedule_rows.append((next_date.isoformat(), config['day_of_month'], config['id']))
+            compute_done = time.perf_counter()
+
+            # A duplicate period violates the ledger's primary key and rolls the
+            # whole chunk back instead of paying twice
+            db.executemany(
+                'INSERT INTO job_payouts (job, config_id, period_date) VALUES (?, ?, ?)',
+                payout_rows
+            )
+            db.executemany('''
+                INSERT INTO transactions (to_account_id, amount, transaction_type, category, description, status, created_at)
+                VALUES (?, ?, 'allowance', 'Allowance', ?, 'completed', COALESCE(?, CURRENT_TIMESTAMP))
+            ''', transaction_rows)
+            db.executemany(
+                'UPDATE accounts SET balance = balance + ? WHERE id = ?',
+                [(amount, account_id) for account_id, amount in balance_changes.items()]
+            )
+            db.executemany(
+                'UPDATE allowance_config SET next_payment_date = ?, day_of_month = ? WHERE id = ?',
+                schedule_rows + skipped_rows
+            )
+            record_balance_snapshots(db, balance_changes)
+            db.commit()
+            write_done = time.perf_counter()
 
-    active_configs = db.execute('''
-        SELECT ic.*, a.balance, a.account_type, u.display_name
-        FROM interest_config ic
-        JOIN accounts a ON ic.account_id = a.id
-        JOIN users u ON a.user_id = u.id
-        WHERE ic.active = 1 AND a.balance > 0
-    ''').fetchall()
+            paid_configs += len(schedule_rows)
+            phase_totals['load'] += load_done - phase_start
+            phase_totals['compute'] += compute_done - load_done
+            phase_totals['write'] += write_done - compute_done
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-    count = 0
-    for config in active_configs:
-        should_apply = False
+    if timings is not None:
+        timings.update(phase_totals)
+
+    return paid_configs
+
+
+def _add_months(value, months):
+    """Shift a datetime by whole calendar months, clamping to the month's last day."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return value.replace(year=year, month=month, day=min(value.day, calendar.monthrange(year, month)[1]))
+
+
+def _interest_period_end(frequency, start, periods):
+    """Return the end of `periods` compounding periods starting at start."""
+    if frequency == 'monthly':
+        return _add_months(start, periods)
+    return start + timedelta(days=INTEREST_PERIOD_DAYS[frequency] * periods)
+
+
+def _elapsed_interest_periods(frequency, last, now):
+    """Count the whole compounding periods between last and now."""
+    if frequency == 'monthly':
+        periods = (now.year - last.year) * 12 + now.month - last.month
+    else:
+        periods = (now - last).days // INTEREST_PERIOD_DAYS[frequency]
+    if periods > 0 and _interest_period_end(frequency, last, periods) > now:
+        periods -= 1
+    return max(periods, 0)
+
+
+def _accrue_interest(configs, now):
+    """
+    Compute the interest owed by a batch of configs in one pass.
+
+    Each config accrues every whole period since last_applied, compounded:
+    balance * ((1 + rate) ** periods - 1). A config that has never been
+    applied is paid one period now. Growth factors are computed once per
+    (rate, frequency, periods) and shared across accounts.
+
+    Returns:
+        List of (config, periods, interest_cents, applied_through) for every
+        config with at least one elapsed period; applied_through advances
+        by whole periods so partial periods carry over to the next run
+    """
+    growth_factors = {}
+    accruals = []
+    for config in configs:
+        frequency = config['compound_frequency']
         if config['last_applied'] is None:
-            should_apply = True
+            periods, applied_through = 1, now
         else:
             last = datetime.fromisoformat(config['last_applied'])
-            if config['compound_frequency'] == 'daily':
-                should_apply = (now - last).days >= 1
-            elif config['compound_frequency'] == 'weekly':
-                should_apply = (now - last).days >= 7
-            elif config['compound_frequency'] == 'monthly':
-                should_apply = (now - last).days >= 28
-
-        if should_apply and config['balance'] > 0:
-            # Calculate interest
-            annual_rate = config['annual_rate'] / 100
-            if config['compound_frequency'] == 'daily':
-                period_rate = annual_rate / 365
-            elif config['compound_frequency'] == 'weekly':
-                period_rate = annual_rate / 52
-            elif config['compound_frequency'] == 'monthly':
-                period_rate = annual_rate / 12
-
-            interest_amount = round(config['balance'] * period_rate, 2)
-
-            if interest_amount > 0:
-                db.execute('''
-                    INSERT INTO transactions (to_account_id, amount, transaction_type, category, description, status)
-                    VALUES (?, ?, 'interest', 'Interest', ?, 'completed')
-                ''', (config['account_id'], interest_amount,
-                      f"Interest payment ({config['annual_rate']}% annual rate)"))
-
-                db.execute(
-                    'UPDATE accounts SET balance = balance + ? WHERE id = ?',
-                    (interest_amount, config['account_id'])
+            periods = _elapsed_interest_periods(frequency, last, now)
+            if periods == 0:
+                continue
+            applied_through = _interest_period_end(frequency, last, periods)
+
+        key = (config['annual_rate'], frequency, periods)
+        growth = growth_factors.get(key)
+        if growth is None:
+            period_rate = Decimal(str(config['annual_rate'])) / 100 / PERIODS_PER_YEAR[frequency]
+            growth = growth_factors[key] = (1 + period_rate) ** periods - 1
+
+        interest_cents = apply_rate(config['balance'], growth) if config['balance'] > 0 else 0
+        accruals.append((config, periods, interest_cents, applied_through))
+    return accruals
+
+
+def process_interest(chunk_size=JOB_CHUNK_SIZE, timings=None, user_range=None):
+    """
+    Process interest payments on savings accounts.
+
+    Interest is accrued for the exact number of compounding periods elapsed
+    since last_applied (calendar months for monthly), so a late run pays
+    every missed period. Each chunk of configs is computed in one pass and
+    written with executemany. Like allowances, chunks commit on their own
+    with last_applied as the checkpoint, and each payment claims a
+    (config, period end) key in job_payouts so it can't be paid twice.
+
+    Accounts with no balance still have last_applied advanced, so money
+    deposited later doesn't earn interest for periods it wasn't there.
+
+    Args:
+        chunk_size: Number of configs written per transaction
+        timings: Optional dict that receives per-phase durations in seconds
+            ('load', 'compute', 'write'), summed over all chunks
+        user_range: Optional (first, end) range of account owner user ids
+
+    Returns:
+        Number of configs that had interest applied
+    """
+    range_sql, range_params = _user_range_sql('a.user_id', user_range)
+    db = get_db()
+    now = datetime.now()
+    phase_totals = {'load': 0.0, 'compute': 0.0, 'write': 0.0}
+    count = 0
+    last_id = 0
+
+    try:
+        while True:
+            phase_start = time.perf_counter()
+            db.execute('BEGIN IMMEDIATE')
+            configs = db.execute(f'''
+                SELECT ic.id, ic.account_id, ic.annual_rate, ic.compound_frequency, ic.last_applied, a.balance
+                FROM interest_config ic
+                JOIN accounts a ON ic.account_id = a.id
+                WHERE ic.active = 1 AND ic.id > ?{range_sql}
+                ORDER BY ic.id
+                LIMIT ?
+            ''', (last_id, *range_params, chunk_size)).fetchall()
+            if not configs:
+                db.rollback()
+                break
+            last_id = configs[-1]['id']
+            load_done = time.perf_counter()
+
+            accruals = _accrue_interest(configs, now)
+            already_paid = set()
+            if accruals:
+                already_paid = _paid_periods(
+                    db, 'interest', [config['id'] for config, _, _, _ in accruals],
+                    min(through.date().isoformat() for _, _, _, through in accruals)
                 )
 
-            db.execute(
-                'UPDATE interest_config SET last_applied = ? WHERE id = ?',
-                (now.isoformat(), config['id'])
+            payout_rows = []
+            transaction_rows = []
+            balance_changes = {}
+            schedule_rows = []
+            for config, periods, interest_cents, applied_through in accruals:
+                schedule_rows.append((applied_through.isoformat(), config['id']))
+                if config['balance'] <= 0:
+                    continue
+                period_key = (config['id'], applied_through.date().isoformat())
+                if period_key in already_paid:
+                    print(f"⚠️  Interest config {config['id']} already paid for {period_key[1]}, skipping")
+                    continue
+                payout_rows.append(('interest', *period_key))
+                count += 1
+                if interest_cents > 0:
+                    description = f"Interest payment ({config['annual_rate']}% annual rate)"
+                    if periods > 1:
+                        description = f"Interest payment ({config['annual_rate']}% annual rate, {periods} periods)"
+                    transaction_rows.append((config['account_id'], interest_cents, description))
+                    balance_changes[config['account_id']] = balance_changes.get(config['account_id'], 0) + interest_cents
+            compute_done = time.perf_counter()
+
+            db.executemany(
+                'INSERT INTO job_payouts (job, config_id, period_date) VALUES (?, ?, ?)',
+                payout_rows
+            )
+            db.executemany('''
+                INSERT INTO transactions (to_account_id, amount, transaction_type, category, description, status)
+                VALUES (?, ?, 'interest', 'Interest', ?, 'completed')
+            ''', transaction_rows)
+            db.executemany(
+                'UPDATE accounts SET balance = balance + ? WHERE id = ?',
+                [(amount, account_id) for account_id, amount in balance_changes.items()]
             )
-            count += 1
+            db.executemany('UPDATE interest_config SET last_applied = ? WHERE id = ?', schedule_rows)
+            record_balance_snapshots(db, balance_changes)
+            db.commit()
+            write_done = time.perf_counter()
+
+            phase_totals['load'] += load_done - phase_start
+            phase_totals['compute'] += compute_done - load_done
+            phase_totals['write'] += write_done - compute_done
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if timings is not None:
+        timings.update(phase_totals)
 
-    db.commit()
-    db.close()
     return count
 
 
-def run_all_jobs():
+def next_due_at(db, now=None):
+    """
+    Return when the next allowance or interest payment falls due.
+
+    Allowances are due at local midnight of their next_payment_date; interest
+    is due one compounding period after it was last applied. Past-due work
+    returns now.
+
+    Returns:
+        datetime of the earliest due job, or None if nothing is scheduled
+    """
+    now = now or datetime.now()
+    candidates = []
+
+    # Only configs _load_due_allowances would pick up: a config left behind
+    # by a deleted user would otherwise look due forever
+    row = db.execute('''
+        SELECT MIN(ac.next_payment_date) FROM allowance_config ac
+        JOIN users u ON ac.user_id = u.id
+        WHERE ac.active = 1 AND ac.amount > 0 AND ac.next_payment_date IS NOT NULL
+    ''').fetchone()
+    if row[0]:
+        candidates.append(datetime.combine(date.fromisoformat(row[0]), datetime.min.time()))
+
+    # Period ends only grow with last_applied, so the oldest per frequency
+    # decides; at most one row per frequency comes back
+    interest_rows = db.execute('''
+        SELECT ic.compound_frequency, MIN(ic.last_applied) AS last_applied,
+               COUNT(*) > COUNT(ic.last_applied) AS never_applied
+        FROM interest_config ic
+        JOIN accounts a ON ic.account_id = a.id
+        WHERE ic.active = 1
+        GROUP BY ic.compound_frequency
+    ''').fetchall()
+    for row in interest_rows:
+        if row['never_applied']:
+            candidates.append(now)
+        else:
+            last = datetime.fromisoformat(row['last_applied'])
+            candidates.append(_interest_period_end(row['compound_frequency'], last, 1))
+
+    if not candidates:
+        return None
+    return max(min(candidates), now)
+
+
+JOB_FUNCTIONS = {
+    'allowances': process_allowances,
+    'interest': process_interest,
+}
+
+
+def user_partitions(db, partitions):
+    """
+    Split the users table into contiguous user id ranges of similar size.
+
+    A kid's accounts, allowance and interest configs all belong to one user,
+    so partitions never write to the same account.
+
+    Returns:
+        List of (first, end) ranges; end is exclusive and None for the last
+    """
+    starts = [row[0] for row in db.execute('''
+        SELECT MIN(id) FROM (SELECT id, NTILE(?) OVER (ORDER BY id) AS part FROM users)
+        GROUP BY part ORDER BY 1
+    ''', (max(partitions, 1),))]
+    if not starts:
+        return [None]
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def _run_partition(database_path, user_range, job_names, chunk_size):
+    """
+    Run jobs for one partition; the entry point of each pool worker.
+
+    Returns:
+        {job_name: (count, phase timings)} plus 'seconds' for the partition
+    """
+    token = route_database(database_path)
+    started = time.perf_counter()
+    try:
+        results = {}
+        for job_name in job_names:
+            timings = {}
+            count = JOB_FUNCTIONS[job_name](chunk_size=chunk_size, timings=timings, user_range=user_range)
+            results[job_name] = (count, timings)
+    finally:
+        unroute_database(token)
+    results['seconds'] = time.perf_counter() - started
+    return results
+
+
+def run_partitioned(job_names=tuple(JOB_FUNCTIONS), workers=JOB_WORKERS, databases=None,
+                    partitions=None, chunk_size=JOB_CHUNK_SIZE):
+    """
+    Run jobs over partitions of the data in a pool of worker processes.
+
+    With several databases (one per family) each database is a partition
+    and they run fully in parallel. A single database is split into user id
+    ranges: the Python-side work of each range runs in parallel, while the
+    short chunk transactions still take turns on the database's write lock.
+
+    Args:
+        job_names: Jobs to run, in order, in every partition
+        workers: Processes running partitions at once; with 1 the partitions
+            run one after another in this process
+        databases: Database files to cover (defaults to the current one)
+        partitions: User id ranges to split a single database into
+            (defaults to workers)
+        chunk_size: Configs written per transaction
+
+    Returns:
+        Dict with per-job 'counts' and summed phase 'timings', the number of
+        'partitions', the slowest partition in 'max_partition_seconds' and
+        the overall 'seconds'
+    """
+    started = time.perf_counter()
+    databases = databases or [current_database_path()]
+    if len(databases) > 1:
+        tasks = [(path, None) for path in databases]
+    else:
+        db = get_db(databases[0])
+        try:
+            tasks = [(databases[0], user_range) for user_range in user_partitions(db, partitions or workers)]
+        finally:
+            db.close()
+
+    if workers <= 1:
+        results = [_run_partition(path, user_range, job_names, chunk_size) for path, user_range in tasks]
+    else:
+        # Fresh interpreters rather than forks: the caller may be running threads
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_run_partition, path, user_range, job_names, chunk_size)
+                       for path, user_range in tasks]
+            results = [future.result() for future in futures]
+
+    counts = {job_name: 0 for job_name in job_names}
+    timings = {job_name: {} for job_name in job_names}
+    for result in results:
+        for job_name in job_names:
+            count, phases = result[job_name]
+            counts[job_name] += count
+            for phase, seconds in phases.items():
+                timings[job_name][phase] = timings[job_name].get(phase, 0.0) + seconds
+    return {
+        'counts': counts,
+        'timings': timings,
+        'partitions': len(tasks),
+        'max_partition_seconds': max(result['seconds'] for result in results),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_job(job_name):
+    """Run one job, across JOB_WORKERS processes when more than one is configured."""
+    if JOB_WORKERS <= 1:
+        return JOB_FUNCTIONS[job_name]()
+    return run_partitioned((job_name,))['counts'][job_name]
+
+
+def run_all_jobs(workers=JOB_WORKERS):
     """Run all scheduled jobs."""
-    allowances = process_allowances()
-    interest = process_interest()
-    print(f"[{datetime.now().isoformat()}] Jobs complete: {allowances} allowances, {interest} interest payments")
+    run = run_partitioned(workers=workers)
+    allowances, interest = run['counts']['allowances'], run['counts']['interest']
+
+    def phases(timings):
+        return ', '.join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in timings.items())
+
+    print(f"[{datetime.now().isoformat()}] Jobs complete in {run['seconds'] * 1000:.1f}ms over "
+          f"{run['partitions']} partition(s): {allowances} allowances ({phases(run['timings']['allowances'])}), "
+          f"{interest} interest payments ({phases(run['timings']['interest'])})")
     return allowances, interest
@@ -0,0 +1,130 @@
+"""Ledger bookkeeping shared by the API write paths and scheduled jobs."""
+
+import random
+import sqlite3
+import time
+from datetime import date
+
+# Extra attempts when the database stays locked past busy_timeout
+WRITE_RETRIES = 4
+
+# First retry delay in seconds; doubled (with jitter) on each further attempt
+WRITE_BACKOFF = 0.05
+
+
+class InsufficientFunds(Exception):
+    """A debit would have taken an account below zero."""
+
+    def __init__(self, account_id):
+        super().__init__(f'Insufficient funds in account {account_id}')
+        self.account_id = account_id
+
+
+def run_in_transaction(db, work, retries=WRITE_RETRIES, backoff=WRITE_BACKOFF):
+    """
+    Run work(db) inside a BEGIN IMMEDIATE transaction and commit it.
+
+    BEGIN IMMEDIATE takes the write lock before anything is read, so checks
+    made inside work() still hold when its writes land, whichever worker or
+    scheduler is writing at the same time. If the lock can't be had within
+    busy_timeout the whole transaction is retried with exponential backoff,
+    so work() must be safe to run more than once. Any exception from work()
+    rolls the transaction back and propagates.
+
+    Returns:
+        Whatever work(db) returned
+    """
+    for attempt in range(retries + 1):
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            result = work(db)
+            db.commit()
+            return result
+        except sqlite3.OperationalError as e:
+            if db.in_transaction:
+                db.rollback()
+            if attempt == retries or 'locked' not in str(e):
+                raise
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+
+def debit(db, account_id, amount):
+    """
+    Take amount from an account only if its balance covers it.
+
+    The check and the update are one statement, so concurrent debits can't
+    both pass a stale balance check.
+
+    Raises:
+        InsufficientFunds: If the balance is lower than amount (or the
+            account does not exist)
+    """
+    cursor = db.execute(
+        'UPDATE accounts SET balance = balance - ? WHERE id = ? AND balance >= ?',
+        (amount, account_id, amount)
+    )
+    if cursor.rowcount == 0:
+        raise InsufficientFunds(account_id)
+
+
+def credit(db, account_id, amount):
+    """Add amount to an account's balance."""
+    db.execute('UPDATE accounts SET balance = balance + ? WHERE id = ?', (amount, account_id))
+
+
+def record_balance_snapshots(db, account_ids, snapshot_date=None):
+    """
+    Upsert today's closing balance for every account a write touched.
+
+    Call this after the balance UPDATEs and before committing, so the
+    snapshot lands in the same transaction as the change it records.
+
+    Args:
+        db: Open database connection
+        account_ids: Iterable of account ids whose balance changed
+        snapshot_date: Day to record (defaults to today)
+    """
+    snapshot_date = (snapshot_date or date.today()).isoformat()
+    db.executemany('''
+        INSERT INTO balance_snapshots (account_id, snapshot_date, balance)
+        SELECT id, ?, balance FROM accounts WHERE id = ?
+        ON CONFLICT (account_id, snapshot_date) DO UPDATE SET balance = excluded.balance
+    ''', [(snapshot_date, account_id) for account_id in set(account_ids)])
+
+
+def get_balance_series(db, account_id, start, end):
+    """
+    Build a daily closing-balance series for an account from its snapshots.
+
+    Args:
+        db: Open database connection
+        account_id: Account to chart
+        start: First date of the series (inclusive)
+        end: Last date of the series (inclusive)
+
+    Returns:
+        List of {'date', 'balance'} dicts, one per day; balance is None for
+        days before the account's first snapshot
+    """
+    opening = db.execute('''
+        SELECT balance FROM balance_snapshots
+        WHERE account_id = ? AND snapshot_date <= ?
+        ORDER BY snapshot_date DESC LIMIT 1
+    ''', (account_id, start.isoformat())).fetchone()
+
+    changes = dict(db.execute('''
+        SELECT snapshot_date, balance FROM balance_snapshots
+        WHERE account_id = ? AND snapshot_date > ? AND snapshot_date <= ?
+    ''', (account_id, start.isoformat(), end.isoformat())).fetchall())
+
+    balance = opening['balance'] if opening else None
+    series = []
+    for offset in range((end - start).days + 1):
+        day = date.fromordinal(start.toordinal() + offset).isoformat()
+        balance = changes.get(day, balance)
+        series.append({'date': day, 'balance': balance})
+    return series
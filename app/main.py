@@ -1,14 +1,58 @@
 """Main Flask application for Family Bank."""
 
 import os
+import hmac
 import functools
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, date
 from flask import (
-    Flask, request, jsonify, session, render_template,
+    Flask, Response, request, jsonify, session, render_template,
     redirect, url_for, g
 )
-from werkzeug.security import generate_password_hash, check_password_hash
-from app.models import get_db, init_db, seed_demo_data, run_migrations
+from app.models import (
+    get_db, get_pool, prepare_database, pool_totals,
+    route_database, unroute_database, PARENT_VAULT_BALANCE
+)
+from app.tenants import tenancy_enabled, tenant_exists, tenant_path
+from app.money import to_cents, to_dollars, format_amount, format_money, money_json
+from app.ledger import (
+    record_balance_snapshots, get_balance_series, run_in_transaction, debit, credit, InsufficientFunds
+)
+from app.cache import settings_cache, categories_cache, users_version
+from app.events import change_bus, stream_events
+from app.metrics import metrics, start_query_stats, stop_query_stats
+from app.reads import load_principal, parse_account_ids, resolve_account_ids, transactions_page, dashboard
+from app import startup
+
+# Longest range /api/accounts/<id>/balance-history will expand day by day
+MAX_BALANCE_HISTORY_DAYS = 3660
+
+# Most items accepted by one batch deposit or batch approval request
+MAX_BATCH_SIZE = 100
+
+# Settings holding a dollar amount; validated with to_cents() when saved
+MONEY_SETTINGS = ('max_withdrawal_without_approval',)
+
+
+def batch_failure(results):
+    """400 response for a batch in which at least one item is invalid."""
+    failed = sum(1 for result in results if result['status'] == 'error')
+    return jsonify({
+        'error': f'Batch rejected: {failed} of {len(results)} items are invalid',
+        'results': results
+    }), 400
+
+
+def item_result(index, error=None):
+    """Per-item entry in a batch response."""
+    if error:
+        return {'index': index, 'status': 'error', 'error': error}
+    return {'index': index, 'status': 'ok'}
+
+
+def is_row_id(value):
+    """True for a JSON integer id; JSON true/false are bools, which int would accept."""
+    return isinstance(value, int) and not isinstance(value, bool)
 
 
 def create_app():
@@ -16,29 +60,90 @@ def create_app():
     app.secret_key = os.environ.get('SECRET_KEY', 'family-bank-dev-key-change-in-production')
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
 
-    # Initialize DB on first request
-    with app.app_context():
-        init_db()
-        run_migrations()
-        seed_demo_data()
+    # Bring the database up to date (a single version check when it already
+    # is); family databases are prepared on first use
+    if not tenancy_enabled():
+        prepare_database()
+    startup.mark('prepare database')
+
+    # ── Family Routing ───────────────────────────────────────────────
+
+    def use_family(family):
+        """Route this request's database access to a family's file."""
+        token = g.pop('tenant_token', None)
+        if token is not None:
+            unroute_database(token)
+        g.tenant = family
+        g.tenant_token = route_database(tenant_path(family))
+        prepare_database()
+
+    @app.before_request
+    def route_to_family():
+        g.tenant = None
+        if not tenancy_enabled():
+            return
+        if not tenant_exists(session.get('tenant')):
+            # Signed in before families were enabled, or the family is gone:
+            # nothing to route to, so sign out (login_required answers 401)
+            session.clear()
+            return
+        use_family(session['tenant'])
+
+    @app.teardown_request
+    def unroute_family(exception):
+        token = g.pop('tenant_token', None)
+        if token is not None:
+            unroute_database(token)
+
+    # ── Request Metrics ──────────────────────────────────────────────
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_started = time.perf_counter()
+        g.query_stats, g.query_stats_token = start_query_stats()
+
+    @app.after_request
+    def record_response_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request_metrics(exception):
+        if 'request_started' not in g:
+            return
+        stop_query_stats(g.query_stats_token)
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        status = 500 if exception is not None else g.get('response_status', 500)
+        metrics.observe_request(request.method, route, status,
+                                time.perf_counter() - g.request_started, g.query_stats)
 
     @app.teardown_appcontext
     def close_db(exception):
         db = g.pop('db', None)
         if db is not None:
-            db.close()
+            g.pop('db_pool').release(db)
 
     def get_database():
         if 'db' not in g:
-            g.db = get_db()
+            g.db_pool = get_pool()
+            g.db = g.db_pool.acquire()
         return g.db
 
     # ── Auth Decorators ──────────────────────────────────────────────
 
+    def current_user():
+        """The signed-in user as {'id', 'username', 'role'}, or None; loaded at most once per request."""
+        if 'principal' in g:
+            return g.principal
+        g.principal = None
+        if 'user_id' in session:
+            g.principal = load_principal(get_database(), g.db_pool.path, session)
+        return g.principal
+
     def login_required(f):
         @functools.wraps(f)
         def decorated(*args, **kwargs):
-            if 'user_id' not in session:
+            if current_user() is None:
                 if request.is_json or request.path.startswith('/api/'):
                     return jsonify({'error': 'Not authenticated'}), 401
                 return redirect(url_for('login_page'))
@@ -48,19 +153,42 @@ def create_app():
     def parent_required(f):
         @functools.wraps(f)
         def decorated(*args, **kwargs):
-            if 'user_id' not in session:
+            user = current_user()
+            if user is None:
                 return jsonify({'error': 'Not authenticated'}), 401
-            db = get_database()
-            user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-            if not user or user['role'] != 'parent':
+            if user['role'] != 'parent':
                 return jsonify({'error': 'Parent access required'}), 403
             return f(*args, **kwargs)
         return decorated
 
+    def get_settings():
+        # Checked against the cache version at most once per request
+        if 'settings' not in g:
+            g.settings = settings_cache.get(get_database(), g.db_pool.path)[1]
+        return g.settings
+
     def get_setting(key):
-        db = get_database()
-        row = db.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
-        return row['value'] if row else None
+        return get_settings().get(key)
+
+    # ── Change Events ────────────────────────────────────────────────
+
+    def publish_balances(db, account_ids):
+        """Push committed balances to each account's owner and to parents."""
+        account_ids = list(dict.fromkeys(account_ids))
+        placeholders = ','.join('?' * len(account_ids))
+        accounts = db.execute(
+            f'SELECT id, user_id, balance FROM accounts WHERE id IN ({placeholders})', account_ids
+        ).fetchall()
+        for account in accounts:
+            change_bus.publish(
+                'balance', {'account_id': account['id'], 'balance': to_dollars(account['balance'])},
+                user_ids=[account['user_id']], parents=True, scope=g.tenant
+            )
+
+    def publish_pending_count(db):
+        """Push the number of withdrawals waiting for approval to parents."""
+        count = db.execute("SELECT COUNT(*) FROM transactions WHERE status = 'pending'").fetchone()[0]
+        change_bus.publish('pending', {'count': count}, parents=True, scope=g.tenant)
 
     # ── Page Routes ──────────────────────────────────────────────────
 
@@ -72,7 +200,7 @@ def create_app():
 
     @app.route('/login')
     def login_page():
-        return render_template('login.html')
+        return render_template('login.html', ask_family=tenancy_enabled())
 
     @app.route('/dashboard')
     @login_required
@@ -87,6 +215,15 @@ def create_app():
         username = data.get('username', '').strip().lower()
         password = data.get('password', '')
 
+        if tenancy_enabled():
+            family = str(data.get('family', '')).strip().lower()
+            if not tenant_exists(family):
+                return jsonify({'error': 'Invalid username or password'}), 401
+            if g.tenant != family:
+                use_family(family)
+
+        from werkzeug.security import check_password_hash
+
         db = get_database()
         user = db.execute(
             'SELECT * FROM users WHERE username = ?', (username,)
@@ -99,6 +236,9 @@ def create_app():
         session['user_id'] = user['id']
         session['username'] = user['username']
         session['role'] = user['role']
+        session['principal_version'] = users_version.current(db, g.db_pool.path)
+        if g.tenant:
+            session['tenant'] = g.tenant
 
         return jsonify({
             'id': user['id'],
@@ -146,6 +286,8 @@ def create_app():
         if len(new) < 4:
             return jsonify({'error': 'Password must be at least 4 characters'}), 400
 
+        from werkzeug.security import check_password_hash, generate_password_hash
+
         db = get_database()
         user = db.execute('SELECT password_hash FROM users WHERE id = ?', (session['user_id'],)).fetchone()
 
@@ -165,7 +307,7 @@ def create_app():
     @login_required
     def api_accounts():
         db = get_database()
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
         if user['role'] == 'parent':
             # Parents see all accounts
@@ -183,7 +325,7 @@ def create_app():
                 ORDER BY a.account_type
             ''', (session['user_id'],)).fetchall()
 
-        return jsonify([dict(a) for a in accounts])
+        return jsonify([money_json(a) for a in accounts])
 
     @app.route('/api/accounts/checking', methods=['POST'])
     @login_required
@@ -197,7 +339,7 @@ def create_app():
             return jsonify({'error': 'Nickname is required'}), 400
 
         db = get_database()
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
         # Determine which user the account is for
         if user['role'] == 'parent' and target_user_id:
@@ -235,9 +377,10 @@ def create_app():
         is_first = current_count == 0
         db.execute(
             'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-            (creating_for_user_id, 'checking', nickname, 1 if is_first else 0, 0.00)
+            (creating_for_user_id, 'checking', nickname, 1 if is_first else 0, 0)
         )
         account_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+        record_balance_snapshots(db, [account_id])
 
         db.commit()
         return jsonify({
@@ -262,7 +405,7 @@ def create_app():
         if not account:
             return jsonify({'error': 'Account not found'}), 404
 
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
         # Check permission
         if user['role'] != 'parent' and account['user_id'] != session['user_id']:
@@ -292,7 +435,7 @@ def create_app():
         if not account:
             return jsonify({'error': 'Account not found'}), 404
 
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
         # Check permission
         if user['role'] != 'parent' and account['user_id'] != session['user_id']:
@@ -313,38 +456,127 @@ def create_app():
     @app.route('/api/accounts/<int:account_id>/transactions')
     @login_required
     def api_account_transactions(account_id):
+        page, error = transactions_page(
+            get_database(), current_user(), account_id,
+            request.args.get('limit', 50, type=int), request.args.get('cursor')
+        )
+        if error:
+            return jsonify({'error': error[0]}), error[1]
+        return jsonify(page)
+
+    @app.route('/api/accounts/<int:account_id>/balance-history')
+    @login_required
+    def api_account_balance_history(account_id):
+        """Daily closing balances for an account, served from balance_snapshots."""
         db = get_database()
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
-        # Verify access
         account = db.execute('SELECT * FROM accounts WHERE id = ?', (account_id,)).fetchone()
         if not account:
             return jsonify({'error': 'Account not found'}), 404
         if user['role'] != 'parent' and account['user_id'] != session['user_id']:
             return jsonify({'error': 'Access denied'}), 403
 
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        try:
+            end = date.fromisoformat(request.args['end']) if 'end' in request.args else date.today()
+            start = date.fromisoformat(request.args['start']) if 'start' in request.args else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
 
-        transactions = db.execute('''
-            SELECT t.*,
-                fa.account_type as from_account_type,
-                fu.display_name as from_user_name,
-                ta.account_type as to_account_type,
-                tu.display_name as to_user_name,
-                ru.display_name as reviewer_name
-            FROM transactions t
-            LEFT JOIN accounts fa ON t.from_account_id = fa.id
-            LEFT JOIN users fu ON fa.user_id = fu.id
-            LEFT JOIN accounts ta ON t.to_account_id = ta.id
-            LEFT JOIN users tu ON ta.user_id = tu.id
-            LEFT JOIN users ru ON t.reviewed_by = ru.id
-            WHERE t.from_account_id = ? OR t.to_account_id = ?
-            ORDER BY t.created_at DESC
-            LIMIT ? OFFSET ?
-        ''', (account_id, account_id, limit, offset)).fetchall()
+        if start > end:
+            return jsonify({'error': 'start must be on or before end'}), 400
+        if (end - start).days >= MAX_BALANCE_HISTORY_DAYS:
+            return jsonify({'error': f'Date range is limited to {MAX_BALANCE_HISTORY_DAYS} days'}), 400
 
-        return jsonify([dict(t) for t in transactions])
+        return jsonify({
+            'account_id': account_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'series': [money_json(point) for point in get_balance_series(db, account_id, start, end)]
+        })
+
+    def requested_account_ids(db, user):
+        """
+        Resolve the repeatable account_id query param for read-only reports.
+
+        Returns:
+            Tuple of (account ids, None) or (None, error response)
+        """
+        requested, error = parse_account_ids(request.args.getlist('account_id'))
+        if error is None:
+            account_ids, error = resolve_account_ids(db, user, requested)
+        if error:
+            return None, (jsonify({'error': error[0]}), error[1])
+        return account_ids, None
+
+    @app.route('/api/export')
+    @login_required
+    def api_export():
+        """
+        Download a statement as CSV or NDJSON, streamed row batch by row batch.
+
+        Query params: format (csv|ndjson), account_id (repeatable; defaults to
+        every kid account for parents and the kid's own accounts otherwise),
+        start and end (inclusive YYYY-MM-DD, both optional).
+        """
+        from app.export import stream_statement, parse_export_request, statement_filename, EXPORT_FORMATS
+
+        db = get_database()
+        user = current_user()
+
+        fmt = request.args.get('format', 'csv')
+        bounds, error = parse_export_request(fmt, request.args.get('start'), request.args.get('end'))
+        if error:
+            return jsonify({'error': error[0]}), error[1]
+        start, end = bounds
+
+        account_ids, error = requested_account_ids(db, user)
+        if error:
+            return error
+
+        filename = statement_filename(fmt)
+        open_db = functools.partial(get_db, g.db_pool.path)
+        response = Response(stream_statement(open_db, account_ids, start, end, fmt), mimetype=EXPORT_FORMATS[fmt][0])
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @app.route('/api/analytics/categories')
+    @login_required
+    def api_category_analytics():
+        """
+        Money in and out by category, answered from the monthly rollups.
+
+        Query params: account_id (repeatable, same defaults as /api/export),
+        end (YYYY-MM, default this month) and months (default 6).
+        """
+        from app.analytics import get_category_summary, month_key, months_back, MAX_ANALYTICS_MONTHS
+
+        db = get_database()
+        user = current_user()
+
+        try:
+            end_month = month_key(request.args.get('end', date.today().strftime('%Y-%m')))
+        except ValueError:
+            return jsonify({'error': 'end must be YYYY-MM'}), 400
+        months = request.args.get('months', 6, type=int)
+        if not 1 <= months <= MAX_ANALYTICS_MONTHS:
+            return jsonify({'error': f'months must be between 1 and {MAX_ANALYTICS_MONTHS}'}), 400
+        start_month = months_back(end_month, months)
+
+        account_ids, error = requested_account_ids(db, user)
+        if error:
+            return error
+
+        summary = get_category_summary(db, account_ids, start_month, end_month)
+        for category in summary['categories']:
+            category['spent'] = to_dollars(category['spent'])
+            category['received'] = to_dollars(category['received'])
+        return jsonify({
+            'start': start_month,
+            'end': end_month,
+            'categories': summary['categories'],
+            'months': [money_json(bucket) for bucket in summary['months']],
+        })
 
     # ── Transaction API ──────────────────────────────────────────────
 
@@ -354,9 +586,12 @@ def create_app():
         """Parent deposits money into a kid's account."""
         data = request.get_json()
         to_account_id = data.get('to_account_id')
-        amount = data.get('amount', 0)
         category = data.get('category', 'General')
         description = data.get('description', '')
+        try:
+            amount = to_cents(data.get('amount', 0))
+        except ValueError:
+            return jsonify({'error': 'Invalid deposit'}), 400
 
         if not to_account_id or amount <= 0:
             return jsonify({'error': 'Invalid deposit'}), 400
@@ -375,20 +610,104 @@ def create_app():
         if not vault:
             return jsonify({'error': 'Parent vault not found'}), 500
 
-        # Create transaction
-        db.execute('''
-            INSERT INTO transactions (from_account_id, to_account_id, amount, transaction_type, category, description, status)
-            VALUES (?, ?, ?, 'parent_deposit', ?, ?, 'completed')
-        ''', (vault['id'], to_account_id, amount, category, description))
+        def deposit(db):
+            db.execute('''
+                INSERT INTO transactions (from_account_id, to_account_id, amount, transaction_type, category, description, status)
+                VALUES (?, ?, ?, 'parent_deposit', ?, ?, 'completed')
+            ''', (vault['id'], to_account_id, amount, category, description))
+            credit(db, to_account_id, amount)
+            record_balance_snapshots(db, [to_account_id])
 
-        # Update balance
-        db.execute(
-            'UPDATE accounts SET balance = balance + ? WHERE id = ?',
-            (amount, to_account_id)
-        )
+        run_in_transaction(db, deposit)
+        publish_balances(db, [to_account_id])
+        return jsonify({'success': True, 'message': f'{format_money(amount)} deposited successfully'})
 
-        db.commit()
-        return jsonify({'success': True, 'message': f'${amount:.2f} deposited successfully'})
+    @app.route('/api/transactions/batch', methods=['POST'])
+    @parent_required
+    def api_batch_deposit():
+        """
+        Deposit into several accounts at once (e.g. chore money for every kid).
+
+        Every item is validated first; if any is invalid nothing is written and
+        the per-item results say why. Otherwise all deposits are applied in one
+        transaction with a single commit.
+        """
+        data = request.get_json() or {}
+        items = data.get('deposits')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'No deposits given'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} deposits per batch'}), 400
+
+        def batch_deposit(db):
+            vault = db.execute(
+                "SELECT id FROM accounts WHERE user_id = ? AND account_type = 'parent_vault'",
+                (session['user_id'],)
+            ).fetchone()
+            if not vault:
+                return None, None
+
+            account_ids = [item.get('to_account_id') for item in items if isinstance(item, dict)]
+            account_ids = [account_id for account_id in account_ids if is_row_id(account_id)]
+            placeholders = ','.join('?' * len(account_ids))
+            # Only kids' accounts take deposits; the vault is where they come from
+            known_accounts = {row['id'] for row in db.execute(f'''
+                SELECT a.id FROM accounts a JOIN users u ON u.id = a.user_id
+                WHERE a.id IN ({placeholders}) AND u.role = 'kid'
+            ''', account_ids)}
+
+            results = []
+            deposits = []
+            for index, item in enumerate(items):
+                if not isinstance(item, dict):
+                    results.append(item_result(index, 'Invalid deposit'))
+                    continue
+                to_account_id = item.get('to_account_id')
+                try:
+                    amount = to_cents(item.get('amount', 0))
+                except ValueError:
+                    amount = 0
+                if not is_row_id(to_account_id) or amount <= 0:
+                    results.append(item_result(index, 'Invalid deposit'))
+                elif to_account_id not in known_accounts:
+                    results.append(item_result(index, 'Account not found'))
+                else:
+                    results.append(item_result(index))
+                    deposits.append((index, to_account_id, amount,
+                                     item.get('category', 'General'), item.get('description', '')))
+
+            # Nothing is written unless every item is valid
+            if len(deposits) < len(items):
+                return results, None
+
+            balance_changes = {}
+            for index, to_account_id, amount, category, description in deposits:
+                cursor = db.execute('''
+                    INSERT INTO transactions (from_account_id, to_account_id, amount, transaction_type, category, description, status)
+                    VALUES (?, ?, ?, 'parent_deposit', ?, ?, 'completed')
+                ''', (vault['id'], to_account_id, amount, category, description))
+                results[index]['transaction_id'] = cursor.lastrowid
+                balance_changes[to_account_id] = balance_changes.get(to_account_id, 0) + amount
+
+            for account_id, amount in balance_changes.items():
+                credit(db, account_id, amount)
+            record_balance_snapshots(db, balance_changes)
+            return results, balance_changes
+
+        db = get_database()
+        results, balance_changes = run_in_transaction(db, batch_deposit)
+        if results is None:
+            return jsonify({'error': 'Parent vault not found'}), 500
+        if balance_changes is None:
+            return batch_failure(results)
+
+        publish_balances(db, balance_changes)
+        total = sum(balance_changes.values())
+        return jsonify({
+            'success': True,
+            'message': f'{format_money(total)} deposited into {len(balance_changes)} account(s)',
+            'results': results
+        })
 
     @app.route('/api/transactions/withdraw', methods=['POST'])
     @login_required
@@ -396,9 +715,12 @@ def create_app():
         """Kid requests a withdrawal (may require approval)."""
         data = request.get_json()
         from_account_id = data.get('from_account_id')
-        amount = data.get('amount', 0)
         category = data.get('category', 'General')
         description = data.get('description', '')
+        try:
+            amount = to_cents(data.get('amount', 0))
+        except ValueError:
+            return jsonify({'error': 'Invalid withdrawal'}), 400
 
         if not from_account_id or amount <= 0:
             return jsonify({'error': 'Invalid withdrawal'}), 400
@@ -408,18 +730,23 @@ def create_app():
         if not account:
             return jsonify({'error': 'Account not found'}), 404
 
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
         # Verify ownership (kids can only withdraw from own accounts)
         if user['role'] != 'parent' and account['user_id'] != session['user_id']:
             return jsonify({'error': 'Access denied'}), 403
 
+        # Early answer for the kid; completed withdrawals are re-checked by debit()
         if account['balance'] < amount:
             return jsonify({'error': 'Insufficient funds'}), 400
 
         # Check if approval is required
         approval_required = get_setting('withdrawal_approval_required') == 'true'
-        max_no_approval = float(get_setting('max_withdrawal_without_approval') or 0)
+        try:
+            max_no_approval = to_cents(get_setting('max_withdrawal_without_approval') or 0)
+        except ValueError:
+            # A malformed limit (saved before settings were validated) approves nothing on its own
+            max_no_approval = 0
 
         # Parents never need approval
         if user['role'] == 'parent':
@@ -429,28 +756,31 @@ def create_app():
 
         status = 'pending' if needs_approval else 'completed'
 
-        db.execute('''
-            INSERT INTO transactions (from_account_id, amount, transaction_type, category, description, status)
-            VALUES (?, ?, 'withdrawal', ?, ?, ?)
-        ''', (from_account_id, amount, category, description, status))
-
-        if not needs_approval:
-            db.execute(
-                'UPDATE accounts SET balance = balance - ? WHERE id = ?',
-                (amount, from_account_id)
-            )
+        def withdraw(db):
+            if not needs_approval:
+                debit(db, from_account_id, amount)
+                record_balance_snapshots(db, [from_account_id])
+            db.execute('''
+                INSERT INTO transactions (from_account_id, amount, transaction_type, category, description, status)
+                VALUES (?, ?, 'withdrawal', ?, ?, ?)
+            ''', (from_account_id, amount, category, description, status))
 
-        db.commit()
+        try:
+            run_in_transaction(db, withdraw)
+        except InsufficientFunds:
+            return jsonify({'error': 'Insufficient funds'}), 400
 
         if needs_approval:
+            publish_pending_count(db)
             return jsonify({
                 'success': True,
-                'message': f'Withdrawal of ${amount:.2f} submitted for parent approval',
+                'message': f'Withdrawal of {format_money(amount)} submitted for parent approval',
                 'status': 'pending'
             })
+        publish_balances(db, [from_account_id])
         return jsonify({
             'success': True,
-            'message': f'${amount:.2f} withdrawn successfully',
+            'message': f'{format_money(amount)} withdrawn successfully',
             'status': 'completed'
         })
 
@@ -461,8 +791,11 @@ def create_app():
         data = request.get_json()
         from_account_id = data.get('from_account_id')
         to_account_id = data.get('to_account_id')
-        amount = data.get('amount', 0)
         description = data.get('description', 'Transfer')
+        try:
+            amount = to_cents(data.get('amount', 0))
+        except ValueError:
+            return jsonify({'error': 'Invalid transfer'}), 400
 
         if not from_account_id or not to_account_id or amount <= 0:
             return jsonify({'error': 'Invalid transfer'}), 400
@@ -477,27 +810,44 @@ def create_app():
         if not from_acct or not to_acct:
             return jsonify({'error': 'Account not found'}), 404
 
-        user = db.execute('SELECT role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        user = current_user()
 
         # Kids can only transfer between their own accounts
         if user['role'] != 'parent':
             if from_acct['user_id'] != session['user_id'] or to_acct['user_id'] != session['user_id']:
                 return jsonify({'error': 'You can only transfer between your own accounts'}), 403
 
-        if from_acct['account_type'] != 'parent_vault' and from_acct['balance'] < amount:
-            return jsonify({'error': 'Insufficient funds'}), 400
+        def transfer(db):
+            if from_acct['account_type'] != 'parent_vault':
+                debit(db, from_account_id, amount)
+            credit(db, to_account_id, amount)
+            db.execute('''
+                INSERT INTO transactions (from_account_id, to_account_id, amount, transaction_type, category, description, status)
+                VALUES (?, ?, ?, 'transfer', 'Transfer', ?, 'completed')
+            ''', (from_account_id, to_account_id, amount, description))
+            record_balance_snapshots(db, [from_account_id, to_account_id])
 
-        db.execute('''
-            INSERT INTO transactions (from_account_id, to_account_id, amount, transaction_type, category, description, status)
-            VALUES (?, ?, ?, 'transfer', 'Transfer', ?, 'completed')
-        ''', (from_account_id, to_account_id, amount, description))
+        try:
+            run_in_transaction(db, transfer)
+        except InsufficientFunds:
+            return jsonify({'error': 'Insufficient funds'}), 400
+        publish_balances(db, [from_account_id, to_account_id])
+        return jsonify({'success': True, 'message': f'{format_money(amount)} transferred successfully'})
 
-        if from_acct['account_type'] != 'parent_vault':
-            db.execute('UPDATE accounts SET balance = balance - ? WHERE id = ?', (amount, from_account_id))
-        db.execute('UPDATE accounts SET balance = balance + ? WHERE id = ?', (amount, to_account_id))
+    # ── Events API ───────────────────────────────────────────────────
 
-        db.commit()
-        return jsonify({'success': True, 'message': f'${amount:.2f} transferred successfully'})
+    @app.route('/api/events')
+    @login_required
+    def api_events():
+        """Server-Sent Events stream of changes relevant to the signed-in user."""
+        user = current_user()
+        subscription = change_bus.subscribe(user['id'], user['role'], request.headers.get('Last-Event-ID'), scope=g.tenant)
+        if subscription is None:
+            return jsonify({'error': 'Too many event streams'}), 503
+        response = Response(stream_events(change_bus, subscription), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
 
     # ── Approval API ─────────────────────────────────────────────────
 
@@ -513,30 +863,114 @@ def create_app():
             WHERE t.status = 'pending'
             ORDER BY t.created_at DESC
         ''').fetchall()
-        return jsonify([dict(p) for p in pending])
+        return jsonify([money_json(p) for p in pending])
 
     @app.route('/api/transactions/<int:txn_id>/approve', methods=['POST'])
     @parent_required
     def api_approve(txn_id):
         db = get_database()
-        txn = db.execute('SELECT * FROM transactions WHERE id = ? AND status = ?', (txn_id, 'pending')).fetchone()
+
+        def approve(db):
+            # Read under the write lock so a concurrent approve or reject can't slip in
+            txn = db.execute('SELECT * FROM transactions WHERE id = ? AND status = ?', (txn_id, 'pending')).fetchone()
+            if not txn:
+                return None
+            db.execute('''
+                UPDATE transactions SET status = 'approved', reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (session['user_id'], txn_id))
+            debit(db, txn['from_account_id'], txn['amount'])
+            record_balance_snapshots(db, [txn['from_account_id']])
+            return txn
+
+        try:
+            txn = run_in_transaction(db, approve)
+        except InsufficientFunds:
+            return jsonify({'error': 'Insufficient funds in account'}), 400
         if not txn:
             return jsonify({'error': 'Transaction not found or already processed'}), 404
 
-        account = db.execute('SELECT * FROM accounts WHERE id = ?', (txn['from_account_id'],)).fetchone()
-        if account['balance'] < txn['amount']:
-            return jsonify({'error': 'Insufficient funds in account'}), 400
+        account = db.execute('SELECT user_id FROM accounts WHERE id = ?', (txn['from_account_id'],)).fetchone()
+        change_bus.publish('review', {'transaction_id': txn_id, 'status': 'approved', 'amount': to_dollars(txn['amount'])},
+                           user_ids=[account['user_id']], scope=g.tenant)
+        publish_balances(db, [txn['from_account_id']])
+        publish_pending_count(db)
+        return jsonify({'success': True, 'message': 'Withdrawal approved'})
 
-        db.execute('''
-            UPDATE transactions SET status = 'approved', reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (session['user_id'], txn_id))
+    @app.route('/api/transactions/approve-batch', methods=['POST'])
+    @parent_required
+    def api_approve_batch():
+        """
+        Approve several pending withdrawals at once, all or nothing.
 
-        db.execute('UPDATE accounts SET balance = balance - ? WHERE id = ?',
-                   (txn['amount'], txn['from_account_id']))
+        Funds are checked cumulatively, so two requests against the same
+        account are only approved together if the balance covers both.
+        """
+        data = request.get_json() or {}
+        txn_ids = data.get('transaction_ids')
+        if not isinstance(txn_ids, list) or not txn_ids:
+            return jsonify({'error': 'No transactions given'}), 400
+        if len(txn_ids) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} transactions per batch'}), 400
+
+        def approve_batch(db):
+            valid_ids = [txn_id for txn_id in txn_ids if is_row_id(txn_id)]
+            placeholders = ','.join('?' * len(valid_ids))
+            pending = {row['id']: row for row in db.execute(f'''
+                SELECT t.id, t.amount, t.from_account_id, a.balance, a.user_id
+                FROM transactions t
+                JOIN accounts a ON t.from_account_id = a.id
+                WHERE t.id IN ({placeholders}) AND t.status = 'pending'
+            ''', valid_ids)}
+
+            results = []
+            remaining = {}
+            approved = {}
+            for index, txn_id in enumerate(txn_ids):
+                txn = pending.get(txn_id) if is_row_id(txn_id) else None
+                if txn is None:
+                    results.append(item_result(index, 'Transaction not found or already processed'))
+                elif txn_id in approved:
+                    results.append(item_result(index, 'Duplicate transaction'))
+                else:
+                    approved[txn_id] = txn
+                    available = remaining.get(txn['from_account_id'], txn['balance'])
+                    if available < txn['amount']:
+                        results.append(item_result(index, 'Insufficient funds in account'))
+                    else:
+                        remaining[txn['from_account_id']] = available - txn['amount']
+                        results.append({**item_result(index), 'transaction_id': txn_id})
+
+            # Nothing is written unless every item can be approved
+            if any(result['status'] == 'error' for result in results):
+                return results, None, None
+
+            db.executemany('''
+                UPDATE transactions SET status = 'approved', reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', [(session['user_id'], txn_id) for txn_id in approved])
+            balance_changes = {}
+            for txn in approved.values():
+                balance_changes[txn['from_account_id']] = balance_changes.get(txn['from_account_id'], 0) + txn['amount']
+            for account_id, amount in balance_changes.items():
+                debit(db, account_id, amount)
+            record_balance_snapshots(db, balance_changes)
+            return results, list(approved.values()), balance_changes
 
-        db.commit()
-        return jsonify({'success': True, 'message': 'Withdrawal approved'})
+        db = get_database()
+        try:
+            results, approved, balance_changes = run_in_transaction(db, approve_batch)
+        except InsufficientFunds:
+            return jsonify({'error': 'Insufficient funds in account'}), 400
+        if approved is None:
+            return batch_failure(results)
+
+        for txn in approved:
+            change_bus.publish('review', {'transaction_id': txn['id'], 'status': 'approved', 'amount': to_dollars(txn['amount'])},
+                               user_ids=[txn['user_id']], scope=g.tenant)
+        publish_balances(db, balance_changes)
+        publish_pending_count(db)
+        return jsonify({'success': True, 'message': f'{len(approved)} withdrawal(s) approved', 'results': results})
 
     @app.route('/api/transactions/<int:txn_id>/reject', methods=['POST'])
     @parent_required
@@ -545,17 +979,25 @@ def create_app():
         data = request.get_json() or {}
         reason = data.get('reason', '')
 
-        txn = db.execute('SELECT * FROM transactions WHERE id = ? AND status = ?', (txn_id, 'pending')).fetchone()
+        def reject(db):
+            txn = db.execute('SELECT * FROM transactions WHERE id = ? AND status = ?', (txn_id, 'pending')).fetchone()
+            if txn:
+                db.execute('''
+                    UPDATE transactions SET status = 'rejected', reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP,
+                    description = CASE WHEN ? != '' THEN description || ' [Rejected: ' || ? || ']' ELSE description END
+                    WHERE id = ?
+                ''', (session['user_id'], reason, reason, txn_id))
+            return txn
+
+        txn = run_in_transaction(db, reject)
         if not txn:
             return jsonify({'error': 'Transaction not found or already processed'}), 404
 
-        db.execute('''
-            UPDATE transactions SET status = 'rejected', reviewed_by = ?, reviewed_at = CURRENT_TIMESTAMP,
-            description = CASE WHEN ? != '' THEN description || ' [Rejected: ' || ? || ']' ELSE description END
-            WHERE id = ?
-        ''', (session['user_id'], reason, reason, txn_id))
-
-        db.commit()
+        owner = db.execute('SELECT user_id FROM accounts WHERE id = ?', (txn['from_account_id'],)).fetchone()
+        if owner:
+            change_bus.publish('review', {'transaction_id': txn_id, 'status': 'rejected', 'amount': to_dollars(txn['amount'])},
+                               user_ids=[owner['user_id']], scope=g.tenant)
+        publish_pending_count(db)
         return jsonify({'success': True, 'message': 'Withdrawal rejected'})
 
     # ── Admin API (Parents) ──────────────────────────────────────────
@@ -587,6 +1029,8 @@ def create_app():
         if role not in ('parent', 'kid'):
             return jsonify({'error': 'Invalid role'}), 400
 
+        from werkzeug.security import generate_password_hash
+
         db = get_database()
         existing = db.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()
         if existing:
@@ -602,22 +1046,22 @@ def create_app():
             # Create checking and savings accounts with default nicknames
             db.execute(
                 'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-                (user_id, 'checking', 'Main', 1, 0.00)
+                (user_id, 'checking', 'Main', 1, 0)
             )
             checking_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
 
             db.execute(
                 'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-                (user_id, 'savings', 'Savings', 1, 0.00)
+                (user_id, 'savings', 'Savings', 1, 0)
             )
             savings_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+            record_balance_snapshots(db, [checking_id, savings_id])
 
             # Create default allowance config
-            from datetime import date
             next_monday = date.today() + timedelta(days=(7 - date.today().weekday()))
             db.execute(
                 'INSERT INTO allowance_config (user_id, amount, frequency, next_payment_date, active) VALUES (?, ?, ?, ?, ?)',
-                (user_id, 0.00, 'weekly', next_monday.isoformat(), 0)
+                (user_id, 0, 'weekly', next_monday.isoformat(), 0)
             )
             allowance_config_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
 
@@ -635,7 +1079,7 @@ def create_app():
         elif role == 'parent':
             db.execute(
                 'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-                (user_id, 'parent_vault', 'Vault', 1, 999999999.00)
+                (user_id, 'parent_vault', 'Vault', 1, PARENT_VAULT_BALANCE)
             )
 
         db.commit()
@@ -662,6 +1106,7 @@ def create_app():
         # Reset password if provided
         new_password = data.get('new_password')
         if new_password and len(new_password) >= 4:
+            from werkzeug.security import generate_password_hash
             db.execute(
                 'UPDATE users SET password_hash = ? WHERE id = ?',
                 (generate_password_hash(new_password), user_id)
@@ -693,6 +1138,7 @@ def create_app():
         db.execute('DELETE FROM users WHERE id = ?', (user_id,))
 
         db.commit()
+        users_version.invalidate(g.db_pool.path)
         return jsonify({'success': True, 'message': f'User {user["display_name"]} deleted'})
 
     # ── Allowance Config API ─────────────────────────────────────────
@@ -707,46 +1153,38 @@ def create_app():
             JOIN users u ON ac.user_id = u.id
             ORDER BY u.display_name
         ''').fetchall()
-        return jsonify([dict(c) for c in configs])
+        return jsonify([money_json(c) for c in configs])
 
     @app.route('/api/admin/allowances/<int:config_id>', methods=['PUT'])
     @parent_required
     def api_update_allowance(config_id):
+        data = request.get_json()
+        db = get_database()
+
+        config = db.execute('SELECT * FROM allowance_config WHERE id = ?', (config_id,)).fetchone()
+        if not config:
+            return jsonify({'error': 'Config not found'}), 404
+
         try:
-            data = request.get_json()
-            db = get_database()
-
-            config = db.execute('SELECT * FROM allowance_config WHERE id = ?', (config_id,)).fetchone()
-            if not config:
-                return jsonify({'error': 'Config not found'}), 404
-
-            amount = data.get('amount', config['amount'])
-            frequency = data.get('frequency', config['frequency'])
-            target = data.get('target_account_type', config['target_account_type'])
-            active = data.get('active', config['active'])
-            next_date = data.get('next_payment_date', config['next_payment_date'])
-            day_of_week = data.get('day_of_week', config['day_of_week'])
-            day_of_month = data.get('day_of_month', config['day_of_month'])
-
-            print(f"DEBUG: Updating allowance {config_id}")
-            print(f"  amount={amount}, frequency={frequency}")
-            print(f"  day_of_week={day_of_week}, day_of_month={day_of_month}")
-            print(f"  next_date={next_date}")
+            amount = to_cents(data['amount']) if 'amount' in data else config['amount']
+        except ValueError:
+            return jsonify({'error': 'Invalid amount'}), 400
+        frequency = data.get('frequency', config['frequency'])
+        target = data.get('target_account_type', config['target_account_type'])
+        active = data.get('active', config['active'])
+        next_date = data.get('next_payment_date', config['next_payment_date'])
+        day_of_week = data.get('day_of_week', config['day_of_week'])
+        day_of_month = data.get('day_of_month', config['day_of_month'])
 
-            db.execute('''
-                UPDATE allowance_config
-                SET amount = ?, frequency = ?, target_account_type = ?, active = ?, next_payment_date = ?,
-                    day_of_week = ?, day_of_month = ?
-                WHERE id = ?
-            ''', (amount, frequency, target, active, next_date, day_of_week, day_of_month, config_id))
+        db.execute('''
+            UPDATE allowance_config
+            SET amount = ?, frequency = ?, target_account_type = ?, active = ?, next_payment_date = ?,
+                day_of_week = ?, day_of_month = ?
+            WHERE id = ?
+        ''', (amount, frequency, target, active, next_date, day_of_week, day_of_month, config_id))
 
-            db.commit()
-            return jsonify({'success': True})
-        except Exception as e:
-            print(f"ERROR in api_update_allowance: {e}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({'error': str(e)}), 500
+        db.commit()
+        return jsonify({'success': True})
 
     @app.route('/api/admin/allowances/<int:config_id>/splits')
     @parent_required
@@ -766,7 +1204,7 @@ def create_app():
             ORDER BY a.account_type, s.percentage DESC
         ''', (config_id,)).fetchall()
 
-        return jsonify([dict(s) for s in splits])
+        return jsonify([money_json(s) for s in splits])
 
     @app.route('/api/admin/allowances/<int:config_id>/splits', methods=['PUT'])
     @parent_required
@@ -858,14 +1296,23 @@ def create_app():
     @app.route('/api/admin/settings')
     @parent_required
     def api_get_settings():
-        db = get_database()
-        settings = db.execute('SELECT key, value FROM settings').fetchall()
-        return jsonify({s['key']: s['value'] for s in settings})
+        return jsonify(get_settings())
 
     @app.route('/api/admin/settings', methods=['PUT'])
     @parent_required
     def api_update_settings():
         data = request.get_json()
+        for key in MONEY_SETTINGS:
+            if key in data:
+                try:
+                    cents = to_cents(data[key])
+                except ValueError:
+                    cents = -1
+                if cents < 0:
+                    return jsonify({'error': f'Invalid {key}'}), 400
+                # Stored as plain dollars, rounded to the cent
+                data[key] = format_amount(cents)
+
         db = get_database()
         for key, value in data.items():
             db.execute(
@@ -873,73 +1320,78 @@ def create_app():
                 (key, str(value))
             )
         db.commit()
+        settings_cache.invalidate(g.db_pool.path)
+        g.pop('settings', None)
         return jsonify({'success': True})
 
+    @app.route('/api/admin/db-pool')
+    @parent_required
+    def api_db_pool_stats():
+        return jsonify(get_pool().stats())
+
+    @app.route('/api/admin/job-runs')
+    @parent_required
+    def api_job_runs():
+        db = get_database()
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        runs = db.execute('''
+            SELECT job_name, holder, started_at, duration_ms, status, result, error
+            FROM job_runs ORDER BY id DESC LIMIT ?
+        ''', (limit,)).fetchall()
+        lease = db.execute('SELECT holder, expires_at, acquired_at FROM scheduler_lease').fetchone()
+        return jsonify({
+            'runs': [dict(r) for r in runs],
+            'leader': dict(lease) if lease else None
+        })
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """
+        Prometheus-style request, SQL and pool metrics for this process.
+
+        Scrapers authenticate with `Authorization: Bearer $METRICS_TOKEN`;
+        without METRICS_TOKEN set, a signed-in parent can read it.
+        """
+        token = os.environ.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+                return jsonify({'error': 'Not authenticated'}), 401
+        else:
+            user = current_user()
+            if user is None:
+                return jsonify({'error': 'Not authenticated'}), 401
+            if user['role'] != 'parent':
+                return jsonify({'error': 'Parent access required'}), 403
+
+        pool = pool_totals()
+        gauges = {
+            'familybank_db_pools': ('Databases with an open connection pool', pool['pools']),
+            'familybank_db_pool_in_use': ('Pooled connections checked out', pool['in_use']),
+            'familybank_db_pool_size': ('Pooled connections open', pool['size']),
+            'familybank_db_pool_waits': ('Requests that have waited for a connection', pool['waits']),
+            'familybank_event_streams': ('Open /api/events streams', change_bus.subscriber_count()),
+        }
+        return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
     # ── Categories API ───────────────────────────────────────────────
 
     @app.route('/api/categories')
     @login_required
     def api_categories():
-        db = get_database()
-        categories = db.execute('SELECT * FROM categories ORDER BY name').fetchall()
-        return jsonify([dict(c) for c in categories])
+        version, categories = categories_cache.get(get_database(), g.db_pool.path)
+        response = jsonify(categories)
+        response.set_etag(f'categories-{version}')
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     # ── Dashboard Stats API ──────────────────────────────────────────
 
     @app.route('/api/dashboard')
     @login_required
     def api_dashboard():
-        db = get_database()
-        user = db.execute('SELECT * FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-
-        if user['role'] == 'parent':
-            # Get all kid accounts with recent activity
-            kids = db.execute("SELECT * FROM users WHERE role = 'kid' ORDER BY display_name").fetchall()
-            kid_data = []
-            for kid in kids:
-                accounts = db.execute(
-                    'SELECT * FROM accounts WHERE user_id = ?', (kid['id'],)
-                ).fetchall()
-                kid_data.append({
-                    'user': dict(kid),
-                    'accounts': [dict(a) for a in accounts]
-                })
-
-            pending_count = db.execute(
-                "SELECT COUNT(*) as count FROM transactions WHERE status = 'pending'"
-            ).fetchone()['count']
-
-            return jsonify({
-                'role': 'parent',
-                'kids': kid_data,
-                'pending_approvals': pending_count
-            })
-        else:
-            # Kid dashboard
-            accounts = db.execute(
-                'SELECT * FROM accounts WHERE user_id = ?', (session['user_id'],)
-            ).fetchall()
-
-            recent = db.execute('''
-                SELECT t.*, fa.account_type as from_type, ta.account_type as to_type
-                FROM transactions t
-                LEFT JOIN accounts fa ON t.from_account_id = fa.id
-                LEFT JOIN accounts ta ON t.to_account_id = ta.id
-                WHERE fa.user_id = ? OR ta.user_id = ?
-                ORDER BY t.created_at DESC LIMIT 10
-            ''', (session['user_id'], session['user_id'])).fetchall()
-
-            pending = db.execute('''
-                SELECT COUNT(*) as count FROM transactions t
-                JOIN accounts a ON t.from_account_id = a.id
-                WHERE a.user_id = ? AND t.status = 'pending'
-            ''', (session['user_id'],)).fetchone()['count']
-
-            return jsonify({
-                'role': 'kid',
-                'accounts': [dict(a) for a in accounts],
-                'recent_transactions': [dict(t) for t in recent],
-                'pending_withdrawals': pending
-            })
+        return jsonify(dashboard(get_database(), current_user()))
 
+    startup.mark('register routes')
     return app
@@ -0,0 +1,191 @@
+"""Request and SQL instrumentation, exposed in Prometheus text format.
+
+Every request records its latency in a histogram per route, and every
+statement run through an app connection (models.get_db opens them as
+InstrumentedConnection) is counted and timed against the request that ran
+it. The per-request query count histogram makes N+1 patterns stand out: a
+route whose queries grow with the data shows up in the high buckets.
+
+Statements slower than SLOW_QUERY_MS (off unless set) are printed with
+their SQL and EXPLAIN QUERY PLAN, including ones run by the scheduler.
+
+Counters live in the process, so with several gunicorn workers each scrape
+of /metrics reports the worker that answered it.
+"""
+
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# Statements slower than this many milliseconds are logged with their plan (0 = off)
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 0))
+
+# Queries run by the request currently being handled on this thread
+_query_stats = contextvars.ContextVar('query_stats', default=None)
+
+
+class QueryStats:
+    """Number of statements and seconds spent in SQLite for one request."""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+def start_query_stats():
+    """Begin counting queries on this thread; returns (stats, reset token)."""
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def stop_query_stats(token):
+    _query_stats.reset(token)
+
+
+def _log_slow_query(db, sql, parameters, elapsed):
+    plan = ''
+    if parameters is not None:
+        try:
+            rows = sqlite3.Connection.execute(db, f'EXPLAIN QUERY PLAN {sql}', parameters).fetchall()
+            plan = ''.join(f"\n    {row[3]}" for row in rows)
+        except sqlite3.Error:
+            pass
+    print(f"🐢 Slow query ({elapsed * 1000:.1f}ms): {' '.join(sql.split())}{plan}")
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection that times every execute against the current request."""
+
+    def _record(self, sql, parameters, started):
+        elapsed = time.perf_counter() - started
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            _log_slow_query(self, sql, parameters, elapsed)
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(sql, parameters, started)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(sql, None, started)
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._record(sql_script, None, started)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (not thread-safe; guarded by the registry lock)."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum:.6f}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Per-route request, status and SQL counters for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._queries = {}
+        self._query_seconds = defaultdict(float)
+        self._responses = defaultdict(int)
+
+    def observe_request(self, method, route, status, seconds, stats):
+        key = (method, route)
+        with self._lock:
+            if key not in self._latency:
+                self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._queries[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self._latency[key].observe(seconds)
+            self._queries[key].observe(stats.count)
+            self._query_seconds[key] += stats.seconds
+            self._responses[(method, route, status)] += 1
+
+    def render(self, gauges=None):
+        """
+        Render every metric in Prometheus text exposition format.
+
+        Args:
+            gauges: Optional {name: (help, value)} of point-in-time values
+                to append, such as connection pool occupancy
+        """
+        lines = []
+        with self._lock:
+            lines += ['# HELP familybank_request_duration_seconds Request latency by route',
+                      '# TYPE familybank_request_duration_seconds histogram']
+            for (method, route), histogram in sorted(self._latency.items()):
+                lines += histogram.lines('familybank_request_duration_seconds',
+                                         f'method="{method}",route="{_label(route)}"')
+
+            lines += ['# HELP familybank_requests_total Responses by route and status',
+                      '# TYPE familybank_requests_total counter']
+            for (method, route, status), count in sorted(self._responses.items()):
+                lines.append(f'familybank_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+
+            lines += ['# HELP familybank_request_queries SQL statements run per request',
+                      '# TYPE familybank_request_queries histogram']
+            for (method, route), histogram in sorted(self._queries.items()):
+                lines += histogram.lines('familybank_request_queries', f'method="{method}",route="{_label(route)}"')
+
+            lines += ['# HELP familybank_request_query_seconds_total Time spent in SQLite by route',
+                      '# TYPE familybank_request_query_seconds_total counter']
+            for (method, route), seconds in sorted(self._query_seconds.items()):
+                lines.append(f'familybank_request_query_seconds_total{{method="{method}",route="{_label(route)}"}} {seconds:.6f}')
+
+        for name, (help_text, value) in (gauges or {}).items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
@@ -1,79 +1,503 @@
 """Database models and initialization for Family Bank."""
 
+import contextvars
+import hashlib
 import sqlite3
 import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
 from datetime import datetime
-from werkzeug.security import generate_password_hash
+from app.metrics import InstrumentedConnection
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 DATABASE_PATH = os.environ.get('DATABASE_PATH', 'family_bank.db')
 
+# Multi-family hosting: one database per household in this directory
+# (see app/tenants.py). Unset means a single database at DATABASE_PATH.
+TENANTS_DIR = os.environ.get('TENANTS_DIR') or None
+
+# Parent vaults are effectively unlimited ($999,999,999.00, in cents)
+PARENT_VAULT_BALANCE = 99999999900
+
+# Request connection pool sizing (per process, per database file)
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+# Most databases with an open pool per process; the least recently used
+# pool is closed beyond this
+MAX_POOLS = int(os.environ.get('DB_MAX_POOLS', 32))
+
+# Connection-level pragmas, applied once when a connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-8000",      # 8 MB page cache
+    "PRAGMA mmap_size=67108864",    # 64 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+# Database the current request or job was routed to (a tenant's file)
+_routed_path = contextvars.ContextVar('routed_database_path', default=None)
+
+
+def current_database_path():
+    """
+    Database file that get_db() and get_pool() use when given no path.
+
+    This is the file the current request or job was routed to with
+    route_database(), or DATABASE_PATH when tenants are not enabled.
+
+    Raises:
+        LookupError: If tenants are enabled and nothing was routed
+    """
+    path = _routed_path.get()
+    if path:
+        return path
+    if TENANTS_DIR:
+        raise LookupError('No family selected for this request')
+    return DATABASE_PATH
+
+
+def route_database(path):
+    """Send this thread's default connections to path; returns a reset token."""
+    return _routed_path.set(path)
 
-def get_db():
-    """Get a database connection with row factory."""
-    db = sqlite3.connect(DATABASE_PATH)
+
+def unroute_database(token):
+    _routed_path.reset(token)
+
+
+def get_db(path=None):
+    """Get a new, fully configured database connection with row factory."""
+    db = sqlite3.connect(path or current_database_path(), check_same_thread=False, factory=InstrumentedConnection)
     db.row_factory = sqlite3.Row
-    db.execute("PRAGMA journal_mode=WAL")
-    db.execute("PRAGMA foreign_keys=ON")
+    for pragma in CONNECTION_PRAGMAS:
+        db.execute(pragma)
     return db
 
 
-def run_migrations():
-    """Run database migrations."""
-    db = get_db()
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of configured SQLite connections.
+
+    Connections are opened lazily up to max_size. A connection is handed to
+    one thread at a time; when all are busy, acquire() waits up to timeout
+    seconds for one to be released. Idle connections are health-checked
+    before reuse and replaced if they have gone bad.
+    """
+
+    def __init__(self, path, max_size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []
+        self._open_count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._metrics = {'hits': 0, 'opens': 0, 'waits': 0, 'timeouts': 0, 'discards': 0}
+
+    def acquire(self):
+        """Check a connection out of the pool."""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            waited = False
+            while not self._idle and self._open_count >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise TimeoutError(f'Timed out waiting for a database connection to {self.path}')
+                if not waited:
+                    self._metrics['waits'] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+            if self._idle:
+                db = self._idle.pop()
+                if self._is_healthy(db):
+                    self._metrics['hits'] += 1
+                    return db
+                self._metrics['discards'] += 1
+                self._open_count -= 1
+
+            # Reserve the slot before connecting outside the lock
+            self._open_count += 1
+
+        try:
+            db = get_db(self.path)
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._metrics['opens'] += 1
+        return db
+
+    def release(self, db):
+        """Return a connection to the pool, rolling back anything left open."""
+        try:
+            if db.in_transaction:
+                db.rollback()
+            healthy = True
+        except sqlite3.Error:
+            healthy = False
+
+        with self._cond:
+            if self._closed:
+                # Evicted while checked out: don't keep it around
+                healthy = False
+                self._open_count -= 1
+            elif healthy:
+                self._idle.append(db)
+            else:
+                self._metrics['discards'] += 1
+                self._open_count -= 1
+            self._cond.notify()
+
+        if not healthy:
+            db.close()
+
+    def close(self):
+        """Close every idle connection (checked-out ones close on release)."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+        for db in idle:
+            db.close()
+
+    def stats(self):
+        """Snapshot of pool counters and current occupancy."""
+        with self._cond:
+            return dict(
+                self._metrics,
+                size=self._open_count,
+                idle=len(self._idle),
+                in_use=self._open_count - len(self._idle),
+                max_size=self.max_size,
+            )
+
+    @staticmethod
+    def _is_healthy(db):
+        try:
+            db.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+
+_pools = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=None):
+    """
+    Get the process-wide connection pool for a database file.
+
+    Pools are kept for the MAX_POOLS most recently used files, so a worker
+    serving many families holds connections only for the active ones.
+    """
+    path = path or current_database_path()
+    evicted = None
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+            if len(_pools) > MAX_POOLS:
+                evicted = _pools.popitem(last=False)[1]
+        else:
+            _pools.move_to_end(path)
+    if evicted is not None:
+        evicted.close()
+    return pool
+
+
+def close_pools():
+    """Close and forget every pool in this process (before forking workers)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def pool_totals():
+    """Pool counters summed over every database this process has open."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    totals = {'pools': len(pools), 'size': 0, 'in_use': 0, 'waits': 0}
+    for pool in pools:
+        stats = pool.stats()
+        for key in ('size', 'in_use', 'waits'):
+            totals[key] += stats[key]
+    return totals
+
+
+_prepared = set()
+_prepared_lock = threading.Lock()
+_preparing = {}
+
+
+def _preparing_lock(path):
+    """The lock that serializes preparing one database within this process."""
+    with _prepared_lock:
+        return _preparing.setdefault(path, threading.Lock())
+
+
+def prepare_database():
+    """
+    Create, migrate and seed the current database once per process.
+
+    A database that is already current costs one PRAGMA user_version read:
+    init_db, the migration runner and the seed are all skipped, so gunicorn
+    workers start and restart without touching the schema. Otherwise one
+    process at a time (see migration_lock) brings it up to date and stamps
+    user_version with the latest migration.
 
-    # Create migrations table if it doesn't exist
+    Tenant databases are prepared on first use rather than at startup, so a
+    worker only pays for the families it actually serves. Threads wait only
+    for the database they need: one family's first-touch migration doesn't
+    hold up requests for the others.
+    """
+    path = current_database_path()
+    if path in _prepared:
+        return
+    with _preparing_lock(path):
+        if path in _prepared:
+            return
+        latest = latest_migration_version()
+        if _prepared_version(path) < latest:
+            with migration_lock(path):
+                # Another worker may have finished while we waited
+                if _prepared_version(path) < latest:
+                    init_db()
+                    _migrate(path, latest)
+                    seed_demo_data()
+        _prepared.add(path)
+
+
+def _prepared_version(path):
+    db = get_db(path)
+    try:
+        return db.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        db.close()
+
+
+# ── Migrations ───────────────────────────────────────────────────────
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+
+# migrations/NNN_short_description.sql
+MIGRATION_FILE = re.compile(r'^(\d{3})_(\w+)\.sql$')
+
+Migration = namedtuple('Migration', 'version name path')
+
+
+def discover_migrations(directory=None):
+    """Migration files in directory (MIGRATIONS_DIR by default), by version."""
+    directory = directory or MIGRATIONS_DIR
+    found = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            found.append(Migration(int(match.group(1)), filename[:-4], os.path.join(directory, filename)))
+    return sorted(found)
+
+
+def latest_migration_version():
+    migrations = discover_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def _read_migration(migration):
+    """Returns (sql, sha256 checksum) of a migration file."""
+    with open(migration.path, 'rb') as f:
+        raw = f.read()
+    return raw.decode('utf-8'), hashlib.sha256(raw).hexdigest()
+
+
+def _describe(migration):
+    # '003_add_transaction_indexes' -> 'Add transaction indexes'
+    return migration.name.split('_', 1)[1].replace('_', ' ').capitalize()
+
+
+@contextmanager
+def migration_lock(path):
+    """
+    Hold an exclusive lock on a database's schema, across processes.
+
+    Uses flock on a sidecar <database>.migrate-lock file, so a crashed
+    migrator never leaves it held. Where fcntl is unavailable the runner
+    falls back to SQLite's own write lock, which only serializes statements.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.migrate-lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _columns(db, table):
+    return {row[1] for row in db.execute(f'PRAGMA table_info({table})')}
+
+
+def _money_stored_as_real(db):
+    # Databases created after 007 already have INTEGER columns
+    balance_type = next(row[2] for row in db.execute('PRAGMA table_info(accounts)') if row[1] == 'balance')
+    return balance_type.upper() == 'REAL'
+
+
+# Migrations that only apply to some databases: when the check returns
+# False the migration is recorded as applied without running its SQL
+MIGRATION_CONDITIONS = {
+    7: _money_stored_as_real,
+}
+
+ADD_COLUMN = re.compile(r'^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(?:COLUMN\s+)?(\w+)', re.IGNORECASE)
+TRANSACTION_CONTROL = re.compile(r'^\s*(BEGIN|COMMIT|END|ROLLBACK)\b', re.IGNORECASE)
+
+
+def _strip_comments(statement):
+    return '\n'.join(line.split('--', 1)[0] for line in statement.splitlines()).strip()
+
+
+def _split_statements(sql):
+    """Split a migration script into its statements, triggers kept whole."""
+    statements = []
+    statement = ''
+    for line in sql.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if _strip_comments(statement):
+                statements.append(statement)
+            statement = ''
+    if _strip_comments(statement):
+        statements.append(statement)
+    return statements
+
+
+def _apply_migration(db, migration, sql, checksum):
+    """
+    Run one migration and record it, in a single transaction.
+
+    ADD COLUMN statements for columns that already exist are skipped: init_db
+    creates current tables, so early migrations find their columns present.
+    A script with its own BEGIN/COMMIT (007 rebuilds tables with foreign
+    keys off) runs statement by statement and is recorded afterwards.
+    """
+    statements = []
+    for statement in _split_statements(sql):
+        match = ADD_COLUMN.match(_strip_comments(statement))
+        if match and match.group(2) in _columns(db, match.group(1)):
+            continue
+        statements.append(statement)
+    record = ('INSERT OR REPLACE INTO schema_migrations (version, name, checksum) VALUES (?, ?, ?)',
+              (migration.version, migration.name, checksum))
+
+    if any(TRANSACTION_CONTROL.match(_strip_comments(statement)) for statement in statements):
+        try:
+            for statement in statements:
+                db.execute(statement)
+        except Exception:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            db.execute('PRAGMA foreign_keys=ON')
+            raise
+        db.execute(*record)
+        return
+
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        for statement in statements:
+            db.execute(statement)
+        db.execute(*record)
+        db.execute('COMMIT')
+    except Exception:
+        db.execute('ROLLBACK')
+        raise
+
+
+def _apply_migrations(db):
+    """Apply pending migrations on db; the caller holds migration_lock."""
+    db.isolation_level = None
     db.execute('''
         CREATE TABLE IF NOT EXISTS schema_migrations (
             version INTEGER PRIMARY KEY,
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            name TEXT,
+            checksum TEXT
         )
     ''')
+    # Tables from before checksums were recorded
+    for column in ('name', 'checksum'):
+        if column not in _columns(db, 'schema_migrations'):
+            db.execute(f'ALTER TABLE schema_migrations ADD COLUMN {column} TEXT')
 
-    # Check current version
-    current_version_row = db.execute(
-        'SELECT MAX(version) as version FROM schema_migrations'
-    ).fetchone()
-    current_version = current_version_row['version'] if current_version_row['version'] else 0
+    applied = {row[0]: row[1] for row in db.execute('SELECT version, checksum FROM schema_migrations')}
+    for migration in discover_migrations():
+        sql, checksum = _read_migration(migration)
+        if migration.version in applied:
+            recorded = applied[migration.version]
+            if recorded is None:
+                db.execute('UPDATE schema_migrations SET name = ?, checksum = ? WHERE version = ?',
+                           (migration.name, checksum, migration.version))
+            elif recorded != checksum:
+                print(f"⚠️  Migration {migration.version:03d} has changed since it was applied ({migration.name}.sql)")
+            continue
 
-    migrations_dir = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+        condition = MIGRATION_CONDITIONS.get(migration.version)
+        if condition is None or condition(db):
+            _apply_migration(db, migration, sql, checksum)
+        else:
+            db.execute('INSERT INTO schema_migrations (version, name, checksum) VALUES (?, ?, ?)',
+                       (migration.version, migration.name, checksum))
+        print(f"✅ Applied migration {migration.version:03d}: {_describe(migration)}")
 
-    # Migration 1: Add checking account features
-    if current_version < 1 and os.path.exists(os.path.join(migrations_dir, '001_add_checking_account_features.sql')):
-        try:
-            with open(os.path.join(migrations_dir, '001_add_checking_account_features.sql'), 'r') as f:
-                migration_sql = f.read()
-            db.executescript(migration_sql)
-            db.execute('INSERT INTO schema_migrations (version) VALUES (?)', (1,))
-            db.commit()
-            print("✅ Applied migration 001: Add checking account features")
-        except Exception as e:
-            print(f"⚠️  Migration 001 failed (may already be applied): {e}")
-            # Check if columns already exist
-            cursor = db.execute("PRAGMA table_info(accounts)")
-            columns = [row[1] for row in cursor.fetchall()]
-            if 'nickname' in columns:
-                db.execute('INSERT OR IGNORE INTO schema_migrations (version) VALUES (?)', (1,))
-                db.commit()
-
-    # Migration 2: Add allowance schedule preferences
-    if current_version < 2 and os.path.exists(os.path.join(migrations_dir, '002_add_allowance_schedule_preferences.sql')):
-        try:
-            with open(os.path.join(migrations_dir, '002_add_allowance_schedule_preferences.sql'), 'r') as f:
-                migration_sql = f.read()
-            db.executescript(migration_sql)
-            db.execute('INSERT INTO schema_migrations (version) VALUES (?)', (2,))
-            db.commit()
-            print("✅ Applied migration 002: Add allowance schedule preferences")
-        except Exception as e:
-            print(f"⚠️  Migration 002 failed (may already be applied): {e}")
-            # Check if columns already exist
-            cursor = db.execute("PRAGMA table_info(allowance_config)")
-            columns = [row[1] for row in cursor.fetchall()]
-            if 'day_of_week' in columns:
-                db.execute('INSERT OR IGNORE INTO schema_migrations (version) VALUES (?)', (2,))
-                db.commit()
 
-    db.close()
+def _migrate(path, latest):
+    """Apply pending migrations and stamp user_version; the caller holds migration_lock."""
+    db = get_db(path)
+    try:
+        _apply_migrations(db)
+        db.execute(f'PRAGMA user_version = {int(latest)}')
+    finally:
+        db.close()
+
+
+def run_migrations():
+    """
+    Apply pending migrations from migrations/NNN_*.sql in version order.
+
+    Each applied migration is recorded in schema_migrations with its file's
+    sha256 checksum; a file edited after it was applied is reported. Like
+    prepare_database, a database whose user_version is already the latest
+    file costs a single PRAGMA read. Otherwise the runner takes
+    migration_lock, so concurrent workers wait for one of them to migrate
+    instead of racing it.
+    """
+    path = current_database_path()
+    latest = latest_migration_version()
+    if _prepared_version(path) >= latest:
+        return
+
+    with migration_lock(path):
+        if _prepared_version(path) < latest:
+            _migrate(path, latest)
 
 
 def init_db():
@@ -96,7 +520,7 @@ def init_db():
             account_type TEXT NOT NULL CHECK(account_type IN ('checking', 'savings', 'parent_vault')),
             nickname TEXT,
             is_default INTEGER DEFAULT 0,
-            balance REAL DEFAULT 0.00,
+            balance INTEGER NOT NULL DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users(id)
         );
@@ -105,7 +529,7 @@ def init_db():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             from_account_id INTEGER,
             to_account_id INTEGER,
-            amount REAL NOT NULL,
+            amount INTEGER NOT NULL,
             transaction_type TEXT NOT NULL CHECK(transaction_type IN (
                 'deposit', 'withdrawal', 'transfer', 'allowance', 'interest', 'parent_deposit'
             )),
@@ -125,7 +549,7 @@ def init_db():
         CREATE TABLE IF NOT EXISTS allowance_config (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
-            amount REAL NOT NULL DEFAULT 0.00,
+            amount INTEGER NOT NULL DEFAULT 0,
             frequency TEXT NOT NULL DEFAULT 'weekly' CHECK(frequency IN (
                 'weekly', 'biweekly', 'monthly'
             )),
@@ -176,6 +600,14 @@ def init_db():
             FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
             UNIQUE(allowance_config_id, account_id)
         );
+
+        CREATE TABLE IF NOT EXISTS balance_snapshots (
+            account_id INTEGER NOT NULL,
+            snapshot_date TEXT NOT NULL,
+            balance INTEGER NOT NULL,
+            PRIMARY KEY (account_id, snapshot_date),
+            FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
     ''')
 
     # Insert default settings
@@ -223,6 +655,8 @@ def seed_demo_data():
     db = get_db()
     user_count = db.execute('SELECT COUNT(*) FROM users').fetchone()[0]
     if user_count == 0:
+        from werkzeug.security import generate_password_hash
+
         # Create default parent account
         parent_hash = generate_password_hash('changeme')
         db.execute(
@@ -234,7 +668,7 @@ def seed_demo_data():
         # Create parent vault account (unlimited funds)
         db.execute(
             'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-            (parent_id, 'parent_vault', 'Vault', 1, 999999999.00)
+            (parent_id, 'parent_vault', 'Vault', 1, PARENT_VAULT_BALANCE)
         )
 
         db.commit()
@@ -0,0 +1,98 @@
+"""Money helpers: amounts are stored and computed as integer cents.
+
+The database and all internal arithmetic use plain ints counting cents, so
+sums, splits and comparisons are exact. Dollars only exist at the edges:
+request bodies are parsed with to_cents() and JSON responses are rendered
+with to_dollars() / money_json(), which keeps the API unchanged for clients.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Row keys that hold cents and are rendered as dollars in JSON responses
+MONEY_FIELDS = ('balance', 'amount', 'total_balance')
+
+_CENT = Decimal('0.01')
+
+# Largest amount to_cents() accepts, in cents: exact as a float dollar value
+# in JSON and well inside SQLite's 64-bit INTEGER
+MAX_CENTS = 2 ** 53
+
+
+def to_cents(value):
+    """
+    Convert a dollar amount from a request into integer cents.
+
+    Floats are converted through their shortest repr, so 0.1 becomes 10
+    cents rather than 0.1000000000000000055... dollars. Amounts are rounded
+    half-up to the nearest cent.
+
+    Raises:
+        ValueError: If value is not a finite number or its size exceeds MAX_CENTS
+    """
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f'Invalid amount: {value!r}')
+    try:
+        dollars = Decimal(str(value))
+    except InvalidOperation as e:
+        raise ValueError(f'Invalid amount: {value!r}') from e
+    if not dollars.is_finite():
+        raise ValueError(f'Invalid amount: {value!r}')
+    try:
+        cents = int((dollars / _CENT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except ArithmeticError as e:
+        raise ValueError(f'Invalid amount: {value!r}') from e
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f'Amount out of range: {value!r}')
+    return cents
+
+
+def to_dollars(cents):
+    """Render integer cents as a dollar number for JSON (None passes through)."""
+    if cents is None:
+        return None
+    return cents / 100
+
+
+def format_money(cents):
+    """Format integer cents for messages, e.g. 1234 -> '$12.34'."""
+    sign = '-' if cents < 0 else ''
+    return f'{sign}${format_amount(abs(cents))}'
+
+
+def format_amount(cents):
+    """Format integer cents as a plain decimal for exports, e.g. -1234 -> '-12.34'."""
+    sign = '-' if cents < 0 else ''
+    return f'{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}'
+
+
+def apply_rate(cents, rate):
+    """Multiply cents by a (float) rate, rounding half-up to whole cents."""
+    product = Decimal(cents) * Decimal(str(rate))
+    return int(product.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def split_cents(total, percentages):
+    """
+    Split total cents by percentages; the last share takes the remainder.
+
+    The shares always add up to exactly total.
+    """
+    shares = []
+    distributed = 0
+    for i, percentage in enumerate(percentages):
+        if i == len(percentages) - 1:
+            share = total - distributed
+        else:
+            share = apply_rate(total, Decimal(str(percentage)) / 100)
+            distributed += share
+        shares.append(share)
+    return shares
+
+
+def money_json(row):
+    """Copy a row into a dict with its cent fields rendered as dollars."""
+    data = dict(row)
+    for field in MONEY_FIELDS:
+        if field in data:
+            data[field] = to_dollars(data[field])
+    return data
@@ -0,0 +1,256 @@
+"""Read-only queries behind the busiest GET endpoints.
+
+The Flask views and the async handlers of the ASGI server mode
+(app/asgi.py) both answer these endpoints, so the queries and access checks
+live here as plain functions of a connection and the signed-in principal.
+Errors come back as (message, HTTP status) for the caller to render.
+"""
+
+import base64
+import json
+from app.cache import users_version
+from app.money import money_json
+
+# Largest page /api/accounts/<id>/transactions will return
+MAX_TRANSACTIONS_PAGE = 100
+
+
+def encode_cursor(txn):
+    """Build an opaque pagination cursor pointing just past a transaction row."""
+    payload = json.dumps([txn['created_at'], txn['id']]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (created_at, id); raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, txn_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(created_at, str) or not isinstance(txn_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, txn_id
+
+
+def load_principal(db, path, session):
+    """
+    The user signed in to session as {'id', 'username', 'role'}, or None.
+
+    The role stored in the signed session is trusted until the users version
+    counter moves (a user was deleted or had their role changed), at which
+    point it is re-read and written back to session.
+    """
+    version = users_version.current(db, path)
+    if version is None or 'role' not in session or session.get('principal_version') != version:
+        user = db.execute('SELECT id, username, role FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        if not user:
+            session.clear()
+            return None
+        session['username'] = user['username']
+        session['role'] = user['role']
+        session['principal_version'] = version
+    return {'id': session['user_id'], 'username': session['username'], 'role': session['role']}
+
+
+def parse_account_ids(values):
+    """
+    Parse the repeatable account_id query param.
+
+    Returns:
+        Tuple of (list of ints, None) or (None, (error, status)) if any value
+        is not an integer, rather than quietly widening the report
+    """
+    try:
+        return [int(value) for value in values], None
+    except ValueError:
+        return None, ('Invalid account_id', 400)
+
+
+def resolve_account_ids(db, user, requested):
+    """
+    Accounts a read-only report covers.
+
+    Defaults to every kid account for parents and the kid's own accounts
+    otherwise; kids may only name their own accounts.
+
+    Returns:
+        Tuple of (account ids, None) or (None, (error, status))
+    """
+    if requested:
+        placeholders = ','.join('?' * len(requested))
+        accounts = db.execute(
+            f'SELECT id, user_id FROM accounts WHERE id IN ({placeholders})', requested
+        ).fetchall()
+        if len(accounts) < len(set(requested)):
+            return None, ('Account not found', 404)
+        if user['role'] != 'parent' and any(a['user_id'] != user['id'] for a in accounts):
+            return None, ('Access denied', 403)
+    elif user['role'] == 'parent':
+        accounts = db.execute("SELECT id FROM accounts WHERE account_type != 'parent_vault'").fetchall()
+    else:
+        accounts = db.execute('SELECT id FROM accounts WHERE user_id = ?', (user['id'],)).fetchall()
+    return [a['id'] for a in accounts], None
+
+
+def transactions_page(db, user, account_id, limit=50, cursor=None):
+    """
+    One page of an account's transactions, newest first.
+
+    Returns:
+        Tuple of ({'transactions', 'next_cursor'}, None) or (None, (error, status))
+    """
+    # Verify access
+    account = db.execute('SELECT * FROM accounts WHERE id = ?', (account_id,)).fetchone()
+    if not account:
+        return None, ('Account not found', 404)
+    if user['role'] != 'parent' and account['user_id'] != user['id']:
+        return None, ('Access denied', 403)
+
+    limit = min(max(limit, 1), MAX_TRANSACTIONS_PAGE)
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError:
+            return None, ('Invalid cursor', 400)
+        keyset = 'AND (created_at, id) < (?, ?)'
+    else:
+        before = ()
+        keyset = ''
+
+    # Each side of the UNION ALL reads its own (account, created_at) index
+    # in order (the rowid tail breaks created_at ties), so only the
+    # requested page is fetched before the joins
+    transactions = db.execute(f'''
+        WITH page AS (
+            SELECT * FROM transactions WHERE from_account_id = ? {keyset}
+            UNION ALL
+            SELECT * FROM transactions WHERE to_account_id = ? AND from_account_id IS NOT ? {keyset}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        )
+        SELECT t.*,
+            fa.account_type as from_account_type,
+            fu.display_name as from_user_name,
+            ta.account_type as to_account_type,
+            tu.display_name as to_user_name,
+            ru.display_name as reviewer_name
+        FROM page t
+        LEFT JOIN accounts fa ON t.from_account_id = fa.id
+        LEFT JOIN users fu ON fa.user_id = fu.id
+        LEFT JOIN accounts ta ON t.to_account_id = ta.id
+        LEFT JOIN users tu ON ta.user_id = tu.id
+        LEFT JOIN users ru ON t.reviewed_by = ru.id
+        ORDER BY t.created_at DESC, t.id DESC
+    ''', (account_id, *before, account_id, account_id, *before, limit + 1)).fetchall()
+
+    # One extra row tells us whether an older page exists
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_cursor = encode_cursor(transactions[-1])
+
+    return {
+        'transactions': [money_json(t) for t in transactions],
+        'next_cursor': next_cursor
+    }, None
+
+
+def dashboard(db, user):
+    """The /api/dashboard payload for a parent or a kid."""
+    if user['role'] == 'parent':
+        # Every kid with their accounts and each account's latest activity
+        # in one query; the per-side MAX lookups are index seeks
+        rows = db.execute('''
+            SELECT u.id as kid_id, u.username, u.display_name, u.role, u.avatar_color,
+                u.created_at as kid_created_at,
+                a.id, a.user_id, a.account_type, a.nickname, a.is_default, a.balance, a.created_at,
+                (SELECT MAX(created_at) FROM transactions WHERE from_account_id = a.id) as last_debit_at,
+                (SELECT MAX(created_at) FROM transactions WHERE to_account_id = a.id) as last_credit_at
+            FROM users u
+            LEFT JOIN accounts a ON a.user_id = u.id
+            WHERE u.role = 'kid'
+            ORDER BY u.display_name, u.id, a.account_type, a.id
+        ''').fetchall()
+
+        kids = {}
+        for row in rows:
+            kid = kids.get(row['kid_id'])
+            if kid is None:
+                kid = kids[row['kid_id']] = {
+                    'user': {
+                        'id': row['kid_id'],
+                        'username': row['username'],
+                        'display_name': row['display_name'],
+                        'role': row['role'],
+                        'avatar_color': row['avatar_color'],
+                        'created_at': row['kid_created_at'],
+                    },
+                    'accounts': [],
+                    'total_balance': 0,
+                    'last_activity': None,
+                }
+            if row['id'] is None:
+                continue
+
+            last_activity = max(filter(None, (row['last_debit_at'], row['last_credit_at'])), default=None)
+            kid['accounts'].append(money_json({
+                'id': row['id'],
+                'user_id': row['user_id'],
+                'account_type': row['account_type'],
+                'nickname': row['nickname'],
+                'is_default': row['is_default'],
+                'balance': row['balance'],
+                'created_at': row['created_at'],
+                'owner_name': row['display_name'],
+                'owner_username': row['username'],
+                'last_activity': last_activity,
+            }))
+            kid['total_balance'] += row['balance']
+            if last_activity and (kid['last_activity'] is None or last_activity > kid['last_activity']):
+                kid['last_activity'] = last_activity
+        kid_data = [money_json(kid) for kid in kids.values()]
+
+        pending_count = db.execute(
+            "SELECT COUNT(*) as count FROM transactions WHERE status = 'pending'"
+        ).fetchone()['count']
+
+        return {
+            'role': 'parent',
+            'kids': kid_data,
+            'pending_approvals': pending_count
+        }
+
+    # Kid dashboard
+    accounts = db.execute(
+        'SELECT * FROM accounts WHERE user_id = ?', (user['id'],)
+    ).fetchall()
+
+    recent = db.execute('''
+        WITH own AS (SELECT id FROM accounts WHERE user_id = ?),
+        recent AS (
+            SELECT * FROM transactions WHERE from_account_id IN own
+            UNION ALL
+            SELECT * FROM transactions WHERE to_account_id IN own
+                AND (from_account_id IS NULL OR from_account_id NOT IN own)
+            ORDER BY created_at DESC LIMIT 10
+        )
+        SELECT t.*, fa.account_type as from_type, ta.account_type as to_type
+        FROM recent t
+        LEFT JOIN accounts fa ON t.from_account_id = fa.id
+        LEFT JOIN accounts ta ON t.to_account_id = ta.id
+        ORDER BY t.created_at DESC
+    ''', (user['id'],)).fetchall()
+
+    pending = db.execute('''
+        SELECT COUNT(*) as count FROM transactions t
+        JOIN accounts a ON t.from_account_id = a.id
+        WHERE a.user_id = ? AND t.status = 'pending'
+    ''', (user['id'],)).fetchone()['count']
+
+    return {
+        'role': 'kid',
+        'accounts': [money_json(a) for a in accounts],
+        'recent_transactions': [money_json(t) for t in recent],
+        'pending_withdrawals': pending
+    }
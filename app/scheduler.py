@@ -0,0 +1,284 @@
+"""Standalone job scheduler for allowance and interest payments.
+
+Run it next to the web server, not inside it:
+
+    python -m app.scheduler          # loop forever
+    python -m app.scheduler --once   # run due jobs once and exit (cron)
+
+Any number of schedulers may be started against the same database. They
+elect a leader through a lease row in scheduler_lease: only the process
+holding the unexpired lease runs jobs, and it renews the lease every time it
+wakes up. If the leader dies, a standby takes over once the lease expires.
+
+Instead of waking every hour, the leader sleeps until the next allowance or
+interest payment falls due (capped so the lease is renewed in time). Every
+job run is recorded in job_runs with its duration and outcome.
+
+When each family has its own database (TENANTS_DIR), the lease, job
+history and jobs are per family, and the families are worked through in
+parallel (SCHEDULER_TENANT_WORKERS at a time), so one family's backlog
+doesn't hold up the others.
+"""
+
+import argparse
+import functools
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load .env before app.models reads DATABASE_PATH
+load_dotenv()
+
+from app.models import get_db, prepare_database, current_database_path
+from app.jobs import run_job, next_due_at
+from app.tenants import tenancy_enabled, list_tenants, use_tenant
+
+LEASE_NAME = 'jobs'
+LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', 300))
+MAX_SLEEP = int(os.environ.get('SCHEDULER_MAX_SLEEP', 3600))
+
+# Family databases worked on at once
+TENANT_WORKERS = int(os.environ.get('SCHEDULER_TENANT_WORKERS', 4))
+
+# Back-off before retrying work that is still due after a run (a failing job
+# or a catch-up backlog larger than one run pays out)
+RETRY_SECONDS = 60
+
+# Job history older than this is pruned after each run
+JOB_RUN_RETENTION_DAYS = 90
+
+# Each runs across JOB_WORKERS processes when that is set above 1
+JOBS = (
+    ('allowances', functools.partial(run_job, 'allowances')),
+    ('interest', functools.partial(run_job, 'interest')),
+)
+
+
+def make_holder_id():
+    """Identify this scheduler process in the lease and job history."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def acquire_lease(db, holder, now=None):
+    """
+    Take or renew the scheduler lease.
+
+    The upsert only overwrites the row if this holder already owns it or the
+    current lease has expired, so concurrent callers can't both win.
+
+    Returns:
+        True if holder is the leader until now + LEASE_SECONDS
+    """
+    now = now if now is not None else time.time()
+    db.execute('''
+        INSERT INTO scheduler_lease (name, holder, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            holder = excluded.holder,
+            expires_at = excluded.expires_at,
+            acquired_at = CASE WHEN scheduler_lease.holder = excluded.holder
+                               THEN scheduler_lease.acquired_at ELSE CURRENT_TIMESTAMP END
+        WHERE scheduler_lease.holder = excluded.holder OR scheduler_lease.expires_at < ?
+    ''', (LEASE_NAME, holder, now + LEASE_SECONDS, now))
+    db.commit()
+    row = db.execute('SELECT holder FROM scheduler_lease WHERE name = ?', (LEASE_NAME,)).fetchone()
+    return row is not None and row['holder'] == holder
+
+
+def release_lease(db, holder):
+    """Give up the lease so a standby can take over without waiting for expiry."""
+    db.execute('DELETE FROM scheduler_lease WHERE name = ? AND holder = ?', (LEASE_NAME, holder))
+    db.commit()
+
+
+def record_job_run(db, job_name, holder, started_at, duration_ms, status, result=None, error=None):
+    """Append one entry to the job-run history."""
+    db.execute('''
+        INSERT INTO job_runs (job_name, holder, started_at, duration_ms, status, result, error)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (job_name, holder, started_at.isoformat(sep=' ', timespec='seconds'),
+          duration_ms, status, result, error))
+    db.commit()
+
+
+def run_jobs(db, holder):
+    """
+    Run every job once, recording each run; a failing job doesn't stop the rest.
+
+    Returns:
+        List of (job_name, status, result, duration_ms)
+    """
+    runs = []
+    for job_name, job in JOBS:
+        # Renew before each job so a long run can't outlive the lease
+        if not acquire_lease(db, holder):
+            print(f"⚠️  Scheduler {holder} lost the lease, skipping remaining jobs")
+            break
+
+        started_at = datetime.now()
+        start = time.perf_counter()
+        try:
+            result = job()
+            status, error = 'ok', None
+        except Exception as e:
+            result, status, error = None, 'error', f'{type(e).__name__}: {e}'
+            traceback.print_exc()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        record_job_run(db, job_name, holder, started_at, duration_ms, status, result, error)
+        runs.append((job_name, status, result, duration_ms))
+
+    db.execute(
+        "DELETE FROM job_runs WHERE started_at < datetime('now', 'localtime', ?)",
+        (f'-{JOB_RUN_RETENTION_DAYS} days',)
+    )
+    db.commit()
+
+    summary = ', '.join(
+        f"{name} {status} ({result if result is not None else '-'}) {duration_ms:.1f}ms"
+        for name, status, result, duration_ms in runs
+    )
+    family = f" for family {os.path.basename(current_database_path())[:-3]}" if tenancy_enabled() else ''
+    print(f"[{datetime.now().isoformat()}] Jobs complete{family}: {summary}")
+    return runs
+
+
+def seconds_until_next_run(db, now=None):
+    """Seconds until the next job is due, between 0 and MAX_SLEEP."""
+    now = now or datetime.now()
+    due = next_due_at(db, now)
+    if due is None:
+        return MAX_SLEEP
+    return min(max((due - now).total_seconds(), 0), MAX_SLEEP)
+
+
+def for_each_database(work):
+    """
+    Call work() against every database and return the results in a list.
+
+    Without tenants that is the one DATABASE_PATH database. With tenants,
+    work() runs once per family, TENANT_WORKERS families at a time, with
+    get_db() routed to that family; a family whose work raises is reported
+    and left out of the results.
+    """
+    if not tenancy_enabled():
+        return [work()]
+
+    def in_tenant(tenant):
+        try:
+            with use_tenant(tenant):
+                return [work()]
+        except Exception as e:
+            print(f"Scheduler error for family {tenant}: {e}")
+            traceback.print_exc()
+            return []
+
+    with ThreadPoolExecutor(max_workers=TENANT_WORKERS) as pool:
+        return [result for results in pool.map(in_tenant, list_tenants()) for result in results]
+
+
+def _run_once_here(holder):
+    db = get_db()
+    try:
+        if not acquire_lease(db, holder):
+            print("Scheduler lease is held by another process, nothing to do")
+            return []
+        try:
+            if seconds_until_next_run(db) > 0:
+                return []
+            return run_jobs(db, holder)
+        finally:
+            release_lease(db, holder)
+    finally:
+        db.close()
+
+
+def run_once(holder=None):
+    """Run due jobs once in every database whose lease this process can take."""
+    holder = holder or make_holder_id()
+    return [run for runs in for_each_database(lambda: _run_once_here(holder)) for run in runs]
+
+
+def _tick(holder):
+    """
+    Renew the lease and run jobs if they are due, in the current database.
+
+    Returns:
+        Seconds until this database needs attention again
+    """
+    renew_every = LEASE_SECONDS / 3
+    db = get_db()
+    try:
+        if not acquire_lease(db, holder):
+            return renew_every
+        sleep_for = seconds_until_next_run(db)
+        if sleep_for <= 0:
+            run_jobs(db, holder)
+            sleep_for = max(seconds_until_next_run(db), RETRY_SECONDS)
+        return min(sleep_for, renew_every)
+    except Exception as e:
+        print(f"Scheduler error: {e}")
+        return RETRY_SECONDS
+    finally:
+        db.close()
+
+
+def _release_here(holder):
+    db = get_db()
+    try:
+        release_lease(db, holder)
+    finally:
+        db.close()
+
+
+def run_forever(stop=None, holder=None):
+    """
+    Scheduler loop: renew the lease, run jobs when due, sleep until next due.
+
+    Args:
+        stop: Optional threading.Event that ends the loop when set
+        holder: Lease holder id (defaults to host:pid:random)
+    """
+    stop = stop or threading.Event()
+    holder = holder or make_holder_id()
+    renew_every = LEASE_SECONDS / 3
+    print(f"🕒 Scheduler {holder} started")
+
+    try:
+        while not stop.is_set():
+            # Wake for whichever database is due first; families added while
+            # sleeping are picked up within renew_every
+            sleep_for = min(for_each_database(lambda: _tick(holder)), default=renew_every)
+            stop.wait(min(sleep_for, renew_every))
+    finally:
+        for_each_database(lambda: _release_here(holder))
+        print(f"🛑 Scheduler {holder} stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Family Bank job scheduler')
+    parser.add_argument('--once', action='store_true', help='run due jobs once and exit')
+    args = parser.parse_args(argv)
+
+    # Family databases are migrated as the scheduler first opens them
+    if not tenancy_enabled():
+        prepare_database()
+
+    if args.once:
+        run_once()
+        return
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    run_forever(stop)
+
+
+if __name__ == '__main__':
+    main()
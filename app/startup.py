@@ -0,0 +1,115 @@
+"""Cold-start timing and the pre-fork warmup.
+
+run.py and create_app() mark the end of each startup phase, so a process
+can report how its boot time split between imports, database preparation,
+route setup and the first request. The command below boots the app in
+fresh interpreters, like `python -X importtime` but in terms of those
+phases, and fails when the median cold start exceeds STARTUP_BUDGET_MS:
+
+    python -m app.startup
+    python -m app.startup --runs 5 --budget-ms 500
+
+With GUNICORN_PRELOAD=true (see gunicorn.conf.py) the master imports the
+app once and warm_up() loads everything the workers would otherwise load
+on their first requests, so forked workers start with it already in memory.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold start (interpreter launch to first response) allowed by `python -m app.startup`
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1000))
+
+# Modules that views import on first use rather than at startup
+LAZY_MODULES = ('werkzeug.security', 'app.export', 'app.analytics')
+
+_phases = {}
+_last_mark = time.perf_counter()
+
+
+def mark(name):
+    """
+    End a startup phase: record the time since the previous mark as name.
+
+    Only the first occurrence of each phase is kept, so building more apps
+    later in the process (tests do) doesn't skew the report.
+    """
+    global _last_mark
+    now = time.perf_counter()
+    _phases.setdefault(name, now - _last_mark)
+    _last_mark = now
+
+
+def phases():
+    """{phase: seconds} recorded so far in this process, in order."""
+    return dict(_phases)
+
+
+def warm_up(app):
+    """
+    Load what the first requests would, before gunicorn forks its workers.
+
+    Imports the lazily loaded modules and compiles every template. No
+    database connection is left open: SQLite connections must not cross
+    a fork.
+    """
+    import importlib
+    from app import models
+
+    for module in LAZY_MODULES:
+        importlib.import_module(module)
+    for template in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template)
+    models.close_pools()
+    mark('warm up')
+
+
+def _cold_start():
+    """Boot the app in this (fresh) interpreter and print its phases as JSON."""
+    import flask  # noqa: F401
+    mark('import flask')
+    import run
+    run.app.test_client().get('/login')
+    mark('first request')
+    print(json.dumps(phases()))
+
+
+def _boot_once():
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', 'from app import startup; startup._cold_start()'],
+                            capture_output=True, text=True, check=True)
+    total = time.perf_counter() - started
+    # The app's own output (migrations, seeding) comes before the JSON line
+    return total, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure Family Bank cold-start time by phase')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to boot (median reported)')
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    runs = [_boot_once() for _ in range(args.runs)]
+    for total, boot in runs:
+        # Whatever the app didn't mark: interpreter launch, site imports, exit
+        boot['interpreter start and exit'] = total - sum(boot.values())
+    print(f"{'phase':<34}{'median ms':>10}")
+    for name in runs[-1][1]:
+        print(f"{name:<34}{statistics.median(boot.get(name, 0) for _, boot in runs) * 1000:>10.1f}")
+    total_ms = statistics.median(total for total, _ in runs) * 1000
+    print(f"{'total (launch to exit)':<34}{total_ms:>10.1f}")
+
+    if total_ms > args.budget_ms:
+        print(f"❌ Cold start {total_ms:.0f}ms is over the {args.budget_ms:.0f}ms budget")
+        return 1
+    print(f"✅ Cold start {total_ms:.0f}ms is within the {args.budget_ms:.0f}ms budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,7 +17,9 @@ const API = {
         const data = await res.json();
 
         if (!res.ok) {
-            throw new Error(data.error || 'Something went wrong');
+            const error = new Error(data.error || 'Something went wrong');
+            error.data = data;  // e.g. per-item results of a rejected batch
+            throw error;
         }
         return data;
     },
@@ -34,8 +36,16 @@ const API = {
 
     // Accounts
     getAccounts() { return this.request('/api/accounts'); },
-    getTransactions(accountId, limit = 50) {
-        return this.request(`/api/accounts/${accountId}/transactions?limit=${limit}`);
+    getTransactions(accountId, limit = 20, cursor = null) {
+        const params = new URLSearchParams({ limit });
+        if (cursor) params.set('cursor', cursor);
+        return this.request(`/api/accounts/${accountId}/transactions?${params}`);
+    },
+    getBalanceHistory(accountId, start, end) {
+        const params = new URLSearchParams();
+        if (start) params.set('start', start);
+        if (end) params.set('end', end);
+        return this.request(`/api/accounts/${accountId}/balance-history?${params}`);
     },
 
     // Transactions
@@ -51,6 +61,9 @@ const API = {
             body: { from_account_id: fromAccountId, amount, category, description }
         });
     },
+    batchDeposit(deposits) {
+        return this.request('/api/transactions/batch', { method: 'POST', body: { deposits } });
+    },
     transfer(fromAccountId, toAccountId, amount, description) {
         return this.request('/api/transactions/transfer', {
             method: 'POST',
@@ -61,6 +74,11 @@ const API = {
     // Approvals
     getPending() { return this.request('/api/transactions/pending'); },
     approve(txnId) { return this.request(`/api/transactions/${txnId}/approve`, { method: 'POST' }); },
+    approveBatch(txnIds) {
+        return this.request('/api/transactions/approve-batch', {
+            method: 'POST', body: { transaction_ids: txnIds }
+        });
+    },
     reject(txnId, reason) {
         return this.request(`/api/transactions/${txnId}/reject`, {
             method: 'POST', body: { reason }
@@ -100,4 +118,19 @@ const API = {
 
     // Dashboard
     getDashboard() { return this.request('/api/dashboard'); },
+
+    // Analytics
+    getCategoryAnalytics(months = 3) {
+        return this.request(`/api/analytics/categories?${new URLSearchParams({ months })}`);
+    },
+
+    // Statement export (a download link, not a fetch)
+    exportUrl(format = 'csv', accountIds = []) {
+        const params = new URLSearchParams({ format });
+        accountIds.forEach(id => params.append('account_id', id));
+        return `/api/export?${params}`;
+    },
+
+    // Live updates (Server-Sent Events)
+    events() { return new EventSource('/api/events'); },
 };
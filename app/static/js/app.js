@@ -20,11 +20,98 @@ async function init() {
         setupMobile();
         setupLogout();
         navigateTo('dashboard');
+        startEventStream();
     } catch (e) {
         window.location.href = '/login';
     }
 }
 
+// ── Live Updates ──────────────────────────────────────────────
+
+// The server pushes changes over /api/events; views update in place instead
+// of re-fetching. A stream only hears about writes handled by its own server
+// worker, and a worker with all its streams open answers 503, after which the
+// browser gives up on it; then balances and the badge are polled instead.
+const POLL_SECONDS = 30;
+let pollTimer = null;
+
+function startEventStream() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    const source = API.events();
+
+    // EventSource retries dropped connections itself; CLOSED means it won't
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) startPolling();
+    };
+
+    source.addEventListener('balance', (e) => {
+        const { account_id, balance } = JSON.parse(e.data);
+        showBalance(account_id, balance);
+    });
+
+    source.addEventListener('pending', (e) => {
+        setPendingBadge(JSON.parse(e.data).count);
+        if (currentView === 'approvals') renderApprovals();
+    });
+
+    source.addEventListener('review', (e) => {
+        const { status, amount } = JSON.parse(e.data);
+        if (status === 'approved') {
+            toast(`Your withdrawal of ${$(amount)} was approved 💵`);
+        } else {
+            toast(`Your withdrawal of ${$(amount)} was not approved`, 'info');
+        }
+        if (currentView === 'dashboard') renderKidDashboard();
+    });
+}
+
+function showBalance(accountId, balance) {
+    const account = allAccounts.find(a => a.id === accountId);
+    if (account) account.balance = balance;
+    document.querySelectorAll(`[data-balance-for="${accountId}"]`).forEach(el => {
+        el.textContent = $(balance);
+    });
+    if (account) {
+        const total = allAccounts.filter(a => a.user_id === account.user_id).reduce((sum, a) => sum + a.balance, 0);
+        document.querySelectorAll(`[data-total-for="${account.user_id}"]`).forEach(el => {
+            el.textContent = $(total);
+        });
+    }
+}
+
+function startPolling() {
+    if (pollTimer) return;
+    pollTimer = setInterval(pollDashboard, POLL_SECONDS * 1000);
+}
+
+async function pollDashboard() {
+    try {
+        const dashboard = await API.getDashboard();
+        if (dashboard.role === 'parent') {
+            dashboard.kids.flatMap(kid => kid.accounts).forEach(a => showBalance(a.id, a.balance));
+            setPendingBadge(dashboard.pending_approvals);
+        } else {
+            dashboard.accounts.forEach(a => showBalance(a.id, a.balance));
+        }
+    } catch (e) {
+        // Try again on the next tick
+    }
+}
+
+function setPendingBadge(count) {
+    const badge = document.getElementById('pending-badge');
+    if (!badge) return;
+    if (count > 0) {
+        badge.textContent = count;
+        badge.style.display = 'block';
+    } else {
+        badge.style.display = 'none';
+    }
+}
+
 // ── Navigation ────────────────────────────────────────────────
 
 function setupSidebar() {
@@ -221,30 +308,50 @@ function closeModal() {
 
 // ── Parent Dashboard ──────────────────────────────────────────
 
+// "Where did my money go": spending per category from the monthly rollups
+function renderSpendingCard(analytics, title) {
+    const spending = analytics.categories.filter(c => c.spent > 0);
+    if (spending.length === 0) return '';
+    const largest = spending[0].spent;
+    return `
+        <div class="card mb-6">
+            <div class="card-header">
+                <h3 class="card-title">${title}</h3>
+                <span class="text-secondary" style="font-size:13px;">Since ${analytics.start}</span>
+            </div>
+            ${spending.map(c => `
+                <div style="margin-bottom:10px;">
+                    <div class="flex-between" style="font-size:14px;">
+                        <span>${c.icon || '💰'} ${c.category}</span>
+                        <strong>${$(c.spent)}</strong>
+                    </div>
+                    <div style="height:8px;border-radius:4px;background:#e2e8f0;margin-top:4px;">
+                        <div style="height:8px;border-radius:4px;width:${Math.max(2, Math.round(c.spent / largest * 100))}%;background:${c.color || 'var(--accent)'};"></div>
+                    </div>
+                </div>
+            `).join('')}
+        </div>
+    `;
+}
+
 async function renderParentDashboard() {
     const main = document.getElementById('main-content');
     try {
-        const [dashboard, accounts] = await Promise.all([
+        const [dashboard, analytics] = await Promise.all([
             API.getDashboard(),
-            API.getAccounts()
+            API.getCategoryAnalytics()
         ]);
-        allAccounts = accounts;
+        allAccounts = dashboard.kids.flatMap(kid => kid.accounts);
 
-        // Update pending badge
-        const badge = document.getElementById('pending-badge');
-        if (badge) {
-            if (dashboard.pending_approvals > 0) {
-                badge.textContent = dashboard.pending_approvals;
-                badge.style.display = 'block';
-            } else {
-                badge.style.display = 'none';
-            }
-        }
+        setPendingBadge(dashboard.pending_approvals);
 
         let html = `
-            <div class="page-header">
-                <h1 class="page-title">Dashboard</h1>
-                <p class="page-subtitle">Overview of all family accounts</p>
+            <div class="page-header flex-between">
+                <div>
+                    <h1 class="page-title">Dashboard</h1>
+                    <p class="page-subtitle">Overview of all family accounts</p>
+                </div>
+                <a class="btn btn-ghost btn-sm" href="${API.exportUrl('csv')}" download>⬇️ Export history</a>
             </div>
         `;
 
@@ -276,7 +383,12 @@ async function renderParentDashboard() {
                     <div class="kid-section">
                         <div class="kid-header">
                             <div class="kid-avatar" style="background:${kid.user.avatar_color || '#6366f1'}">${kid.user.display_name.charAt(0)}</div>
-                            <h2 class="kid-name">${kid.user.display_name}</h2>
+                            <div>
+                                <h2 class="kid-name">${kid.user.display_name}</h2>
+                                <div class="text-secondary" style="font-size:13px;">
+                                    Total <span data-total-for="${kid.user.id}">${$(kid.total_balance)}</span>${kid.last_activity ? ` · Last activity ${timeAgo(kid.last_activity)}` : ''}
+                                </div>
+                            </div>
                         </div>
                         <div class="accounts-grid">
                 `;
@@ -287,12 +399,13 @@ async function renderParentDashboard() {
                             <div class="account-type-label">
                                 ${acct.account_type === 'checking' ? '💳' : '🐷'} ${acct.nickname || acct.account_type}
                             </div>
-                            <div class="account-balance">${$(acct.balance)}</div>
+                            <div class="account-balance" data-balance-for="${acct.id}">${$(acct.balance)}</div>
                         </div>
                     `;
                 }
                 html += '</div></div>';
             }
+            html += renderSpendingCard(analytics, 'Family Spending by Category');
         }
 
         main.innerHTML = html;
@@ -306,9 +419,10 @@ async function renderParentDashboard() {
 async function renderKidDashboard() {
     const main = document.getElementById('main-content');
     try {
-        const [dashboard, accounts] = await Promise.all([
+        const [dashboard, accounts, analytics] = await Promise.all([
             API.getDashboard(),
-            API.getAccounts()
+            API.getAccounts(),
+            API.getCategoryAnalytics()
         ]);
         allAccounts = accounts;
 
@@ -326,7 +440,7 @@ async function renderKidDashboard() {
                     <div class="account-type-label">
                         ${acct.account_type === 'checking' ? '💳' : '🐷'} ${acct.nickname || acct.account_type}
                     </div>
-                    <div class="account-balance">${$(acct.balance)}</div>
+                    <div class="account-balance" data-balance-for="${acct.id}">${$(acct.balance)}</div>
                     <div class="account-owner">Tap to see transactions</div>
                 </div>
             `;
@@ -353,6 +467,8 @@ async function renderKidDashboard() {
             </div>
         `;
 
+        html += renderSpendingCard(analytics, 'Where Did My Money Go?');
+
         // Recent transactions
         if (dashboard.recent_transactions.length > 0) {
             html += `
@@ -398,7 +514,7 @@ function renderTxnItem(txn, isCredit) {
 // ── Account Detail Modal ──────────────────────────────────────
 
 async function showAccountDetail(accountId, ownerName, accountType) {
-    const transactions = await API.getTransactions(accountId, 30);
+    const page = await API.getTransactions(accountId);
     const account = allAccounts.find(a => a.id === accountId);
 
     let html = `
@@ -406,24 +522,58 @@ async function showAccountDetail(accountId, ownerName, accountType) {
             <div class="account-type-label" style="justify-content:center;">
                 ${accountType === 'checking' ? '💳' : '🐷'} ${ownerName}'s ${accountType}
             </div>
-            <div class="account-balance">${$(account?.balance || 0)}</div>
+            <div class="account-balance" data-balance-for="${accountId}">${$(account?.balance || 0)}</div>
         </div>
     `;
 
-    if (transactions.length === 0) {
+    if (page.transactions.length === 0) {
         html += '<div class="empty-state"><div class="empty-icon">📭</div><div class="empty-text">No transactions yet</div></div>';
     } else {
-        html += '<ul class="txn-list">';
-        for (const txn of transactions) {
-            const isCredit = txn.to_account_id === accountId;
-            html += renderTxnItem(txn, isCredit);
-        }
-        html += '</ul>';
+        html += renderTxnPage(accountId, page, 'detail');
     }
 
     showModal('Account Details', html);
 }
 
+// Older history is fetched a page at a time with the server's cursor
+const txnCursors = {};
+
+function renderTxnPage(accountId, page, scope) {
+    const key = `${scope}-${accountId}`;
+    txnCursors[key] = page.next_cursor;
+
+    let html = `<ul class="txn-list" id="txn-list-${key}">`;
+    for (const txn of page.transactions) {
+        html += renderTxnItem(txn, txn.to_account_id === accountId);
+    }
+    html += '</ul>';
+    if (page.next_cursor) {
+        html += `
+            <div style="text-align:center;margin-top:12px;" id="txn-more-${key}">
+                <button class="btn btn-ghost btn-sm" onclick="loadOlderTransactions(${accountId}, '${scope}')">Load older</button>
+            </div>
+        `;
+    }
+    return html;
+}
+
+async function loadOlderTransactions(accountId, scope) {
+    const key = `${scope}-${accountId}`;
+    const more = document.getElementById(`txn-more-${key}`);
+    try {
+        const page = await API.getTransactions(accountId, 20, txnCursors[key]);
+        txnCursors[key] = page.next_cursor;
+
+        const list = document.getElementById(`txn-list-${key}`);
+        for (const txn of page.transactions) {
+            list.insertAdjacentHTML('beforeend', renderTxnItem(txn, txn.to_account_id === accountId));
+        }
+        if (!page.next_cursor && more) more.remove();
+    } catch (e) {
+        toast(e.message, 'error');
+    }
+}
+
 // ── Approvals ─────────────────────────────────────────────────
 
 async function renderApprovals() {
@@ -438,6 +588,15 @@ async function renderApprovals() {
             </div>
         `;
 
+        if (pending.length > 1) {
+            html += `
+                <div class="flex-between mb-6">
+                    <span class="text-secondary">${pending.length} requests waiting</span>
+                    <button class="btn btn-success btn-sm" onclick="handleApproveAll([${pending.map(t => t.id).join(',')}])">✅ Approve all</button>
+                </div>
+            `;
+        }
+
         if (pending.length === 0) {
             html += `<div class="empty-state"><div class="empty-icon">✅</div><div class="empty-text">No pending approvals</div></div>`;
         } else {
@@ -448,6 +607,7 @@ async function renderApprovals() {
                             <div class="approval-name">${txn.requester_name}</div>
                             <div class="approval-detail">${txn.description || 'Withdrawal'} · ${txn.category || 'General'} · from ${txn.account_type}</div>
                             <div class="approval-detail">${timeAgo(txn.created_at)}</div>
+                            <div class="approval-detail" style="color:var(--red);" id="approval-error-${txn.id}"></div>
                         </div>
                         <div class="approval-amount">${$(txn.amount)}</div>
                         <div class="approval-actions">
@@ -474,13 +634,28 @@ async function handleApproval(txnId, approve) {
             toast('Withdrawal rejected', 'info');
         }
         document.getElementById(`approval-${txnId}`)?.remove();
-        // Update badge
+        // Update badge (the server's pending event confirms the real count)
         const badge = document.getElementById('pending-badge');
-        if (badge) {
-            const count = parseInt(badge.textContent || '0') - 1;
-            if (count > 0) { badge.textContent = count; } else { badge.style.display = 'none'; }
-        }
+        if (badge) setPendingBadge(parseInt(badge.textContent || '0') - 1);
+    } catch (e) {
+        toast(e.message, 'error');
+    }
+}
+
+// Approves every listed request in one all-or-nothing call; if any can't be
+// approved, nothing is and the failing cards show why
+async function handleApproveAll(txnIds) {
+    try {
+        const result = await API.approveBatch(txnIds);
+        toast(`${result.message}! Time to hand over the cash 💵`);
+        txnIds.forEach(id => document.getElementById(`approval-${id}`)?.remove());
+        setPendingBadge(0);
+        renderApprovals();
     } catch (e) {
+        for (const item of e.data?.results || []) {
+            const el = document.getElementById(`approval-error-${txnIds[item.index]}`);
+            if (el) el.textContent = item.error || '';
+        }
         toast(e.message, 'error');
     }
 }
@@ -523,9 +698,58 @@ async function renderDeposit() {
                 <button type="submit" class="btn btn-success btn-full">💵 Deposit</button>
             </form>
         </div>
+        <div class="card mt-6" style="max-width:500px;">
+            <div class="card-header">
+                <h3 class="card-title">Pay Several Kids</h3>
+            </div>
+            <form id="batch-deposit-form">
+                ${kidAccounts.map(a => `
+                    <div class="form-group">
+                        <label>${a.owner_name} — ${a.nickname || a.account_type}</label>
+                        <div class="amount-input-wrapper">
+                            <input type="number" class="batch-amount" data-account-id="${a.id}" step="0.01" min="0.01" placeholder="0.00">
+                        </div>
+                    </div>
+                `).join('')}
+                <div class="form-group">
+                    <label>Category</label>
+                    <select id="batch-category">${categorySelect('Chores')}</select>
+                </div>
+                <div class="form-group">
+                    <label>Note (optional)</label>
+                    <input type="text" id="batch-desc" placeholder="e.g., Saturday chores">
+                </div>
+                <button type="submit" class="btn btn-success btn-full">💵 Pay All</button>
+            </form>
+        </div>
     `;
     main.innerHTML = html;
 
+    document.getElementById('batch-deposit-form').addEventListener('submit', async (e) => {
+        e.preventDefault();
+        const category = document.getElementById('batch-category').value;
+        const description = document.getElementById('batch-desc').value;
+        const deposits = [...document.querySelectorAll('.batch-amount')]
+            .filter(input => input.value)
+            .map(input => ({
+                to_account_id: parseInt(input.dataset.accountId),
+                amount: parseFloat(input.value),
+                category,
+                description
+            }));
+        if (deposits.length === 0) {
+            toast('Enter an amount for at least one account', 'error');
+            return;
+        }
+        try {
+            const result = await API.batchDeposit(deposits);
+            toast(result.message);
+            document.getElementById('batch-deposit-form').reset();
+        } catch (e) {
+            toast(e.message, 'error');
+        }
+    });
+
     document.getElementById('deposit-form').addEventListener('submit', async (e) => {
         e.preventDefault();
         try {
@@ -663,14 +887,19 @@ async function renderHistory() {
     const accounts = await API.getAccounts();
 
     let html = `
-        <div class="page-header">
-            <h1 class="page-title">Transaction History</h1>
-            <p class="page-subtitle">All your account activity</p>
+        <div class="page-header flex-between">
+            <div>
+                <h1 class="page-title">Transaction History</h1>
+                <p class="page-subtitle">All your account activity</p>
+            </div>
+            <a class="btn btn-ghost btn-sm" href="${API.exportUrl('csv')}" download>⬇️ Download CSV</a>
         </div>
     `;
 
-    for (const acct of accounts) {
-        const transactions = await API.getTransactions(acct.id, 50);
+    const pages = await Promise.all(accounts.map(acct => API.getTransactions(acct.id)));
+
+    accounts.forEach((acct, i) => {
+        const page = pages[i];
         html += `
             <div class="card mb-6">
                 <div class="card-header">
@@ -678,18 +907,13 @@ async function renderHistory() {
                 </div>
         `;
 
-        if (transactions.length === 0) {
+        if (page.transactions.length === 0) {
             html += '<div class="empty-state"><div class="empty-text">No transactions yet</div></div>';
         } else {
-            html += '<ul class="txn-list">';
-            for (const txn of transactions) {
-                const isCredit = txn.to_account_id === acct.id;
-                html += renderTxnItem(txn, isCredit);
-            }
-            html += '</ul>';
+            html += renderTxnPage(acct.id, page, 'history');
         }
         html += '</div>';
-    }
+    });
 
     main.innerHTML = html;
 }
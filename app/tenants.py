@@ -0,0 +1,111 @@
+"""One SQLite database per family.
+
+With TENANTS_DIR set, every household lives in its own file,
+TENANTS_DIR/<family>.db, so each family has its own WAL and writer lock and
+one family's job run never stalls another's deposits. The family is chosen
+at sign-in and kept in the session; request hooks route models.get_db()
+and models.get_pool() to that family's file. The scheduler works through
+the families in parallel.
+
+Families are created ahead of time (a new one starts with the default
+admin / changeme parent account):
+
+    python -m app.tenants create smith
+    python -m app.tenants list
+"""
+
+import argparse
+import glob
+import os
+import re
+from contextlib import contextmanager
+from app import models
+
+# Family names: lowercase letters, digits, dashes and underscores
+TENANT_NAME = re.compile(r'^[a-z0-9][a-z0-9_-]{0,62}$')
+
+
+def tenancy_enabled():
+    return models.TENANTS_DIR is not None
+
+
+def is_valid_tenant(tenant):
+    return isinstance(tenant, str) and TENANT_NAME.match(tenant) is not None
+
+
+def tenant_path(tenant):
+    """Database file for a family; raises ValueError for a malformed name."""
+    if not is_valid_tenant(tenant):
+        raise ValueError(f'Invalid family name: {tenant!r}')
+    return os.path.join(models.TENANTS_DIR, f'{tenant}.db')
+
+
+def tenant_exists(tenant):
+    return tenancy_enabled() and is_valid_tenant(tenant) and os.path.exists(tenant_path(tenant))
+
+
+def list_tenants():
+    """Names of every family with a database, sorted."""
+    if not tenancy_enabled():
+        return []
+    names = (os.path.basename(path)[:-3] for path in glob.glob(os.path.join(models.TENANTS_DIR, '*.db')))
+    return sorted(name for name in names if is_valid_tenant(name))
+
+
+@contextmanager
+def use_tenant(tenant):
+    """Route get_db() on this thread to a family's database, preparing it if needed."""
+    token = models.route_database(tenant_path(tenant))
+    try:
+        models.prepare_database()
+        yield
+    finally:
+        models.unroute_database(token)
+
+
+def create_tenant(tenant):
+    """
+    Create and migrate a family's database.
+
+    Raises:
+        ValueError: If the name is malformed or the family already exists
+    """
+    path = tenant_path(tenant)
+    if os.path.exists(path):
+        raise ValueError(f'Family {tenant!r} already exists')
+    os.makedirs(models.TENANTS_DIR, exist_ok=True)
+    token = models.route_database(path)
+    try:
+        models.prepare_database()
+    finally:
+        models.unroute_database(token)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage Family Bank families (one database each)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('create').add_argument('family')
+    commands.add_parser('list')
+    args = parser.parse_args(argv)
+
+    # app.models read TENANTS_DIR before .env was loaded
+    from dotenv import load_dotenv
+    load_dotenv()
+    models.TENANTS_DIR = os.environ.get('TENANTS_DIR') or None
+    if not tenancy_enabled():
+        parser.error('TENANTS_DIR is not set')
+
+    if args.command == 'create':
+        try:
+            path = create_tenant(args.family)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"✅ Created family {args.family} at {path}")
+    else:
+        for tenant in list_tenants():
+            print(tenant)
+
+
+if __name__ == '__main__':
+    main()
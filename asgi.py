@@ -0,0 +1,11 @@
+"""ASGI entry point for Family Bank: uvicorn asgi:app (see app/asgi.py)."""
+
+from dotenv import load_dotenv
+
+# Load .env before app.models and app.asgi read their settings
+load_dotenv()
+
+from app.main import create_app
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(create_app())
@@ -0,0 +1,340 @@
+"""Benchmark the API and the scheduled jobs on a synthetic dataset.
+
+Seeds a throwaway database with benchmarks/datagen.py, then sends requests
+to the main endpoints from `--concurrency` signed-in clients at once and
+reports p50/p95/p99 latency and throughput for each, followed by the
+duration of an allowance and an interest run over the seeded configs.
+
+By default requests go through the Flask test client in this process. With
+--gunicorn a local gunicorn (same worker and thread counts as the
+Dockerfile unless overridden) serves the database and requests go over HTTP.
+
+Results are written to benchmarks/results/<commit>-<time>.json (ignored by git). Pass
+--compare latest (or a results file) to print the change against an
+earlier run made with the same dataset and load settings.
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --families 50 --years 3 --concurrency 8 --gunicorn
+    python benchmarks/bench_api.py --compare latest
+"""
+
+import argparse
+import glob
+import http.cookiejar
+import json
+import math
+import os
+import platform
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from app import jobs, main as app_main, models
+from datagen import BENCH_PASSWORD, generate
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+PERCENTILES = (50, 95, 99)
+
+
+class TestClient:
+    """Signed-in client calling the app in-process."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, payload=None):
+        response = self._client.open(path, method=method, json=payload)
+        response.close()
+        return response.status_code
+
+
+class HttpClient:
+    """Signed-in client calling a running server over HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with self._opener.open(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(latencies_ms, errors, elapsed):
+    latencies_ms = sorted(latencies_ms)
+    summary = {f'p{p}_ms': round(percentile(latencies_ms, p), 2) for p in PERCENTILES}
+    summary.update({
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 2) if latencies_ms else 0.0,
+        'throughput_rps': round(len(latencies_ms) / elapsed, 1) if elapsed else 0.0,
+    })
+    return summary
+
+
+def scenarios():
+    """
+    Endpoints to benchmark as (name, role, request builder) tuples.
+
+    A builder takes (kid, sequence number) and returns (method, path, payload),
+    where kid is the generated kid the client signed in as or, for parent
+    scenarios, a kid to act on.
+    """
+    return (
+        ('dashboard_kid', 'kid', lambda kid, n: ('GET', '/api/dashboard', None)),
+        ('dashboard_parent', 'parent', lambda kid, n: ('GET', '/api/dashboard', None)),
+        ('transactions_page', 'kid', lambda kid, n: ('GET', f'/api/accounts/{kid.checking_id}/transactions', None)),
+        ('deposit', 'parent', lambda kid, n: ('POST', '/api/transactions/deposit',
+                                              {'to_account_id': kid.checking_id, 'amount': 1, 'category': 'Chores'})),
+        ('withdraw', 'kid', lambda kid, n: ('POST', '/api/transactions/withdraw',
+                                            {'from_account_id': kid.checking_id, 'amount': 0.01})),
+    )
+
+
+def run_scenario(make_client, dataset, role, build, requests, concurrency):
+    """Send `requests` requests from `concurrency` clients; returns a summary dict."""
+    users = dataset.parents if role == 'parent' else [kid.username for kid in dataset.kids]
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker(index):
+        client = make_client()
+        status = client.request('POST', '/api/auth/login',
+                                {'username': users[index % len(users)], 'password': BENCH_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f'Login failed with HTTP {status}')
+        kid = dataset.kids[index % len(dataset.kids)]
+        local, failed = [], 0
+        for n in range(index, requests, concurrency):
+            method, path, payload = build(kid, n)
+            started = time.perf_counter()
+            status = client.request(method, path, payload)
+            local.append((time.perf_counter() - started) * 1000)
+            failed += status >= 400
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, index) for index in range(concurrency)]:
+            future.result()
+    return summarize(latencies, sum(errors), time.perf_counter() - started)
+
+
+def time_jobs():
+    """Time one allowance and one interest run against the current database."""
+    results = {}
+    for name, job in (('allowances', jobs.process_allowances), ('interest', jobs.process_interest)):
+        timings = {}
+        started = time.perf_counter()
+        processed = job(timings=timings)
+        results[name] = {
+            'processed': processed,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'phases_ms': {phase: round(seconds * 1000, 1) for phase, seconds in timings.items()},
+        }
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(database_path, workers, threads):
+    """Start gunicorn on a free port; returns (process, base URL) once it answers."""
+    port = free_port()
+    env = dict(os.environ, DATABASE_PATH=database_path)
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--threads', str(threads), '--log-level', 'warning', 'run:app'],
+        cwd=ROOT_DIR, env=env
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            urllib.request.urlopen(base_url + '/login').close()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not start within 30s')
+
+
+def git_commit():
+    """Short commit hash, with -dirty if the tree has local changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def save_results(results, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')[:-3]
+    path = os.path.join(results_dir, f"{results['commit']}-{stamp}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_baseline(compare, params, results_dir=RESULTS_DIR, exclude=None):
+    """
+    Load the results to compare against.
+
+    'latest' picks the newest results file recorded with the same params.
+    """
+    if compare != 'latest':
+        with open(compare) as f:
+            return json.load(f)
+    for path in sorted(glob.glob(os.path.join(results_dir, '*.json')), key=os.path.getmtime, reverse=True):
+        if path == exclude:
+            continue
+        with open(path) as f:
+            baseline = json.load(f)
+        if baseline.get('params') == params:
+            return baseline
+    return None
+
+
+def change(current, baseline):
+    if not baseline:
+        return ''
+    return f' ({(current - baseline) / baseline:+.0%})'
+
+
+def print_report(results, baseline=None):
+    base_endpoints = baseline['endpoints'] if baseline else {}
+    print(f"\n{'endpoint':<20}{'p50 ms':>16}{'p95 ms':>16}{'p99 ms':>16}{'req/s':>16}{'errors':>8}")
+    for name, stats in results['endpoints'].items():
+        base = base_endpoints.get(name, {})
+        cells = [f"{stats[key]:.1f}{change(stats[key], base.get(key))}"
+                 for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')]
+        print(f"{name:<20}" + ''.join(f'{cell:>16}' for cell in cells) + f"{stats['errors']:>8}")
+
+    base_jobs = baseline['jobs'] if baseline else {}
+    for name, stats in results['jobs'].items():
+        base = base_jobs.get(name, {}).get('duration_ms')
+        print(f"job {name}: {stats['processed']} processed in {stats['duration_ms']:.1f}ms{change(stats['duration_ms'], base)}")
+    if baseline:
+        print(f"Compared with {baseline['commit']} ({baseline['recorded_at']})")
+
+
+def run(args):
+    """Seed, benchmark and return the results dict."""
+    params = {
+        'families': args.families, 'kids': args.kids, 'years': args.years,
+        'txns_per_week': args.txns_per_week, 'requests': args.requests,
+        'concurrency': args.concurrency,
+        'server': f'gunicorn {args.workers}x{args.threads}' if args.gunicorn else 'test-client',
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        models.init_db()
+        models.run_migrations()
+        db = models.get_db()
+        started = time.perf_counter()
+        dataset = generate(db, args.families, args.kids, args.years, args.txns_per_week)
+        db.close()
+        print(f"Seeded {len(dataset.kids)} kids and {dataset.transactions:,} transactions "
+              f"in {time.perf_counter() - started:.2f}s")
+
+        server = None
+        if args.gunicorn:
+            server, base_url = start_gunicorn(models.DATABASE_PATH, args.workers, args.threads)
+            make_client = lambda: HttpClient(base_url)
+        else:
+            app = app_main.create_app()
+            app.config['TESTING'] = True
+            make_client = lambda: TestClient(app)
+
+        endpoints = {}
+        try:
+            for name, role, build in scenarios():
+                endpoints[name] = run_scenario(make_client, dataset, role, build, args.requests, args.concurrency)
+                print(f"  {name}: p50 {endpoints[name]['p50_ms']}ms, p99 {endpoints[name]['p99_ms']}ms")
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+        job_results = time_jobs()
+
+    return {
+        'commit': git_commit(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'params': params,
+        'endpoints': endpoints,
+        'jobs': job_results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--families', type=int, default=10)
+    parser.add_argument('--kids', type=int, default=3, help='Kids per family')
+    parser.add_argument('--years', type=int, default=2, help='Years of history per kid')
+    parser.add_argument('--txns-per-week', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=400, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='Clients sending requests at once')
+    parser.add_argument('--gunicorn', action='store_true', help='Serve with a local gunicorn instead of the test client')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--compare', help="Results file to compare against, or 'latest'")
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--no-save', action='store_true', help="Don't write a results file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    path = None if args.no_save else save_results(results, args.results_dir)
+    baseline = load_baseline(args.compare, results['params'], args.results_dir, exclude=path) if args.compare else None
+    print_report(results, baseline)
+    if args.compare and baseline is None:
+        print('No earlier results with the same parameters to compare against')
+    if path:
+        print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark the batched interest engine.
+
+Seeds a throwaway database with N savings accounts (default 100,000), each
+with an interest config that is a few periods overdue, then times one
+process_interest() run and a second no-op run.
+
+    python benchmarks/bench_interest.py
+    python benchmarks/bench_interest.py --accounts 20000 --chunk-size 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import jobs, models
+
+
+def seed(accounts, seed_value=42):
+    """Create one kid per account with a savings balance and an overdue config."""
+    rng = random.Random(seed_value)
+    db = models.get_db()
+    now = datetime.now()
+    db.executemany(
+        "INSERT INTO users (id, username, display_name, password_hash, role) VALUES (?, ?, ?, 'x', 'kid')",
+        [(i, f'kid{i}', f'Kid {i}') for i in range(1, accounts + 1)]
+    )
+    db.executemany(
+        "INSERT INTO accounts (id, user_id, account_type, nickname, is_default, balance) VALUES (?, ?, 'savings', 'Savings', 1, ?)",
+        [(i, i, rng.randint(0, 500000)) for i in range(1, accounts + 1)]
+    )
+    frequencies = ('daily', 'weekly', 'monthly')
+    rows = []
+    for i in range(1, accounts + 1):
+        frequency = frequencies[i % 3]
+        periods_late = rng.randint(1, 4)
+        last_applied = jobs._interest_period_end(frequency, now, -periods_late) - timedelta(hours=1)
+        rows.append((i, rng.choice((2.0, 3.5, 5.0)), frequency, last_applied.isoformat()))
+    db.executemany(
+        'INSERT INTO interest_config (account_id, annual_rate, compound_frequency, last_applied) VALUES (?, ?, ?, ?)',
+        rows
+    )
+    db.commit()
+    db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=jobs.JOB_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        models.init_db()
+        models.run_migrations()
+
+        start = time.perf_counter()
+        seed(args.accounts)
+        print(f"Seeded {args.accounts:,} savings accounts in {time.perf_counter() - start:.2f}s")
+
+        timings = {}
+        start = time.perf_counter()
+        paid = jobs.process_interest(chunk_size=args.chunk_size, timings=timings)
+        elapsed = time.perf_counter() - start
+        phases = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+        print(f"Interest run: {paid:,} accounts paid in {elapsed:.2f}s "
+              f"({args.accounts / elapsed:,.0f} accounts/s; {phases})")
+
+        start = time.perf_counter()
+        paid = jobs.process_interest(chunk_size=args.chunk_size)
+        print(f"Rerun: {paid:,} accounts paid in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark how job wall time scales with the number of worker processes.
+
+Seeds one database of N kids (or, with --tenants, spreads them over one
+database per family), each with a due allowance and an overdue interest
+config, then runs run_partitioned() from a fresh copy of that data with 1,
+2, 4, ... workers and reports wall time and speedup over one worker.
+
+    python benchmarks/bench_job_workers.py
+    python benchmarks/bench_job_workers.py --kids 100000 --workers 1 2 4 8
+    python benchmarks/bench_job_workers.py --tenants 8
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from app import jobs, models
+from datagen import generate
+
+
+def seed(directory, kids, tenants):
+    """Write the seed database(s) into directory; returns their paths."""
+    paths = []
+    per_database = -(-kids // tenants)
+    for index in range(tenants):
+        path = os.path.join(directory, f'seed{index}.db')
+        models.DATABASE_PATH = path
+        models.init_db()
+        models.run_migrations()
+        db = models.get_db()
+        # years=0: no history, just the due allowance and interest configs
+        generate(db, families=per_database, kids=1, years=0, seed=index)
+        db.execute("UPDATE accounts SET balance = 10000 WHERE account_type = 'savings'")
+        db.commit()
+        db.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        db.close()
+        paths.append(path)
+    return paths
+
+
+def fresh_copies(seed_paths, directory):
+    copies = []
+    for path in seed_paths:
+        copy = os.path.join(directory, os.path.basename(path).replace('seed', 'run'))
+        shutil.copyfile(path, copy)
+        copies.append(copy)
+    return copies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--kids', type=int, default=20_000)
+    parser.add_argument('--tenants', type=int, default=1, help='Spread the kids over this many databases')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=jobs.JOB_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        seed_paths = seed(tmp, args.kids, args.tenants)
+        print(f"Seeded {args.kids:,} kids in {len(seed_paths)} database(s) in {time.perf_counter() - start:.2f}s\n")
+
+        print(f"{'workers':>8}{'partitions':>12}{'allowances':>12}{'interest':>10}{'wall s':>9}{'slowest s':>11}{'speedup':>9}")
+        baseline = None
+        for workers in args.workers:
+            databases = fresh_copies(seed_paths, tmp)
+            run = jobs.run_partitioned(workers=workers, databases=databases, chunk_size=args.chunk_size)
+            baseline = baseline or run['seconds']
+            print(f"{workers:>8}{run['partitions']:>12}{run['counts']['allowances']:>12,}{run['counts']['interest']:>10,}"
+                  f"{run['seconds']:>9.2f}{run['max_partition_seconds']:>11.2f}{baseline / run['seconds']:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
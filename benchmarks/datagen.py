@@ -0,0 +1,170 @@
+"""Synthetic Family Bank data for benchmarks.
+
+Writes N families of one parent and M kids into the current database, with
+checking and savings accounts, allowance and interest configs, and years of
+transaction history (allowances, parent deposits, spending, transfers to
+savings). Balances match the generated history and never go negative. Every
+allowance falls due today and every interest config is a month behind, so a
+job run right after seeding has real work to do.
+
+The app keeps one household per database, so parents can see every
+generated kid; families only shape the data volume.
+
+    python benchmarks/datagen.py --db /tmp/bench.db --families 50 --kids 3 --years 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+from app import models
+
+# Password of every generated user
+BENCH_PASSWORD = 'bench'
+
+SPENDING_CATEGORIES = ('Toys & Games', 'Clothes', 'Food & Treats', 'Books', 'Entertainment', 'Gifts')
+
+Dataset = namedtuple('Dataset', 'parents kids transactions')
+Kid = namedtuple('Kid', 'username checking_id savings_id')
+
+
+def _timestamp(moment):
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def generate(db, families=10, kids=3, years=2, txns_per_week=5, seed=42, today=None):
+    """
+    Insert a synthetic dataset and commit it.
+
+    Args:
+        db: Connection to a migrated database
+        families: Number of parents to create
+        kids: Kids per family
+        years: Years of transaction history per kid
+        txns_per_week: Spending, deposits and transfers per kid per week,
+            on top of the weekly allowance
+        seed: Random seed, so the same arguments produce the same data
+
+    Returns:
+        Dataset with parent usernames, Kid tuples and the transaction count
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    start = datetime.combine(today - timedelta(weeks=52 * years), datetime.min.time())
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+
+    parents, kid_rows, transactions = [], [], []
+    for family in range(1, families + 1):
+        username = f'f{family}-parent'
+        cursor = db.execute(
+            "INSERT INTO users (username, display_name, password_hash, role) VALUES (?, ?, ?, 'parent')",
+            (username, f'Family {family} Parent', password_hash)
+        )
+        vault_id = db.execute(
+            "INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, 'parent_vault', 'Vault', 1, ?)",
+            (cursor.lastrowid, models.PARENT_VAULT_BALANCE)
+        ).lastrowid
+        parents.append(username)
+
+        for number in range(1, kids + 1):
+            username = f'f{family}-kid{number}'
+            user_id = db.execute(
+                "INSERT INTO users (username, display_name, password_hash, role) VALUES (?, ?, ?, 'kid')",
+                (username, f'Kid {family}.{number}', password_hash)
+            ).lastrowid
+            checking_id = db.execute(
+                "INSERT INTO accounts (user_id, account_type, nickname, is_default) VALUES (?, 'checking', 'Main', 1)",
+                (user_id,)
+            ).lastrowid
+            savings_id = db.execute(
+                "INSERT INTO accounts (user_id, account_type, nickname, is_default) VALUES (?, 'savings', 'Savings', 1)",
+                (user_id,)
+            ).lastrowid
+
+            allowance = rng.choice((500, 1000, 1500))
+            config_id = db.execute(
+                "INSERT INTO allowance_config (user_id, amount, frequency, next_payment_date, day_of_week, active) "
+                "VALUES (?, ?, 'weekly', ?, ?, 1)",
+                (user_id, allowance, today.isoformat(), today.weekday())
+            ).lastrowid
+            db.execute(
+                'INSERT INTO allowance_splits (allowance_config_id, account_id, percentage) VALUES (?, ?, 100.0)',
+                (config_id, checking_id)
+            )
+            db.execute(
+                "INSERT INTO interest_config (account_id, annual_rate, compound_frequency, last_applied, active) "
+                "VALUES (?, 5.0, 'monthly', ?, 1)",
+                (savings_id, _timestamp(datetime.combine(today, datetime.min.time()) - timedelta(days=32)))
+            )
+
+            checking = savings = 0
+            for week in range(52 * years):
+                week_start = start + timedelta(weeks=week)
+                transactions.append((vault_id, checking_id, allowance, 'allowance', 'Allowance',
+                                     'Weekly allowance', 'completed', _timestamp(week_start)))
+                checking += allowance
+                for _ in range(txns_per_week):
+                    moment = _timestamp(week_start + timedelta(seconds=rng.randrange(1, 7 * 86400)))
+                    roll = rng.random()
+                    if roll < 0.6 and checking > 0:
+                        amount = rng.randint(1, checking)
+                        transactions.append((checking_id, None, amount, 'withdrawal', rng.choice(SPENDING_CATEGORIES),
+                                             'Spending', 'approved', moment))
+                        checking -= amount
+                    elif roll < 0.8 and checking > 0:
+                        amount = rng.randint(1, checking)
+                        transactions.append((checking_id, savings_id, amount, 'transfer', 'Savings Goal',
+                                             'Move to savings', 'completed', moment))
+                        checking -= amount
+                        savings += amount
+                    else:
+                        amount = rng.choice((100, 200, 500))
+                        transactions.append((vault_id, checking_id, amount, 'parent_deposit', 'Chores',
+                                             'Chores', 'completed', moment))
+                        checking += amount
+
+            db.execute('UPDATE accounts SET balance = ? WHERE id = ?', (checking, checking_id))
+            db.execute('UPDATE accounts SET balance = ? WHERE id = ?', (savings, savings_id))
+            kid_rows.append(Kid(username, checking_id, savings_id))
+
+    transactions.sort(key=lambda row: row[-1])
+    db.executemany('''
+        INSERT INTO transactions (from_account_id, to_account_id, amount, transaction_type, category, description, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', transactions)
+    db.commit()
+    return Dataset(parents, kid_rows, len(transactions))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed a database with synthetic Family Bank data')
+    parser.add_argument('--db', required=True, help='SQLite file to create or extend')
+    parser.add_argument('--families', type=int, default=10)
+    parser.add_argument('--kids', type=int, default=3)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--txns-per-week', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    models.DATABASE_PATH = args.db
+    models.init_db()
+    models.run_migrations()
+    db = models.get_db()
+    try:
+        started = time.perf_counter()
+        dataset = generate(db, args.families, args.kids, args.years, args.txns_per_week, args.seed)
+    finally:
+        db.close()
+    print(f"Seeded {len(dataset.parents)} families, {len(dataset.kids)} kids and "
+          f"{dataset.transactions:,} transactions in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Fixtures shared by the test modules: a fresh app and a signed-in family."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import main, models
+from app.cache import categories_cache, settings_cache, users_version
+
+
+@pytest.fixture
+def make_app():
+    """Build a testing app on whichever database the test has pointed models at."""
+    def make():
+        # The caches live for the whole process; start each app without them
+        users_version.invalidate()
+        settings_cache.invalidate()
+        categories_cache.invalidate()
+        app = main.create_app()
+        app.config['TESTING'] = True
+        return app
+    return make
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Point models at an empty temporary database; returns its path."""
+    path = str(tmp_path / 'family_bank.db')
+    monkeypatch.setattr(models, 'DATABASE_PATH', path)
+    return path
+
+
+@pytest.fixture
+def db(database):
+    """A connection to a migrated temporary database, without the app or its seed data."""
+    models.init_db()
+    models.run_migrations()
+    db = models.get_db()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def app(database, make_app):
+    """A fresh app on its own temporary database, with only the default parent."""
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def parent(app):
+    """
+    The default parent signed in, after adding kids Sam and Ava.
+
+    parent.accounts maps Sam's account types to ids.
+    """
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'changeme'})
+    for name in ('sam', 'ava'):
+        client.post('/api/admin/users', json={
+            'username': name, 'display_name': name.title(), 'password': f'{name}123', 'role': 'kid'
+        })
+    client.accounts = {a['account_type']: a['id'] for a in client.get('/api/accounts').get_json()
+                       if a['owner_username'] == 'sam'}
+    return client
+
+
+@pytest.fixture
+def kid(app, parent):
+    """Sam signed in, with kid.accounts (as on parent) and kid.user_id."""
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'sam', 'password': 'sam123'})
+    client.accounts = parent.accounts
+    client.user_id = client.get('/api/auth/me').get_json()['id']
+    return client
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    """Every SQL statement run on connections from models.get_db, in order."""
+    captured = []
+    get_db = models.get_db
+
+    def traced_get_db(path=None):
+        db = get_db(path)
+        db.set_trace_callback(captured.append)
+        return db
+
+    monkeypatch.setattr(models, 'get_db', traced_get_db)
+    return captured
@@ -0,0 +1,25 @@
+"""Gunicorn settings, read automatically when gunicorn starts from this directory.
+
+Workers and threads are set on the command line (see Dockerfile). With
+GUNICORN_PRELOAD=true the master imports the app and warms it up once
+(app/startup.py), and each worker is forked with it already loaded instead
+of importing and building it itself.
+
+Live updates (/api/events) are per worker: a stream only receives changes
+handled by the worker it is connected to, and each worker serves at most
+EVENTS_MAX_STREAMS streams, each holding one of its threads. When a worker's
+streams are all taken the browser falls back to polling the dashboard
+(app/static/js/app.js). Raise EVENTS_MAX_STREAMS together with --threads,
+or use the ASGI mode (asgi.py), where streams hold no thread.
+"""
+
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported, before any fork
+    if preload_app:
+        from app.startup import warm_up
+        warm_up(server.app.wsgi())
@@ -0,0 +1,19 @@
+-- Migration: Add secondary indexes for the transaction ledger
+-- Account history, the approvals queue and the kid dashboard previously
+-- scanned the whole transactions table.
+
+-- Account history: one index per side of a transaction so each side can be
+-- read in created_at order (rewritten as UNION ALL in the queries)
+CREATE INDEX IF NOT EXISTS idx_transactions_from_account
+    ON transactions(from_account_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_transactions_to_account
+    ON transactions(to_account_id, created_at);
+
+-- Approvals queue: partial index that only holds pending rows, so listing and
+-- counting pending withdrawals stays cheap no matter how long the history is
+CREATE INDEX IF NOT EXISTS idx_transactions_pending
+    ON transactions(created_at) WHERE status = 'pending';
+
+-- Per-user account lookups (dashboards, vault lookup, default account)
+CREATE INDEX IF NOT EXISTS idx_accounts_user
+    ON accounts(user_id, account_type);
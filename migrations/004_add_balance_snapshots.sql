@@ -0,0 +1,16 @@
+-- Migration: Add daily balance snapshots
+-- One row per account per day on which its balance changed, holding the
+-- closing balance for that day. Days without a row carry the previous
+-- snapshot forward, so a time series never needs to replay transactions.
+
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    account_id INTEGER NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    balance REAL NOT NULL,
+    PRIMARY KEY (account_id, snapshot_date),
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Start every existing account's history from its current balance
+INSERT OR IGNORE INTO balance_snapshots (account_id, snapshot_date, balance)
+SELECT id, date('now', 'localtime'), balance FROM accounts;
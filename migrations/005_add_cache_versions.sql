@@ -0,0 +1,39 @@
+-- Migration: Add cache version counters
+-- Each worker process caches settings and categories in memory and only
+-- re-reads them when the matching counter here has moved. Triggers bump the
+-- counters on every write, so any writer (another worker, a migration, the
+-- sqlite3 shell) invalidates the caches without having to know about them.
+
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('settings', 0);
+INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('categories', 0);
+
+CREATE TRIGGER IF NOT EXISTS settings_version_insert AFTER INSERT ON settings
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'settings';
+END;
+CREATE TRIGGER IF NOT EXISTS settings_version_update AFTER UPDATE ON settings
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'settings';
+END;
+CREATE TRIGGER IF NOT EXISTS settings_version_delete AFTER DELETE ON settings
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'settings';
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_version_insert AFTER INSERT ON categories
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'categories';
+END;
+CREATE TRIGGER IF NOT EXISTS categories_version_update AFTER UPDATE ON categories
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'categories';
+END;
+CREATE TRIGGER IF NOT EXISTS categories_version_delete AFTER DELETE ON categories
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'categories';
+END;
@@ -0,0 +1,15 @@
+-- Migration: Add a users version counter
+-- Sessions carry the signed-in user's role; they are trusted until this
+-- counter moves, which happens whenever a user is deleted or has their role
+-- or username changed.
+
+INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('users', 0);
+
+CREATE TRIGGER IF NOT EXISTS users_version_update AFTER UPDATE OF role, username ON users
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'users';
+END;
+CREATE TRIGGER IF NOT EXISTS users_version_delete AFTER DELETE ON users
+BEGIN
+    UPDATE cache_versions SET version = version + 1 WHERE name = 'users';
+END;
@@ -0,0 +1,101 @@
+-- Migration: Store money as integer cents
+-- accounts.balance, transactions.amount, allowance_config.amount and
+-- balance_snapshots.balance were REAL dollars. They become INTEGER cents so
+-- sums, splits and comparisons are exact. SQLite can't change a column's
+-- type in place, so each table is rebuilt (the documented 12-step
+-- procedure), keeping ids, column names and indexes.
+
+PRAGMA foreign_keys=OFF;
+
+BEGIN;
+
+CREATE TABLE accounts_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    account_type TEXT NOT NULL CHECK(account_type IN ('checking', 'savings', 'parent_vault')),
+    nickname TEXT,
+    is_default INTEGER DEFAULT 0,
+    balance INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+INSERT INTO accounts_new (id, user_id, account_type, nickname, is_default, balance, created_at)
+SELECT id, user_id, account_type, nickname, is_default,
+       CAST(ROUND(COALESCE(balance, 0) * 100) AS INTEGER), created_at
+FROM accounts;
+DROP TABLE accounts;
+ALTER TABLE accounts_new RENAME TO accounts;
+CREATE INDEX IF NOT EXISTS idx_accounts_user ON accounts(user_id, account_type);
+
+CREATE TABLE transactions_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    from_account_id INTEGER,
+    to_account_id INTEGER,
+    amount INTEGER NOT NULL,
+    transaction_type TEXT NOT NULL CHECK(transaction_type IN (
+        'deposit', 'withdrawal', 'transfer', 'allowance', 'interest', 'parent_deposit'
+    )),
+    category TEXT DEFAULT 'general',
+    description TEXT,
+    status TEXT DEFAULT 'completed' CHECK(status IN (
+        'pending', 'approved', 'rejected', 'completed'
+    )),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    reviewed_by INTEGER,
+    reviewed_at TIMESTAMP,
+    FOREIGN KEY (from_account_id) REFERENCES accounts(id),
+    FOREIGN KEY (to_account_id) REFERENCES accounts(id),
+    FOREIGN KEY (reviewed_by) REFERENCES users(id)
+);
+INSERT INTO transactions_new (id, from_account_id, to_account_id, amount, transaction_type, category,
+                              description, status, created_at, reviewed_by, reviewed_at)
+SELECT id, from_account_id, to_account_id, CAST(ROUND(amount * 100) AS INTEGER), transaction_type, category,
+       description, status, created_at, reviewed_by, reviewed_at
+FROM transactions;
+DROP TABLE transactions;
+ALTER TABLE transactions_new RENAME TO transactions;
+CREATE INDEX IF NOT EXISTS idx_transactions_from_account ON transactions(from_account_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_transactions_to_account ON transactions(to_account_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_transactions_pending ON transactions(created_at) WHERE status = 'pending';
+
+CREATE TABLE allowance_config_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    amount INTEGER NOT NULL DEFAULT 0,
+    frequency TEXT NOT NULL DEFAULT 'weekly' CHECK(frequency IN (
+        'weekly', 'biweekly', 'monthly'
+    )),
+    target_account_type TEXT DEFAULT 'checking' CHECK(target_account_type IN (
+        'checking', 'savings'
+    )),
+    next_payment_date TEXT,
+    day_of_week INTEGER,
+    day_of_month INTEGER,
+    active INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+INSERT INTO allowance_config_new (id, user_id, amount, frequency, target_account_type, next_payment_date,
+                                  day_of_week, day_of_month, active, created_at)
+SELECT id, user_id, CAST(ROUND(amount * 100) AS INTEGER), frequency, target_account_type, next_payment_date,
+       day_of_week, day_of_month, active, created_at
+FROM allowance_config;
+DROP TABLE allowance_config;
+ALTER TABLE allowance_config_new RENAME TO allowance_config;
+
+CREATE TABLE balance_snapshots_new (
+    account_id INTEGER NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    balance INTEGER NOT NULL,
+    PRIMARY KEY (account_id, snapshot_date),
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+INSERT INTO balance_snapshots_new (account_id, snapshot_date, balance)
+SELECT account_id, snapshot_date, CAST(ROUND(balance * 100) AS INTEGER)
+FROM balance_snapshots;
+DROP TABLE balance_snapshots;
+ALTER TABLE balance_snapshots_new RENAME TO balance_snapshots;
+
+COMMIT;
+
+PRAGMA foreign_keys=ON;
@@ -0,0 +1,25 @@
+-- Migration: Add scheduler lease and job-run history
+-- The scheduler runs in its own process (python -m app.scheduler). Any number
+-- of them may be started; the one holding the unexpired lease row is the
+-- leader and is the only one that runs jobs. Every run is recorded in
+-- job_runs with its duration and outcome.
+
+CREATE TABLE IF NOT EXISTS scheduler_lease (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_name TEXT NOT NULL,
+    holder TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    duration_ms REAL NOT NULL,
+    status TEXT NOT NULL CHECK(status IN ('ok', 'error')),
+    result INTEGER,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_runs_started ON job_runs(started_at);
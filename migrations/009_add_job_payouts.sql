@@ -0,0 +1,12 @@
+-- Migration: Add the job payout ledger
+-- Every allowance or interest payout claims its (job, config, period) key
+-- here in the same transaction that pays it. Reruns and resumed runs skip
+-- keys that are already present, so a period can never be paid twice.
+
+CREATE TABLE IF NOT EXISTS job_payouts (
+    job TEXT NOT NULL CHECK(job IN ('allowance', 'interest')),
+    config_id INTEGER NOT NULL,
+    period_date TEXT NOT NULL,
+    paid_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (job, config_id, period_date)
+) WITHOUT ROWID;
@@ -0,0 +1,77 @@
+-- Migration: Add per-account, per-category monthly rollups
+-- category_rollups holds the total and count of settled money moving in or
+-- out of each account, by category and calendar month (YYYY-MM). Triggers on
+-- transactions keep it current for every writer (request handlers, the
+-- scheduler, the sqlite3 shell), so analytics read a handful of buckets
+-- instead of scanning the ledger. Transfers between accounts are left out:
+-- moving money between your own accounts isn't spending or income.
+-- Rebuild from scratch with: python -m app.analytics backfill
+
+CREATE TABLE IF NOT EXISTS category_rollups (
+    account_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    direction TEXT NOT NULL CHECK(direction IN ('in', 'out')),
+    total INTEGER NOT NULL DEFAULT 0,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, month, category, direction)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS category_rollups_insert AFTER INSERT ON transactions
+WHEN NEW.status IN ('completed', 'approved') AND NEW.transaction_type != 'transfer'
+BEGIN
+    INSERT INTO category_rollups (account_id, month, category, direction, total, count)
+    SELECT NEW.to_account_id, substr(NEW.created_at, 1, 7), COALESCE(NEW.category, 'General'), 'in', NEW.amount, 1
+    WHERE NEW.to_account_id IS NOT NULL
+    ON CONFLICT (account_id, month, category, direction)
+    DO UPDATE SET total = total + excluded.total, count = count + 1;
+
+    INSERT INTO category_rollups (account_id, month, category, direction, total, count)
+    SELECT NEW.from_account_id, substr(NEW.created_at, 1, 7), COALESCE(NEW.category, 'General'), 'out', NEW.amount, 1
+    WHERE NEW.from_account_id IS NOT NULL
+    ON CONFLICT (account_id, month, category, direction)
+    DO UPDATE SET total = total + excluded.total, count = count + 1;
+END;
+
+-- A pending withdrawal counts once it is approved
+CREATE TRIGGER IF NOT EXISTS category_rollups_approve AFTER UPDATE OF status ON transactions
+WHEN OLD.status = 'pending' AND NEW.status IN ('completed', 'approved') AND NEW.transaction_type != 'transfer'
+BEGIN
+    INSERT INTO category_rollups (account_id, month, category, direction, total, count)
+    SELECT NEW.to_account_id, substr(NEW.created_at, 1, 7), COALESCE(NEW.category, 'General'), 'in', NEW.amount, 1
+    WHERE NEW.to_account_id IS NOT NULL
+    ON CONFLICT (account_id, month, category, direction)
+    DO UPDATE SET total = total + excluded.total, count = count + 1;
+
+    INSERT INTO category_rollups (account_id, month, category, direction, total, count)
+    SELECT NEW.from_account_id, substr(NEW.created_at, 1, 7), COALESCE(NEW.category, 'General'), 'out', NEW.amount, 1
+    WHERE NEW.from_account_id IS NOT NULL
+    ON CONFLICT (account_id, month, category, direction)
+    DO UPDATE SET total = total + excluded.total, count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS category_rollups_delete AFTER DELETE ON transactions
+WHEN OLD.status IN ('completed', 'approved') AND OLD.transaction_type != 'transfer'
+BEGIN
+    UPDATE category_rollups SET total = total - OLD.amount, count = count - 1
+    WHERE account_id = OLD.to_account_id AND month = substr(OLD.created_at, 1, 7)
+      AND category = COALESCE(OLD.category, 'General') AND direction = 'in';
+    UPDATE category_rollups SET total = total - OLD.amount, count = count - 1
+    WHERE account_id = OLD.from_account_id AND month = substr(OLD.created_at, 1, 7)
+      AND category = COALESCE(OLD.category, 'General') AND direction = 'out';
+END;
+
+-- Backfill existing history
+INSERT OR REPLACE INTO category_rollups (account_id, month, category, direction, total, count)
+SELECT account_id, month, category, direction, SUM(amount), COUNT(*)
+FROM (
+    SELECT to_account_id AS account_id, substr(created_at, 1, 7) AS month,
+           COALESCE(category, 'General') AS category, 'in' AS direction, amount
+    FROM transactions
+    WHERE to_account_id IS NOT NULL AND status IN ('completed', 'approved') AND transaction_type != 'transfer'
+    UNION ALL
+    SELECT from_account_id, substr(created_at, 1, 7), COALESCE(category, 'General'), 'out', amount
+    FROM transactions
+    WHERE from_account_id IS NOT NULL AND status IN ('completed', 'approved') AND transaction_type != 'transfer'
+)
+GROUP BY account_id, month, category, direction;
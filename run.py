@@ -2,31 +2,26 @@
 
 import os
 import threading
-import time
 from dotenv import load_dotenv
-from app.main import create_app
-from app.jobs import run_all_jobs
 
-# Load environment variables from .env file
+# Load .env before app.models reads DATABASE_PATH, TENANTS_DIR and DB_POOL_*
 load_dotenv()
 
-app = create_app()
+from app import startup  # first of the app modules, so its clock covers the rest
+from app.main import create_app
 
+startup.mark('import app')
 
-def scheduler():
-    """Background scheduler that runs jobs every hour."""
-    while True:
-        try:
-            with app.app_context():
-                run_all_jobs()
-        except Exception as e:
-            print(f"Scheduler error: {e}")
-        time.sleep(3600)  # Run every hour
+app = create_app()
 
 
 if __name__ == '__main__':
-    # Start background scheduler
-    scheduler_thread = threading.Thread(target=scheduler, daemon=True)
+    # Development server: run the scheduler in a background thread. In
+    # production it runs as its own process (python -m app.scheduler); the
+    # lease keeps jobs on a single leader either way.
+    from app.scheduler import run_forever
+
+    scheduler_thread = threading.Thread(target=run_forever, daemon=True)
     scheduler_thread.start()
 
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,70 @@
+"""Tests for the category rollups and the spending analytics endpoint."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.analytics import backfill_category_rollups, months_back
+
+
+def rollups():
+    db = models.get_db()
+    try:
+        return {
+            (r['account_id'], r['category'], r['direction']): (r['total'], r['count'])
+            for r in db.execute('SELECT * FROM category_rollups WHERE count > 0')
+        }
+    finally:
+        db.close()
+
+
+def test_rollups_follow_settled_transactions(parent, kid):
+    accounts = kid.accounts
+    checking = accounts['checking']
+    parent.post('/api/transactions/deposit', json={'to_account_id': checking, 'amount': 20, 'category': 'Chores'})
+    kid.post('/api/transactions/withdraw', json={'from_account_id': checking, 'amount': 4, 'category': 'Toys'})
+    kid.post('/api/transactions/transfer', json={'from_account_id': checking, 'to_account_id': accounts['savings'], 'amount': 5})
+
+    # The withdrawal waits for approval; the transfer never counts
+    kid_buckets = {key: value for key, value in rollups().items() if key[0] in accounts.values()}
+    assert kid_buckets == {(checking, 'Chores', 'in'): (2000, 1)}
+
+    txn_id = parent.get('/api/transactions/pending').get_json()[0]['id']
+    parent.post(f'/api/transactions/{txn_id}/approve')
+    assert rollups()[(checking, 'Toys', 'out')] == (400, 1)
+
+
+def test_backfill_matches_trigger_totals(parent):
+    accounts = parent.accounts
+    for amount, category in ((3, 'Chores'), (2.5, 'Chores'), (10, 'Gift')):
+        parent.post('/api/transactions/deposit', json={
+            'to_account_id': accounts['checking'], 'amount': amount, 'category': category
+        })
+    before = rollups()
+
+    db = models.get_db()
+    try:
+        backfill_category_rollups(db)
+    finally:
+        db.close()
+
+    assert rollups() == before
+    assert before[(accounts['checking'], 'Chores', 'in')] == (550, 2)
+
+
+def test_endpoint_reports_dollars_scoped_to_the_kid(parent, kid):
+    accounts = kid.accounts
+    ava_checking = next(a['id'] for a in parent.get('/api/accounts').get_json()
+                        if a['owner_username'] == 'ava' and a['account_type'] == 'checking')
+    parent.post('/api/transactions/deposit', json={'to_account_id': accounts['checking'], 'amount': 8, 'category': 'Chores'})
+    parent.post('/api/transactions/deposit', json={'to_account_id': ava_checking, 'amount': 99, 'category': 'Gift'})
+
+    body = kid.get('/api/analytics/categories?months=3').get_json()
+    assert [(c['category'], c['received'], c['spent']) for c in body['categories']] == [('Chores', 8.0, 0.0)]
+    assert body['months'][0]['amount'] == 8.0
+
+    assert kid.get(f'/api/analytics/categories?account_id={ava_checking}').status_code == 403
+    assert kid.get('/api/analytics/categories?end=2025-13').status_code == 400
+    assert months_back('2026-02', 3) == '2025-12'
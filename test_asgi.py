@@ -0,0 +1,88 @@
+"""Tests for the async handlers of the ASGI server mode."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import metrics
+from app.asgi import create_asgi_app
+from app.events import change_bus
+
+
+def scope(client, path, query=''):
+    cookie = client.get_cookie('session')
+    headers = [(b'cookie', f'session={cookie.value}'.encode())] if cookie else []
+    return {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(), 'headers': headers}
+
+
+def asgi_get(asgi_app, request_scope):
+    """Run one request through the ASGI app; returns (status, body text)."""
+    messages = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(request_scope, receive, send))
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], body.decode()
+
+
+def test_async_reads_answer_like_the_flask_views(app, parent, kid):
+    for amount in (5, 7.5, 1.25):
+        parent.post('/api/transactions/deposit', json={'to_account_id': kid.accounts['checking'], 'amount': amount})
+    asgi_app = create_asgi_app(app)
+
+    for path, query in (('/api/dashboard', ''),
+                        (f"/api/accounts/{kid.accounts['checking']}/transactions", 'limit=2'),
+                        ('/api/export', 'format=ndjson')):
+        status, body = asgi_get(asgi_app, scope(kid, path, query))
+        flask_response = kid.get(f'{path}?{query}')
+        assert (status, body) == (flask_response.status_code, flask_response.get_data(as_text=True))
+
+    status, _ = asgi_get(asgi_app, scope(app.test_client(), '/api/dashboard'))
+    assert status == 401
+    status, body = asgi_get(asgi_app, scope(kid, '/api/accounts/999/transactions'))
+    assert (status, body) == (404, '{"error":"Account not found"}\n')
+    status, body = asgi_get(asgi_app, scope(kid, '/api/export', 'account_id=abc'))
+    assert (status, body) == (400, '{"error":"Invalid account_id"}\n')
+
+    text = metrics.metrics.render()
+    assert 'familybank_requests_total{method="GET",route="/api/accounts/<int:account_id>/transactions",status="404"}' in text
+
+
+def test_event_stream_waits_without_a_thread_and_ends_on_disconnect(app, kid):
+    flask_limit = change_bus.max_streams
+    asgi_app = create_asgi_app(app, max_streams=flask_limit + 1)
+    # The higher limit applies to async streams only
+    assert change_bus.max_streams == flask_limit
+
+    async def scenario():
+        chunks = asyncio.Queue()
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message.get('body'):
+                await chunks.put(message['body'].decode())
+
+        stream = asyncio.create_task(asgi_app(scope(kid, '/api/events'), receive, send))
+        assert (await asyncio.wait_for(chunks.get(), 5)).startswith('retry:')
+
+        # Published from another thread, as a Flask write handler would
+        await asyncio.to_thread(change_bus.publish, 'balance', {'balance': 13.75}, user_ids=[kid.user_id])
+        assert 'event: balance' in await asyncio.wait_for(chunks.get(), 5)
+
+        disconnect.set()
+        await asyncio.to_thread(change_bus.publish, 'pending', {'count': 0}, user_ids=[kid.user_id])
+        await asyncio.wait_for(stream, 5)
+
+    asyncio.run(scenario())
+    assert change_bus.subscriber_count() == 0
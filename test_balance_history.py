@@ -0,0 +1,61 @@
+"""Tests for daily balance snapshots and the balance-history endpoint."""
+
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+
+
+def kid_accounts(parent):
+    accounts = parent.get('/api/accounts').get_json()
+    return {a['account_type']: a['id'] for a in accounts if a['owner_username'] == 'sam'}
+
+
+def test_write_paths_keep_todays_snapshot_current(parent):
+    accounts = kid_accounts(parent)
+    parent.post('/api/transactions/deposit', json={'to_account_id': accounts['checking'], 'amount': 25})
+    parent.post('/api/transactions/transfer', json={
+        'from_account_id': accounts['checking'], 'to_account_id': accounts['savings'], 'amount': 10
+    })
+
+    db = models.get_db()
+    snapshots = dict(db.execute(
+        'SELECT account_id, balance FROM balance_snapshots WHERE snapshot_date = ?',
+        (date.today().isoformat(),)
+    ).fetchall())
+    db.close()
+
+    assert snapshots[accounts['checking']] == 1500
+    assert snapshots[accounts['savings']] == 1000
+
+
+def test_series_carries_snapshots_forward(parent):
+    checking = kid_accounts(parent)['checking']
+    today = date.today()
+    db = models.get_db()
+    db.execute(
+        'INSERT INTO balance_snapshots (account_id, snapshot_date, balance) VALUES (?, ?, ?)',
+        (checking, (today - timedelta(days=5)).isoformat(), 750)
+    )
+    db.execute('DELETE FROM balance_snapshots WHERE account_id = ? AND snapshot_date = ?', (checking, today.isoformat()))
+    db.commit()
+    db.close()
+    parent.post('/api/transactions/deposit', json={'to_account_id': checking, 'amount': 2.5})
+
+    start = today - timedelta(days=6)
+    response = parent.get(f'/api/accounts/{checking}/balance-history?start={start.isoformat()}')
+    series = response.get_json()['series']
+
+    assert [point['balance'] for point in series] == [None, 7.5, 7.5, 7.5, 7.5, 7.5, 2.5]
+    assert series[-1]['date'] == today.isoformat()
+
+
+def test_series_validates_range(parent):
+    checking = kid_accounts(parent)['checking']
+    assert parent.get(f'/api/accounts/{checking}/balance-history?start=nope').status_code == 400
+    assert parent.get(
+        f'/api/accounts/{checking}/balance-history?start=2025-02-01&end=2025-01-01'
+    ).status_code == 400
@@ -0,0 +1,84 @@
+"""Tests for the batch deposit and batch approval endpoints."""
+
+
+def checking_ids(client):
+    accounts = client.get('/api/accounts').get_json()
+    return {a['owner_username']: a['id'] for a in accounts if a['account_type'] == 'checking'}
+
+
+def balances(client):
+    return {a['id']: a['balance'] for a in client.get('/api/accounts').get_json()}
+
+
+def test_batch_deposit_pays_every_kid_in_one_request(parent):
+    ids = checking_ids(parent)
+    response = parent.post('/api/transactions/batch', json={'deposits': [
+        {'to_account_id': ids['sam'], 'amount': 5, 'category': 'Chores'},
+        {'to_account_id': ids['ava'], 'amount': 7.5, 'category': 'Chores'},
+        {'to_account_id': ids['sam'], 'amount': 1},
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r['status'] for r in body['results']] == ['ok', 'ok', 'ok']
+    assert all('transaction_id' in r for r in body['results'])
+    assert body['message'] == '$13.50 deposited into 2 account(s)'
+    assert balances(parent)[ids['sam']] == 6.0
+    assert balances(parent)[ids['ava']] == 7.5
+
+
+def test_batch_deposit_is_all_or_nothing(parent):
+    ids = checking_ids(parent)
+    response = parent.post('/api/transactions/batch', json={'deposits': [
+        {'to_account_id': ids['sam'], 'amount': 5},
+        {'to_account_id': 99999, 'amount': 5},
+        {'to_account_id': ids['ava'], 'amount': -1},
+    ]})
+
+    assert response.status_code == 400
+    assert [r.get('error') for r in response.get_json()['results']] == [None, 'Account not found', 'Invalid deposit']
+    assert balances(parent)[ids['sam']] == 0
+
+
+def test_approve_batch_checks_funds_cumulatively(app, parent):
+    ids = checking_ids(parent)
+    parent.post('/api/transactions/deposit', json={'to_account_id': ids['sam'], 'amount': 10})
+    parent.post('/api/transactions/deposit', json={'to_account_id': ids['ava'], 'amount': 10})
+    for name, amounts in (('sam', (6, 6)), ('ava', (3,))):
+        kid = app.test_client()
+        kid.post('/api/auth/login', json={'username': name, 'password': f'{name}123'})
+        for amount in amounts:
+            kid.post('/api/transactions/withdraw', json={'from_account_id': ids[name], 'amount': amount})
+    pending = [t['id'] for t in parent.get('/api/transactions/pending').get_json()]
+
+    # Both of Sam's requests together exceed the balance: nothing is approved
+    response = parent.post('/api/transactions/approve-batch', json={'transaction_ids': pending})
+    assert response.status_code == 400
+    assert len(parent.get('/api/transactions/pending').get_json()) == 3
+
+    by_amount = {}
+    for txn in parent.get('/api/transactions/pending').get_json():
+        by_amount.setdefault(txn['amount'], []).append(txn['id'])
+    response = parent.post('/api/transactions/approve-batch', json={'transaction_ids': [by_amount[3][0], by_amount[6][0]]})
+    assert response.status_code == 200
+    assert response.get_json()['message'] == '2 withdrawal(s) approved'
+    assert balances(parent)[ids['sam']] == 4
+    assert balances(parent)[ids['ava']] == 7
+    assert len(parent.get('/api/transactions/pending').get_json()) == 1
+
+
+def test_batch_deposit_only_pays_into_kid_accounts(parent):
+    ids = checking_ids(parent)
+    vault = next(a['id'] for a in parent.get('/api/accounts').get_json() if a['account_type'] == 'parent_vault')
+    before = balances(parent)
+
+    # JSON true is not account 1, and the vault can't be a target
+    for target in (True, False, vault, str(ids['sam'])):
+        response = parent.post('/api/transactions/batch', json={'deposits': [
+            {'to_account_id': ids['sam'], 'amount': 5},
+            {'to_account_id': target, 'amount': 5},
+        ]})
+        assert response.status_code == 400, target
+        assert response.get_json()['results'][1]['status'] == 'error'
+
+    assert balances(parent) == before
@@ -0,0 +1,34 @@
+"""Smoke test for the benchmark harness at a tiny scale."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from app import models
+import bench_api
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert [bench_api.percentile(values, p) for p in (50, 95, 99)] == [50, 95, 99]
+    assert bench_api.percentile([7.0], 99) == 7.0
+
+
+def test_bench_run_records_and_compares_results(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(models, 'DATABASE_PATH', models.DATABASE_PATH)
+    argv = ['--families', '1', '--kids', '2', '--years', '1', '--txns-per-week', '2',
+            '--requests', '8', '--concurrency', '2', '--results-dir', str(tmp_path)]
+
+    first = bench_api.main(argv)
+    assert set(first['endpoints']) == {'dashboard_kid', 'dashboard_parent', 'transactions_page', 'deposit', 'withdraw'}
+    assert all(stats['requests'] == 8 and stats['errors'] == 0 for stats in first['endpoints'].values())
+    assert first['jobs']['allowances']['processed'] == 2
+
+    bench_api.main(argv + ['--compare', 'latest'])
+    saved = sorted(tmp_path.glob('*.json'))
+    assert len(saved) == 2
+    assert json.loads(saved[0].read_text())['params'] == first['params']
+    assert 'Compared with' in capsys.readouterr().out
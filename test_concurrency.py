@@ -0,0 +1,109 @@
+"""Concurrency stress tests for money movements."""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import ledger, models
+
+THREADS = 8
+
+
+def login(app, username, password):
+    client = app.test_client()
+    assert client.post('/api/auth/login', json={'username': username, 'password': password}).status_code == 200
+    return client
+
+
+def test_parallel_withdrawals_transfers_and_approvals_never_overdraw(app):
+    parent = login(app, 'admin', 'changeme')
+    parent.post('/api/admin/users', json={'username': 'sam', 'display_name': 'Sam', 'password': 'sam123', 'role': 'kid'})
+    accounts = {a['account_type']: a['id'] for a in parent.get('/api/accounts').get_json()
+                if a['owner_username'] == 'sam'}
+    checking, savings = accounts['checking'], accounts['savings']
+    parent.post('/api/transactions/deposit', json={'to_account_id': checking, 'amount': 10})
+
+    # A few withdrawals wait for approval while instant ones race them
+    kid = login(app, 'sam', 'sam123')
+    for _ in range(6):
+        kid.post('/api/transactions/withdraw', json={'from_account_id': checking, 'amount': 1})
+    pending = [t['id'] for t in parent.get('/api/transactions/pending').get_json()]
+    parent.put('/api/admin/settings', json={'withdrawal_approval_required': 'false'})
+
+    barrier = threading.Barrier(THREADS)
+
+    def worker(index):
+        client = login(app, 'admin', 'changeme') if index % 4 in (0, 3) else login(app, 'sam', 'sam123')
+        barrier.wait()
+        statuses = []
+        for n in range(15):
+            if index % 4 == 0:
+                response = client.post(f'/api/transactions/{pending[n % len(pending)]}/approve')
+            elif index % 4 == 3:
+                if n % 2:
+                    response = client.post('/api/transactions/approve-batch', json={
+                        'transaction_ids': [pending[n % len(pending)], pending[(n + 1) % len(pending)]]
+                    })
+                else:
+                    response = client.post('/api/transactions/batch', json={
+                        'deposits': [{'to_account_id': checking, 'amount': 0.25}]
+                    })
+            elif index % 4 == 1:
+                response = client.post('/api/transactions/transfer', json={
+                    'from_account_id': checking if n % 2 else savings,
+                    'to_account_id': savings if n % 2 else checking, 'amount': 0.75
+                })
+            else:
+                response = client.post('/api/transactions/withdraw', json={'from_account_id': checking, 'amount': 0.5})
+            statuses.append(response.status_code)
+        return statuses
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = [status for result in pool.map(worker, range(THREADS)) for status in result]
+
+    # Every request either succeeded or was refused cleanly; none hit a lock error
+    assert set(statuses) <= {200, 400, 404}
+    assert statuses.count(200) > 0
+
+    db = models.get_db()
+    try:
+        rows = db.execute('SELECT id, balance FROM accounts WHERE id IN (?, ?)', (checking, savings)).fetchall()
+        for row in rows:
+            assert row['balance'] >= 0
+            credits = db.execute('''
+                SELECT COALESCE(SUM(amount), 0) FROM transactions
+                WHERE to_account_id = ? AND status IN ('completed', 'approved')
+            ''', (row['id'],)).fetchone()[0]
+            debits = db.execute('''
+                SELECT COALESCE(SUM(amount), 0) FROM transactions
+                WHERE from_account_id = ? AND status IN ('completed', 'approved')
+            ''', (row['id'],)).fetchone()[0]
+            assert row['balance'] == credits - debits
+        assert sum(row['balance'] for row in rows) >= 0
+        approvals = db.execute("SELECT COUNT(*) FROM transactions WHERE id IN ({}) AND status = 'approved'"
+                               .format(','.join('?' * len(pending))), pending).fetchone()[0]
+        assert approvals <= len(pending)
+    finally:
+        db.close()
+
+
+def test_run_in_transaction_retries_while_the_database_is_locked(app):
+    holder, writer = models.get_db(), models.get_db()
+    writer.execute('PRAGMA busy_timeout=0')
+    holder.execute('BEGIN IMMEDIATE')
+    threading.Timer(0.2, holder.rollback).start()
+
+    try:
+        ledger.run_in_transaction(writer, lambda db: ledger.credit(db, 1, 100), retries=8, backoff=0.05)
+        assert writer.execute('SELECT balance FROM accounts WHERE id = 1').fetchone()[0] == models.PARENT_VAULT_BALANCE + 100
+        with pytest.raises(ledger.InsufficientFunds):
+            ledger.run_in_transaction(writer, lambda db: ledger.debit(db, 1, models.PARENT_VAULT_BALANCE + 101))
+        assert not writer.in_transaction
+    finally:
+        holder.close()
+        writer.close()
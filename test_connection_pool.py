@@ -0,0 +1,79 @@
+"""Tests for the request connection pool in app.models."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.models import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+def test_connections_are_configured_once_and_reused(pool):
+    db = pool.acquire()
+    assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert db.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+    assert db.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+    pool.release(db)
+
+    assert pool.acquire() is db
+    stats = pool.stats()
+    assert stats['opens'] == 1
+    assert stats['hits'] == 1
+    assert stats['in_use'] == 1
+
+
+def test_pool_is_bounded_and_waits_for_release(pool):
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    assert pool.acquire() is first
+
+    stats = pool.stats()
+    assert stats['size'] == 2
+    assert stats['waits'] == 2
+    assert stats['timeouts'] == 1
+    pool.release(second)
+
+
+def test_release_rolls_back_and_bad_connections_are_replaced(pool):
+    db = pool.acquire()
+    db.execute('CREATE TABLE t (x INTEGER)')
+    db.commit()
+    db.execute('INSERT INTO t VALUES (1)')
+    pool.release(db)
+    assert db.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+    db.close()
+    replacement = pool.acquire()
+    assert replacement is not db
+    assert pool.stats()['discards'] == 1
+    assert pool.stats()['opens'] == 2
+
+
+def test_least_recently_used_pool_is_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(models, 'MAX_POOLS', 2)
+    monkeypatch.setattr(models, '_pools', models.OrderedDict())
+    first = models.get_pool(str(tmp_path / 'a.db'))
+    checked_out = first.acquire()
+    models.get_pool(str(tmp_path / 'b.db'))
+    models.get_pool(str(tmp_path / 'c.db'))
+
+    assert list(models._pools) == [str(tmp_path / 'b.db'), str(tmp_path / 'c.db')]
+    # A connection handed out before eviction is closed when it comes back
+    first.release(checked_out)
+    assert first.stats()['size'] == 0
+    with pytest.raises(models.sqlite3.ProgrammingError):
+        checked_out.execute('SELECT 1')
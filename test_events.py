@@ -0,0 +1,74 @@
+"""Tests for the change bus and the /api/events stream."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.events import ChangeBus, change_bus
+
+
+def read_events(response, count):
+    """Read `count` events from a streaming response as (name, data) pairs."""
+    events = []
+    chunks = iter(response.response)
+    while len(events) < count:
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_events_only_reach_their_audience():
+    bus = ChangeBus(max_streams=3)
+    kid, other_kid, parent = bus.subscribe(1, 'kid'), bus.subscribe(2, 'kid'), bus.subscribe(3, 'parent')
+
+    bus.publish('balance', {'account_id': 10}, user_ids=[1], parents=True)
+
+    assert kid.queue.qsize() == 1
+    assert other_kid.queue.qsize() == 0
+    assert parent.queue.qsize() == 1
+    assert bus.subscribe(4, 'kid') is None
+
+
+def test_reconnect_replays_missed_events():
+    bus = ChangeBus(max_streams=2)
+    subscription = bus.subscribe(1, 'kid')
+    bus.publish('balance', {'n': 1}, user_ids=[1])
+    seen = subscription.queue.get_nowait()
+    bus.unsubscribe(subscription)
+
+    bus.publish('balance', {'n': 2}, user_ids=[1])
+    bus.publish('balance', {'n': 3}, user_ids=[2])
+
+    resumed = bus.subscribe(1, 'kid', last_event_id=seen.id)
+    assert [resumed.queue.get_nowait().data for _ in range(resumed.queue.qsize())] == [{'n': 2}]
+    assert bus.subscribe(5, 'kid', last_event_id='other-process-7').queue.qsize() == 0
+
+
+def test_stream_pushes_balances_and_reviews_to_the_kid(parent, kid):
+    checking = kid.accounts['checking']
+
+    kid_stream = kid.get('/api/events')
+    parent_stream = parent.get('/api/events')
+    assert kid_stream.mimetype == 'text/event-stream'
+    try:
+        parent.post('/api/transactions/deposit', json={'to_account_id': checking, 'amount': 20})
+        kid.post('/api/transactions/withdraw', json={'from_account_id': checking, 'amount': 5})
+        txn_id = parent.get('/api/transactions/pending').get_json()[0]['id']
+        parent.post(f'/api/transactions/{txn_id}/approve')
+
+        assert read_events(kid_stream, 3) == [
+            ('balance', {'account_id': checking, 'balance': 20.0}),
+            ('review', {'transaction_id': txn_id, 'status': 'approved', 'amount': 5.0}),
+            ('balance', {'account_id': checking, 'balance': 15.0}),
+        ]
+        assert [name for name, _ in read_events(parent_stream, 4)] == ['balance', 'pending', 'balance', 'pending']
+    finally:
+        kid_stream.close()
+        parent_stream.close()
+
+    assert change_bus.subscriber_count() == 0
@@ -0,0 +1,61 @@
+"""Tests for the streaming statement export."""
+
+import csv
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import export
+
+
+@pytest.fixture(autouse=True)
+def history(parent):
+    """A deposit into Sam's checking, then a transfer to savings."""
+    accounts = parent.accounts
+    parent.post('/api/transactions/deposit', json={'to_account_id': accounts['checking'], 'amount': 12.34})
+    parent.post('/api/transactions/transfer', json={
+        'from_account_id': accounts['checking'], 'to_account_id': accounts['savings'], 'amount': 2
+    })
+
+
+def test_family_csv_lists_both_sides_of_a_transfer(parent, monkeypatch):
+    monkeypatch.setattr(export, 'EXPORT_BATCH_SIZE', 1)
+    response = parent.get('/api/export')
+
+    assert response.mimetype == 'text/csv'
+    assert 'attachment' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(int(r['account_id']), r['type'], r['amount']) for r in rows] == [
+        (parent.accounts['checking'], 'parent_deposit', '12.34'),
+        (parent.accounts['checking'], 'transfer', '-2.00'),
+        (parent.accounts['savings'], 'transfer', '2.00'),
+    ]
+
+
+def test_ndjson_filters_by_account_and_date(parent):
+    response = parent.get(f"/api/export?format=ndjson&account_id={parent.accounts['savings']}")
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(r['type'], r['amount']) for r in records] == [('transfer', 2.0)]
+
+    response = parent.get('/api/export?format=csv&start=2000-01-01&end=2000-12-31')
+    assert response.get_data(as_text=True).strip() == ','.join(export.EXPORT_COLUMNS)
+
+
+def test_kids_can_only_export_their_own_accounts(parent, kid):
+    vault = next(a['id'] for a in parent.get('/api/accounts').get_json() if a['account_type'] == 'parent_vault')
+
+    assert kid.get(f'/api/export?account_id={vault}').status_code == 403
+    assert len(kid.get('/api/export?format=ndjson').get_data(as_text=True).splitlines()) == 3
+    assert kid.get('/api/export?format=xml').status_code == 400
+
+
+def test_malformed_account_ids_are_rejected(parent):
+    for query in ('account_id=abc', f"account_id={parent.accounts['savings']}&account_id=1.5"):
+        response = parent.get(f'/api/export?{query}')
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid account_id'}
@@ -0,0 +1,203 @@
+"""Tests for the scheduled allowance and interest jobs."""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import jobs, models
+from app.jobs import process_allowances
+
+
+def create_kid(db, username='kid'):
+    db.execute(
+        'INSERT INTO users (username, display_name, password_hash, role) VALUES (?, ?, ?, ?)',
+        (username, username.title(), 'x', 'kid')
+    )
+    kid_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+    db.execute(
+        'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
+        (kid_id, 'checking', 'Main', 1, 0)
+    )
+    checking_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+    return kid_id, checking_id
+
+
+def create_allowance(db, kid_id, amount, frequency, next_payment_date, day_of_week=None, day_of_month=None):
+    db.execute('''
+        INSERT INTO allowance_config (user_id, amount, frequency, next_payment_date, day_of_week, day_of_month, active)
+        VALUES (?, ?, ?, ?, ?, ?, 1)
+    ''', (kid_id, amount, frequency, next_payment_date.isoformat(), day_of_week, day_of_month))
+    return db.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+
+def test_catch_up_pays_every_missed_week_in_one_run(db):
+    today = date.today()
+    kid_id, checking_id = create_kid(db)
+    first_missed = today - timedelta(weeks=3)
+    config_id = create_allowance(db, kid_id, 500, 'weekly', first_missed, day_of_week=first_missed.weekday())
+    db.commit()
+
+    assert process_allowances() == 1
+
+    balance = db.execute('SELECT balance FROM accounts WHERE id = ?', (checking_id,)).fetchone()['balance']
+    assert balance == 2000
+
+    paid_dates = [row['created_at'][:10] for row in db.execute(
+        'SELECT created_at FROM transactions WHERE to_account_id = ? ORDER BY created_at', (checking_id,)
+    )]
+    # Missed periods are backdated; today's payment keeps the current timestamp
+    assert len(paid_dates) == 4
+    assert paid_dates[:3] == [(first_missed + timedelta(weeks=n)).isoformat() for n in range(3)]
+
+    next_date = db.execute(
+        'SELECT next_payment_date FROM allowance_config WHERE id = ?', (config_id,)
+    ).fetchone()['next_payment_date']
+    assert next_date == (today + timedelta(weeks=1)).isoformat()
+
+    # A second run finds nothing due
+    assert process_allowances() == 0
+
+
+def test_without_catch_up_pays_a_single_period(db):
+    today = date.today()
+    kid_id, checking_id = create_kid(db)
+    create_allowance(db, kid_id, 500, 'weekly', today - timedelta(weeks=3))
+    db.commit()
+
+    assert process_allowances(catch_up=False) == 1
+
+    balance = db.execute('SELECT balance FROM accounts WHERE id = ?', (checking_id,)).fetchone()['balance']
+    assert balance == 500
+
+
+def balance_of(db, account_id):
+    return db.execute('SELECT balance FROM accounts WHERE id = ?', (account_id,)).fetchone()['balance']
+
+
+def test_rerunning_a_paid_period_is_a_no_op(db):
+    today = date.today()
+    kid_id, checking_id = create_kid(db)
+    first_missed = today - timedelta(weeks=2)
+    config_id = create_allowance(db, kid_id, 500, 'weekly', first_missed, day_of_week=first_missed.weekday())
+    db.commit()
+    assert process_allowances() == 1
+    assert balance_of(db, checking_id) == 1500
+
+    # Rewind the schedule, as a retry after a lost checkpoint would see it
+    db.execute('UPDATE allowance_config SET next_payment_date = ? WHERE id = ?', (first_missed.isoformat(), config_id))
+    db.commit()
+    process_allowances()
+
+    assert balance_of(db, checking_id) == 1500
+    assert db.execute("SELECT COUNT(*) FROM job_payouts WHERE job = 'allowance'").fetchone()[0] == 3
+    next_date = db.execute('SELECT next_payment_date FROM allowance_config WHERE id = ?', (config_id,)).fetchone()[0]
+    assert next_date == (today + timedelta(weeks=1)).isoformat()
+
+
+def test_crash_keeps_committed_chunks_and_resumes(db, monkeypatch):
+    today = date.today()
+    accounts = []
+    for name in ('ann', 'ben', 'cat'):
+        kid_id, checking_id = create_kid(db, name)
+        create_allowance(db, kid_id, 500, 'weekly', today, day_of_week=today.weekday())
+        accounts.append(checking_id)
+    db.commit()
+
+    record = jobs.record_balance_snapshots
+    calls = []
+
+    def failing_record(db, account_ids):
+        calls.append(account_ids)
+        if len(calls) == 2:
+            raise RuntimeError('simulated crash')
+        record(db, account_ids)
+
+    monkeypatch.setattr(jobs, 'record_balance_snapshots', failing_record)
+    with pytest.raises(RuntimeError):
+        process_allowances(chunk_size=1)
+
+    # The first chunk is committed, the one in flight is rolled back
+    assert [balance_of(db, account_id) for account_id in accounts] == [500, 0, 0]
+
+    assert process_allowances(chunk_size=1) == 2
+    assert [balance_of(db, account_id) for account_id in accounts] == [500, 500, 500]
+
+
+def test_interest_is_paid_once_per_day(db):
+    kid_id, checking_id = create_kid(db)
+    db.execute('UPDATE accounts SET balance = 10000 WHERE id = ?', (checking_id,))
+    db.execute("INSERT INTO interest_config (account_id, annual_rate, compound_frequency) VALUES (?, 12.0, 'monthly')",
+               (checking_id,))
+    db.commit()
+
+    assert jobs.process_interest() == 1
+    assert balance_of(db, checking_id) == 10100
+
+    db.execute('UPDATE interest_config SET last_applied = NULL')
+    db.commit()
+    jobs.process_interest()
+    assert balance_of(db, checking_id) == 10100
+
+
+def test_late_interest_run_compounds_every_missed_period(db):
+    kid_id, checking_id = create_kid(db)
+    db.execute('UPDATE accounts SET balance = 100000 WHERE id = ?', (checking_id,))
+    last_applied = jobs._add_months(datetime.now(), -3) - timedelta(days=1)
+    db.execute('''
+        INSERT INTO interest_config (account_id, annual_rate, compound_frequency, last_applied)
+        VALUES (?, 12.0, 'monthly', ?)
+    ''', (checking_id, last_applied.isoformat()))
+    db.commit()
+
+    assert jobs.process_interest() == 1
+
+    # Three whole months at 1% a month: 100000 * (1.01 ** 3 - 1) = 3030.1
+    assert balance_of(db, checking_id) == 103030
+    applied_through = db.execute('SELECT last_applied FROM interest_config').fetchone()[0]
+    assert applied_through == jobs._add_months(last_applied, 3).isoformat()
+    assert jobs.process_interest() == 0
+
+
+def test_partitioned_run_pays_every_kid_once_across_worker_processes(db):
+    today = date.today()
+    accounts = []
+    for n in range(7):
+        kid_id, checking_id = create_kid(db, f'kid{n}')
+        create_allowance(db, kid_id, 500, 'weekly', today, day_of_week=today.weekday())
+        db.execute("INSERT INTO interest_config (account_id, annual_rate, compound_frequency) VALUES (?, 12.0, 'monthly')",
+                   (checking_id,))
+        accounts.append(checking_id)
+    db.commit()
+
+    ranges = jobs.user_partitions(db, 3)
+    assert len(ranges) == 3 and ranges[0][0] == 1 and ranges[-1][1] is None
+
+    run = jobs.run_partitioned(workers=2, partitions=3)
+
+    assert run['counts'] == {'allowances': 7, 'interest': 7}
+    assert run['partitions'] == 3
+    assert set(run['timings']['allowances']) == {'load', 'compute', 'write'}
+    # Allowance first, then 1% of it in interest
+    assert [balance_of(db, account_id) for account_id in accounts] == [505] * 7
+    assert jobs.run_partitioned(workers=1, partitions=3)['counts'] == {'allowances': 0, 'interest': 0}
+
+
+def test_monthly_schedule_keeps_its_day_after_a_short_month(db):
+    kid_id, checking_id = create_kid(db)
+    start = date(date.today().year - 1, 1, 31)
+    config_id = create_allowance(db, kid_id, 100, 'monthly', start)
+    db.commit()
+
+    process_allowances()
+
+    paid_dates = [row['created_at'][:10] for row in db.execute(
+        'SELECT created_at FROM transactions WHERE to_account_id = ? ORDER BY created_at', (checking_id,)
+    )][:3]
+    february_end = (date(start.year, 3, 1) - timedelta(days=1)).isoformat()
+    assert paid_dates == [start.isoformat(), february_end, f'{start.year}-03-31']
+    config = db.execute('SELECT day_of_month FROM allowance_config WHERE id = ?', (config_id,)).fetchone()
+    assert config['day_of_month'] == 31
@@ -0,0 +1,66 @@
+"""Tests for request/SQL instrumentation and the /metrics endpoint."""
+
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import metrics, models
+
+
+@pytest.fixture(autouse=True)
+def no_scrape_token(monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+
+
+def sample(text, name, **labels):
+    """Value of one sample line in Prometheus text output."""
+    label_text = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf'^{re.escape(name)}{{{re.escape(label_text)}}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_are_timed_and_their_queries_counted(app):
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'changeme'})
+    before = metrics.metrics.render()
+    client.get('/api/dashboard')
+    client.get('/api/accounts/123/transactions')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    route = {'method': 'GET', 'route': '/api/dashboard'}
+    calls_before = sample(before, 'familybank_request_duration_seconds_count', **route) or 0
+    queries_before = sample(before, 'familybank_request_queries_sum', **route) or 0
+    assert sample(text, 'familybank_request_duration_seconds_count', **route) == calls_before + 1
+    assert sample(text, 'familybank_request_queries_sum', **route) > queries_before
+    assert sample(text, 'familybank_requests_total', method='GET',
+                  route='/api/accounts/<int:account_id>/transactions', status='404') >= 1
+    assert 'familybank_db_pool_size' in text
+
+
+def test_metrics_require_a_parent_or_the_scrape_token(app, monkeypatch):
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+
+    monkeypatch.setenv('METRICS_TOKEN', 's3cret')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+
+def test_slow_query_log_prints_sql_and_plan(app, monkeypatch, capsys):
+    monkeypatch.setattr(metrics, 'SLOW_QUERY_MS', 1e-9)
+    db = models.get_db()
+    try:
+        db.execute('SELECT * FROM transactions WHERE to_account_id = ?', (1,)).fetchall()
+    finally:
+        db.close()
+
+    output = capsys.readouterr().out
+    assert '🐢 Slow query' in output
+    assert 'SELECT * FROM transactions WHERE to_account_id = ?' in output
+    assert 'idx_transactions_to_account' in output
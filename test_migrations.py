@@ -0,0 +1,129 @@
+"""Tests for the migration runner and fast startup."""
+
+import os
+import shutil
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+
+
+def test_fresh_database_records_every_migration_then_starts_fast(database, monkeypatch):
+    models.prepare_database()
+
+    db = models.get_db()
+    latest = models.latest_migration_version()
+    rows = db.execute('SELECT version, name, checksum FROM schema_migrations ORDER BY version').fetchall()
+    assert [row['version'] for row in rows] == [m.version for m in models.discover_migrations()]
+    assert all(row['name'] and len(row['checksum']) == 64 for row in rows)
+    assert db.execute('PRAGMA user_version').fetchone()[0] == latest
+    assert db.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'").fetchone()[0] == 1
+    db.close()
+
+    # A new worker finds the database current and skips all schema work
+    def fail():
+        raise AssertionError('schema work on a current database')
+    monkeypatch.setattr(models, '_prepared', set())
+    monkeypatch.setattr(models, 'init_db', fail)
+    monkeypatch.setattr(models, '_apply_migrations', lambda db: fail())
+    monkeypatch.setattr(models, 'seed_demo_data', fail)
+    models.prepare_database()
+    models.run_migrations()
+
+
+def test_new_and_edited_migrations_are_picked_up(database, tmp_path, monkeypatch, capsys):
+    directory = tmp_path / 'migrations'
+    shutil.copytree(models.MIGRATIONS_DIR, directory)
+    monkeypatch.setattr(models, 'MIGRATIONS_DIR', str(directory))
+    models.init_db()
+    models.run_migrations()
+    capsys.readouterr()
+
+    with open(directory / '003_add_transaction_indexes.sql', 'a') as f:
+        f.write('\n-- edited after release\n')
+    (directory / '011_add_notes.sql').write_text('ALTER TABLE users ADD COLUMN notes TEXT;\n')
+    models.run_migrations()
+
+    out = capsys.readouterr().out
+    assert 'Migration 003 has changed' in out
+    assert '✅ Applied migration 011: Add notes' in out
+    db = models.get_db()
+    assert 'notes' in {row[1] for row in db.execute('PRAGMA table_info(users)')}
+    db.close()
+
+
+def test_concurrent_runners_migrate_once(database, capsys):
+    models.init_db()
+    start = threading.Barrier(4)
+    errors = []
+
+    def migrate():
+        start.wait()
+        try:
+            models.run_migrations()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=migrate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    applied = [line for line in capsys.readouterr().out.splitlines() if 'Applied migration' in line]
+    assert len(applied) == len(models.discover_migrations())
+
+
+def test_run_migrations_stamps_user_version(database, monkeypatch):
+    models.init_db()
+    models.run_migrations()
+
+    db = models.get_db()
+    assert db.execute('PRAGMA user_version').fetchone()[0] == models.latest_migration_version()
+    db.close()
+
+    # The next runner finds the database current from user_version alone
+    monkeypatch.setattr(models, '_apply_migrations', lambda db: pytest.fail('migrated a current database'))
+    models.run_migrations()
+
+
+def test_preparing_one_database_does_not_block_another(tmp_path, monkeypatch):
+    slow, fast = str(tmp_path / 'slow.db'), str(tmp_path / 'fast.db')
+    monkeypatch.setattr(models, '_prepared', set())
+    seeding = threading.Event()
+    release = threading.Event()
+    seed_demo_data = models.seed_demo_data
+
+    def seed():
+        if models.current_database_path() == slow:
+            seeding.set()
+            release.wait(10)
+        seed_demo_data()
+    monkeypatch.setattr(models, 'seed_demo_data', seed)
+
+    def prepare(path):
+        token = models.route_database(path)
+        try:
+            models.prepare_database()
+        finally:
+            models.unroute_database(token)
+
+    first = threading.Thread(target=prepare, args=(slow,))
+    first.start()
+    try:
+        assert seeding.wait(10)
+        # Still in the middle of preparing slow.db, another database is served
+        second = threading.Thread(target=prepare, args=(fast,))
+        second.start()
+        second.join(10)
+        assert not second.is_alive()
+        assert fast in models._prepared and slow not in models._prepared
+    finally:
+        release.set()
+        first.join()
+    assert slow in models._prepared
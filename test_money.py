@@ -0,0 +1,137 @@
+"""Tests for integer-cent money handling and the cents migration."""
+
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.money import to_cents, format_money, split_cents, apply_rate
+
+# Money tables as they looked before migration 007 (REAL dollars)
+LEGACY_SCHEMA = '''
+    CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT);
+    CREATE TABLE accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        account_type TEXT NOT NULL,
+        nickname TEXT,
+        is_default INTEGER DEFAULT 0,
+        balance REAL DEFAULT 0.00,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        from_account_id INTEGER,
+        to_account_id INTEGER,
+        amount REAL NOT NULL,
+        transaction_type TEXT NOT NULL,
+        category TEXT DEFAULT 'general',
+        description TEXT,
+        status TEXT DEFAULT 'completed',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        reviewed_by INTEGER,
+        reviewed_at TIMESTAMP
+    );
+    CREATE TABLE allowance_config (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        amount REAL NOT NULL DEFAULT 0.00,
+        frequency TEXT NOT NULL DEFAULT 'weekly',
+        target_account_type TEXT DEFAULT 'checking',
+        next_payment_date TEXT,
+        day_of_week INTEGER,
+        day_of_month INTEGER,
+        active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE balance_snapshots (
+        account_id INTEGER NOT NULL,
+        snapshot_date TEXT NOT NULL,
+        balance REAL NOT NULL,
+        PRIMARY KEY (account_id, snapshot_date)
+    ) WITHOUT ROWID;
+    CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, applied_at TIMESTAMP);
+    INSERT INTO schema_migrations (version) VALUES (1), (2), (3), (4), (5), (6);
+'''
+
+
+def test_to_cents_parses_request_amounts_exactly():
+    assert to_cents(0.1) == 10
+    assert to_cents('19.99') == 1999
+    assert to_cents(5) == 500
+    assert to_cents(0.125) == 13
+    assert to_cents(2 ** 53 / 100) == 2 ** 53
+    for bad in (None, True, 'abc', float('nan'), float('inf'), 1e20, 1e30, '-1e20', '1e999999999'):
+        with pytest.raises(ValueError):
+            to_cents(bad)
+
+
+def test_splits_always_add_up_to_the_total():
+    assert split_cents(1000, [50, 30, 20]) == [500, 300, 200]
+    assert split_cents(100, [33.3, 33.3, 33.4]) == [33, 33, 34]
+    assert sum(split_cents(999, [33.3, 33.3, 33.4])) == 999
+    assert apply_rate(1000, 0.05 / 12) == 4
+    assert format_money(1234) == '$12.34'
+    assert format_money(-5) == '-$0.05'
+
+
+def test_migration_converts_legacy_dollars_to_cents(tmp_path, monkeypatch):
+    path = str(tmp_path / 'legacy.db')
+    monkeypatch.setattr(models, 'DATABASE_PATH', path)
+    db = sqlite3.connect(path)
+    db.executescript(LEGACY_SCHEMA)
+    db.execute("INSERT INTO users (username) VALUES ('sam')")
+    db.execute("INSERT INTO accounts (user_id, account_type, balance) VALUES (1, 'checking', 12.34)")
+    db.execute("INSERT INTO transactions (to_account_id, amount, transaction_type) VALUES (1, 0.1, 'deposit')")
+    db.execute("INSERT INTO allowance_config (user_id, amount) VALUES (1, 5.0)")
+    db.execute("INSERT INTO balance_snapshots VALUES (1, '2025-01-01', 12.34)")
+    db.commit()
+    db.close()
+
+    models.run_migrations()
+
+    db = models.get_db()
+    assert db.execute('SELECT balance FROM accounts').fetchone()[0] == 1234
+    assert db.execute('SELECT amount FROM transactions').fetchone()[0] == 10
+    assert db.execute('SELECT amount FROM allowance_config').fetchone()[0] == 500
+    assert db.execute('SELECT balance FROM balance_snapshots').fetchone()[0] == 1234
+    assert db.execute('SELECT 1 FROM schema_migrations WHERE version = 7').fetchone() is not None
+    db.close()
+
+
+def test_oversized_amounts_are_rejected_with_400(parent):
+    client, accounts = parent, parent.accounts
+    config_id = client.get('/api/admin/allowances').get_json()[0]['id']
+
+    for amount in (1e20, 1e30):
+        requests = (
+            ('/api/transactions/deposit', {'to_account_id': accounts['checking'], 'amount': amount}),
+            ('/api/transactions/withdraw', {'from_account_id': accounts['checking'], 'amount': amount}),
+            ('/api/transactions/transfer', {'from_account_id': accounts['checking'],
+                                            'to_account_id': accounts['savings'], 'amount': amount}),
+            ('/api/transactions/batch', {'deposits': [{'to_account_id': accounts['checking'], 'amount': amount}]}),
+        )
+        for url, body in requests:
+            assert client.post(url, json=body).status_code == 400, url
+        assert client.put(f'/api/admin/allowances/{config_id}', json={'amount': amount}).status_code == 400
+
+
+def test_money_settings_are_validated_and_read_safely(parent, kid):
+    key = 'max_withdrawal_without_approval'
+    for bad in ('abc', -1, 1e30):
+        assert parent.put('/api/admin/settings', json={key: bad}).status_code == 400
+    assert parent.put('/api/admin/settings', json={key: '0.005'}).status_code == 200
+    assert parent.get('/api/admin/settings').get_json()[key] == '0.01'
+
+    # A malformed value already in the table doesn't break withdrawals
+    db = models.get_db()
+    db.execute("UPDATE settings SET value = 'abc' WHERE key = ?", (key,))
+    db.commit()
+    db.close()
+    parent.post('/api/transactions/deposit', json={'to_account_id': kid.accounts['checking'], 'amount': 5})
+    response = kid.post('/api/transactions/withdraw', json={'from_account_id': kid.accounts['checking'], 'amount': 1})
+    assert response.status_code == 200
@@ -0,0 +1,57 @@
+"""Tests for the per-request principal carried in the session."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.cache import users_version
+
+
+def users_reads(statements):
+    return [s for s in statements if 'FROM users WHERE id' in s]
+
+
+def login(client, username, password):
+    assert client.post('/api/auth/login', json={'username': username, 'password': password}).status_code == 200
+
+
+def test_role_checks_do_not_reread_users(parent, statements):
+    checking = parent.accounts['checking']
+
+    statements.clear()
+    parent.get('/api/accounts')
+    parent.get('/api/transactions/pending')
+    parent.get(f'/api/accounts/{checking}/transactions')
+    parent.post('/api/transactions/deposit', json={'to_account_id': checking, 'amount': 5})
+
+    assert users_reads(statements) == []
+
+
+def test_deleted_user_is_signed_out(app):
+    admin, other = app.test_client(), app.test_client()
+    login(admin, 'admin', 'changeme')
+    user_id = admin.post('/api/admin/users', json={
+        'username': 'dad', 'display_name': 'Dad', 'password': 'dad123', 'role': 'parent'
+    }).get_json()['user_id']
+    login(other, 'dad', 'dad123')
+    assert other.get('/api/admin/users').status_code == 200
+
+    assert admin.delete(f'/api/admin/users/{user_id}').status_code == 200
+
+    assert other.get('/api/admin/users').status_code == 401
+
+
+def test_role_change_is_picked_up_after_invalidation(kid):
+    assert kid.get('/api/admin/users').status_code == 403
+
+    # Promote the kid from another process; this worker notices once its
+    # cached counter expires (forced here instead of waiting for the TTL)
+    db = models.get_db()
+    db.execute("UPDATE users SET role = 'parent' WHERE id = ?", (kid.user_id,))
+    db.commit()
+    db.close()
+    users_version.invalidate()
+
+    assert kid.get('/api/admin/users').status_code == 200
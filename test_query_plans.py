@@ -0,0 +1,174 @@
+"""EXPLAIN QUERY PLAN regression tests for the transaction ledger queries.
+
+Every statement the hot read endpoints send to SQLite is captured and
+explained; none of them may fall back to a full scan of `transactions` or
+(for kid views) of `accounts`. Walking a full index in order still counts
+as a full scan; only partial indexes (like the pending queue) may be scanned.
+"""
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import main, models
+
+TABLE_SCAN = re.compile(r'\bSCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?')
+
+
+def login(client, username, password):
+    response = client.post('/api/auth/login', json={'username': username, 'password': password})
+    assert response.status_code == 200
+
+
+def seed_family(client):
+    """Create a kid with a little history, leaving the parent logged in."""
+    login(client, 'admin', 'changeme')
+    client.post('/api/admin/users', json={
+        'username': 'sam', 'display_name': 'Sam', 'password': 'sam123', 'role': 'kid'
+    })
+    accounts = client.get('/api/accounts').get_json()
+    checking = next(a for a in accounts if a['owner_username'] == 'sam' and a['account_type'] == 'checking')
+    savings = next(a for a in accounts if a['owner_username'] == 'sam' and a['account_type'] == 'savings')
+    for amount in (10, 20, 30):
+        client.post('/api/transactions/deposit', json={'to_account_id': checking['id'], 'amount': amount})
+    client.post('/api/transactions/transfer', json={
+        'from_account_id': checking['id'], 'to_account_id': savings['id'], 'amount': 5
+    })
+    return checking
+
+
+def explain(statement):
+    db = models.get_db()
+    try:
+        rows = db.execute(f'EXPLAIN QUERY PLAN {statement}').fetchall()
+    finally:
+        db.close()
+    return [row['detail'] for row in rows]
+
+
+def partial_indexes():
+    db = models.get_db()
+    try:
+        rows = db.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall()
+    finally:
+        db.close()
+    return {row['name'] for row in rows if ' WHERE ' in row['sql'].upper()}
+
+
+def assert_no_full_scans(statements, tables):
+    reads = [s for s in statements if s.lstrip().upper().startswith(('SELECT', 'WITH'))]
+    assert reads, 'no statements were captured'
+    allowed_indexes = partial_indexes()
+    for statement in reads:
+        aliases = set(tables)
+        for table in tables:
+            aliases.update(re.findall(rf'\b{table}\s+(?:AS\s+)?(\w+)', statement, re.IGNORECASE))
+        for detail in explain(statement):
+            match = TABLE_SCAN.search(detail)
+            if match and match.group(1) in aliases:
+                assert match.group(2) in allowed_indexes, f'full scan in plan {detail!r} for:\n{statement}'
+
+
+def test_account_history_uses_indexes(client, statements):
+    checking = seed_family(client)
+    statements.clear()
+
+    response = client.get(f"/api/accounts/{checking['id']}/transactions?limit=2")
+    assert response.status_code == 200
+    assert len(response.get_json()['transactions']) == 2
+
+    assert_no_full_scans(statements, ['transactions'])
+
+
+def test_account_history_cursor_pages_use_indexes(client, statements):
+    checking = seed_family(client)
+    statements.clear()
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/api/accounts/{checking['id']}/transactions?limit=3"
+        if cursor:
+            url += f'&cursor={cursor}'
+        page = client.get(url).get_json()
+        seen.extend(t['id'] for t in page['transactions'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    # Three deposits and one transfer, newest first, each exactly once
+    assert len(seen) == 4
+    assert seen == sorted(seen, reverse=True)
+    assert_no_full_scans(statements, ['transactions'])
+
+    assert client.get(f"/api/accounts/{checking['id']}/transactions?cursor=bogus").status_code == 400
+
+
+def test_pending_queue_uses_partial_index(client, statements):
+    checking = seed_family(client)
+    client.post('/api/auth/logout')
+    login(client, 'sam', 'sam123')
+    client.post('/api/transactions/withdraw', json={'from_account_id': checking['id'], 'amount': 3})
+    client.post('/api/auth/logout')
+    login(client, 'admin', 'changeme')
+    statements.clear()
+
+    pending = client.get('/api/transactions/pending').get_json()
+    assert len(pending) == 1
+    client.get('/api/dashboard')
+
+    assert_no_full_scans(statements, ['transactions'])
+
+
+def test_kid_dashboard_uses_indexes(client, statements):
+    seed_family(client)
+    client.post('/api/auth/logout')
+    login(client, 'sam', 'sam123')
+    statements.clear()
+
+    dashboard = client.get('/api/dashboard').get_json()
+    # Three deposits plus the transfer, which is listed once
+    assert len(dashboard['recent_transactions']) == 4
+
+    assert_no_full_scans(statements, ['transactions', 'accounts'])
+
+
+def test_parent_dashboard_query_count_does_not_grow_with_kids(client, statements):
+    seed_family(client)
+    statements.clear()
+    client.get('/api/dashboard')
+    one_kid = len(statements)
+
+    for name in ('alex', 'jo', 'kim'):
+        client.post('/api/admin/users', json={
+            'username': name, 'display_name': name.title(), 'password': 'pass1', 'role': 'kid'
+        })
+    statements.clear()
+    dashboard = client.get('/api/dashboard').get_json()
+
+    assert len(statements) == one_kid
+    assert len(dashboard['kids']) == 4
+    sam = next(k for k in dashboard['kids'] if k['user']['username'] == 'sam')
+    assert sam['total_balance'] == 60
+    assert sam['last_activity'] is not None
+    assert 'password_hash' not in sam['user']
+
+
+def test_statement_export_streams_in_index_order(client, statements, monkeypatch):
+    # The export opens its own connection through main's get_db
+    monkeypatch.setattr(main, 'get_db', models.get_db)
+    checking = seed_family(client)
+    statements.clear()
+
+    for query in (f"format=ndjson&account_id={checking['id']}", 'format=csv&start=2000-01-01&end=2999-12-31'):
+        response = client.get(f'/api/export?{query}')
+        assert response.status_code == 200
+        assert response.get_data(as_text=True)
+
+    assert_no_full_scans(statements, ['transactions'])
+    # Nothing is sorted before the first row streams
+    for statement in statements:
+        if statement.lstrip().upper().startswith('SELECT'):
+            assert not any('TEMP B-TREE' in detail for detail in explain(statement)), statement
@@ -3,10 +3,12 @@
 
 import os
 import sys
-sys.path.insert(0, '/sessions/busy-hopeful-edison/mnt/FamilyBank')
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-os.environ['DATABASE_PATH'] = '/sessions/busy-hopeful-edison/test_savings_splits.db'
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'test_savings_splits.db')
 
+from app import models
 from app.models import get_db, init_db, run_migrations
 from datetime import date, timedelta
 
@@ -18,6 +20,7 @@ def print_section(title):
 def test_savings_splits():
     """Test allowance splits including savings accounts."""
     # Initialize database
+    models.DATABASE_PATH = os.environ['DATABASE_PATH']
     init_db()
     run_migrations()
 
@@ -36,20 +39,20 @@ def test_savings_splits():
     # Create checking accounts
     db.execute(
         'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-        (kid_id, 'checking', 'Spend', 1, 0.00)
+        (kid_id, 'checking', 'Spend', 1, 0)
     )
     spend_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
 
     db.execute(
         'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-        (kid_id, 'checking', 'Donate', 0, 0.00)
+        (kid_id, 'checking', 'Donate', 0, 0)
     )
     donate_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
 
     # Create savings account
     db.execute(
         'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
-        (kid_id, 'savings', 'Savings', 1, 0.00)
+        (kid_id, 'savings', 'Savings', 1, 0)
     )
     savings_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
 
@@ -60,11 +63,11 @@ def test_savings_splits():
 
     print_section("Setup: Create allowance config with splits")
 
-    # Create allowance config
+    # Create allowance config (amounts are stored in cents)
     next_monday = date.today()
     db.execute(
         'INSERT INTO allowance_config (user_id, amount, frequency, next_payment_date, active) VALUES (?, ?, ?, ?, ?)',
-        (kid_id, 10.00, 'weekly', next_monday.isoformat(), 1)
+        (kid_id, 1000, 'weekly', next_monday.isoformat(), 1)
     )
     config_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
 
@@ -102,22 +105,22 @@ def test_savings_splits():
         (kid_id,)
     ).fetchall()
 
-    total = 0.0
+    total = 0
     for acc in accounts:
-        print(f"   - {acc['nickname']:15s} ({acc['account_type']:8s}): ${acc['balance']:.2f}")
+        print(f"   - {acc['nickname']:15s} ({acc['account_type']:8s}): ${acc['balance'] / 100:.2f}")
         total += acc['balance']
 
-    print(f"   {'Total':>15s}            : ${total:.2f}")
+    print(f"   {'Total':>15s}            : ${total / 100:.2f}")
 
     # Verify expected amounts
     spend_balance = db.execute('SELECT balance FROM accounts WHERE id = ?', (spend_id,)).fetchone()[0]
     savings_balance = db.execute('SELECT balance FROM accounts WHERE id = ?', (savings_id,)).fetchone()[0]
     donate_balance = db.execute('SELECT balance FROM accounts WHERE id = ?', (donate_id,)).fetchone()[0]
 
-    assert abs(spend_balance - 5.00) < 0.01, f"Expected $5.00 in Spend, got ${spend_balance}"
-    assert abs(savings_balance - 3.00) < 0.01, f"Expected $3.00 in Savings, got ${savings_balance}"
-    assert abs(donate_balance - 2.00) < 0.01, f"Expected $2.00 in Donate, got ${donate_balance}"
-    assert abs(total - 10.00) < 0.01, f"Expected total $10.00, got ${total}"
+    assert spend_balance == 500, f"Expected 500 cents in Spend, got {spend_balance}"
+    assert savings_balance == 300, f"Expected 300 cents in Savings, got {savings_balance}"
+    assert donate_balance == 200, f"Expected 200 cents in Donate, got {donate_balance}"
+    assert total == 1000, f"Expected total 1000 cents, got {total}"
 
     print("\n✅ All balance checks passed!")
 
@@ -133,7 +136,7 @@ def test_savings_splits():
 
     print(f"Created {len(transactions)} transaction(s):")
     for txn in transactions:
-        print(f"   - ${txn['amount']:.2f} → {txn['nickname']} ({txn['account_type']}) | {txn['description']}")
+        print(f"   - ${txn['amount'] / 100:.2f} → {txn['nickname']} ({txn['account_type']}) | {txn['description']}")
 
     assert len(transactions) == 3, f"Expected 3 transactions, got {len(transactions)}"
 
@@ -0,0 +1,107 @@
+"""Tests for the standalone scheduler: leader lease, due times and run history."""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, scheduler
+
+
+def add_allowance(db, next_payment_date):
+    db.execute(
+        'INSERT INTO users (username, display_name, password_hash, role) VALUES (?, ?, ?, ?)',
+        ('kid', 'Kid', 'x', 'kid')
+    )
+    kid_id = db.execute('SELECT last_insert_rowid()').fetchone()[0]
+    db.execute(
+        'INSERT INTO accounts (user_id, account_type, nickname, is_default, balance) VALUES (?, ?, ?, ?, ?)',
+        (kid_id, 'checking', 'Main', 1, 0)
+    )
+    db.execute('''
+        INSERT INTO allowance_config (user_id, amount, frequency, next_payment_date, day_of_week, active)
+        VALUES (?, 500, 'weekly', ?, ?, 1)
+    ''', (kid_id, next_payment_date.isoformat(), next_payment_date.weekday()))
+    db.commit()
+
+
+def test_only_one_holder_gets_the_lease(db):
+    now = time.time()
+    assert scheduler.acquire_lease(db, 'a', now=now)
+    assert not scheduler.acquire_lease(db, 'b', now=now + 1)
+    assert scheduler.acquire_lease(db, 'a', now=now + 2)
+
+    # A standby takes over once the leader stops renewing
+    assert scheduler.acquire_lease(db, 'b', now=now + 2 + scheduler.LEASE_SECONDS + 1)
+    assert not scheduler.acquire_lease(db, 'a', now=now + 2 + scheduler.LEASE_SECONDS + 2)
+
+    scheduler.release_lease(db, 'b')
+    assert scheduler.acquire_lease(db, 'a', now=now + 2 + scheduler.LEASE_SECONDS + 3)
+
+
+def test_sleeps_until_the_next_allowance_is_due(db):
+    tomorrow = date.today() + timedelta(days=1)
+    add_allowance(db, tomorrow)
+    now = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=23, minutes=30)
+
+    assert scheduler.seconds_until_next_run(db, now) == 30 * 60
+
+
+def test_runs_are_recorded_with_durations(db):
+    add_allowance(db, date.today())
+
+    runs = scheduler.run_once(holder='test')
+
+    assert [(name, status) for name, status, _, _ in runs] == [('allowances', 'ok'), ('interest', 'ok')]
+    history = db.execute('SELECT job_name, holder, status, result, duration_ms FROM job_runs ORDER BY id').fetchall()
+    assert [(r['job_name'], r['holder'], r['status'], r['result']) for r in history] == [
+        ('allowances', 'test', 'ok', 1), ('interest', 'test', 'ok', 0)
+    ]
+    assert all(r['duration_ms'] >= 0 for r in history)
+    # The lease is handed back after a one-shot run
+    assert db.execute('SELECT COUNT(*) FROM scheduler_lease').fetchone()[0] == 0
+    assert scheduler.seconds_until_next_run(db) > 0
+
+
+def test_allowance_without_an_account_does_not_keep_the_scheduler_busy(db):
+    add_allowance(db, date.today() - timedelta(weeks=2))
+    db.execute('DELETE FROM accounts')
+    db.commit()
+    assert scheduler.seconds_until_next_run(db) == 0
+
+    scheduler.run_once(holder='test')
+
+    next_date = db.execute('SELECT next_payment_date FROM allowance_config').fetchone()[0]
+    assert next_date > date.today().isoformat()
+    assert scheduler.seconds_until_next_run(db) > 0
+
+
+def test_interest_is_due_one_period_after_the_oldest_application(db):
+    add_allowance(db, date.today() + timedelta(days=30))
+    now = datetime(2025, 3, 11, 5, 30)
+    for last_applied in ('2025-03-10T09:00:00', '2025-03-10T06:00:00'):
+        db.execute('''
+            INSERT INTO interest_config (account_id, annual_rate, compound_frequency, last_applied, active)
+            VALUES (1, 5.0, 'daily', ?, 1)
+        ''', (last_applied,))
+    db.commit()
+
+    assert scheduler.seconds_until_next_run(db, now) == 30 * 60
+
+    db.execute("INSERT INTO interest_config (account_id, annual_rate, compound_frequency, active) VALUES (1, 5.0, 'monthly', 1)")
+    db.commit()
+    assert scheduler.seconds_until_next_run(db, now) == 0
+
+
+def test_allowance_of_a_deleted_user_is_never_due(db):
+    # Left behind from before foreign keys were enforced
+    db.execute('PRAGMA foreign_keys = OFF')
+    db.execute('''
+        INSERT INTO allowance_config (user_id, amount, frequency, next_payment_date, active)
+        VALUES (999, 500, 'weekly', ?, 1)
+    ''', ((date.today() - timedelta(days=3)).isoformat(),))
+    db.commit()
+
+    assert scheduler.seconds_until_next_run(db) == scheduler.MAX_SLEEP
@@ -0,0 +1,44 @@
+"""Tests for the versioned settings and categories caches."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+
+
+def test_settings_update_is_visible_immediately(parent):
+    assert parent.get('/api/admin/settings').get_json()['bank_name'] == 'Family Bank'
+    parent.put('/api/admin/settings', json={'bank_name': 'Bank of Mom'})
+    assert parent.get('/api/admin/settings').get_json()['bank_name'] == 'Bank of Mom'
+
+
+def test_writes_from_another_process_bump_the_version(parent):
+    parent.get('/api/admin/settings')
+
+    # Simulate another worker writing directly to the database
+    db = models.get_db()
+    db.execute("UPDATE settings SET value = 'Piggy Bank' WHERE key = 'bank_name'")
+    db.commit()
+    db.close()
+
+    assert parent.get('/api/admin/settings').get_json()['bank_name'] == 'Piggy Bank'
+
+
+def test_categories_support_conditional_requests(parent):
+    first = parent.get('/api/categories')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    assert parent.get('/api/categories', headers={'If-None-Match': etag}).status_code == 304
+
+    db = models.get_db()
+    db.execute("INSERT INTO categories (name, icon, color) VALUES ('Pets', '🐶', '#a855f7')")
+    db.commit()
+    db.close()
+
+    changed = parent.get('/api/categories', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert any(c['name'] == 'Pets' for c in changed.get_json())
@@ -0,0 +1,35 @@
+"""Tests for startup phase timing and the pre-fork warmup."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import main, models, startup
+
+
+def test_warm_up_loads_lazy_modules_and_leaves_no_connections(tmp_path, monkeypatch):
+    monkeypatch.setattr(models, 'DATABASE_PATH', str(tmp_path / 'startup.db'))
+    app = main.create_app()
+    assert {'prepare database', 'register routes'} <= set(startup.phases())
+
+    # A request opens the pool; nothing of it may survive into forked workers
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'changeme'})
+    assert models.pool_totals()['size'] > 0
+
+    startup.warm_up(app)
+    assert models.pool_totals() == {'pools': 0, 'size': 0, 'in_use': 0, 'waits': 0}
+    assert all(module in sys.modules for module in startup.LAZY_MODULES)
+    assert client.get('/login').status_code == 200
+
+
+def test_cold_start_report_checks_the_budget(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv('DATABASE_PATH', str(tmp_path / 'cold.db'))
+    monkeypatch.delenv('TENANTS_DIR', raising=False)
+
+    assert startup.main(['--runs', '1', '--budget-ms', '60000']) == 0
+    out = capsys.readouterr().out
+    for phase in ('import flask', 'import app', 'prepare database', 'register routes', 'first request'):
+        assert phase in out
+    assert 'within the 60000ms budget' in out
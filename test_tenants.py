@@ -0,0 +1,90 @@
+"""Tests for one-database-per-family routing."""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import models, scheduler, tenants
+from app.events import ChangeBus
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, make_app):
+    monkeypatch.setattr(models, 'TENANTS_DIR', str(tmp_path / 'families'))
+    monkeypatch.setattr(models, 'DATABASE_PATH', str(tmp_path / 'unused.db'))
+    for family in ('smith', 'jones'):
+        tenants.create_tenant(family)
+    return make_app()
+
+
+def login(app, family, username='admin', password='changeme'):
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'family': family, 'username': username, 'password': password})
+    return client, response.status_code
+
+
+def test_each_family_only_sees_its_own_database(app, tmp_path):
+    smith, status = login(app, 'smith')
+    assert status == 200
+    smith.post('/api/admin/users', json={'username': 'sam', 'display_name': 'Sam', 'password': 'sam123', 'role': 'kid'})
+    jones, _ = login(app, 'jones')
+
+    assert [a['owner_username'] for a in smith.get('/api/accounts').get_json() if a['account_type'] == 'checking'] == ['sam']
+    assert [a for a in jones.get('/api/accounts').get_json() if a['account_type'] == 'checking'] == []
+    assert login(app, 'jones', 'sam', 'sam123')[1] == 401
+    assert login(app, 'smith', 'sam', 'sam123')[1] == 200
+    assert login(app, 'nobody')[1] == 401
+    assert login(app, '../smith')[1] == 401
+    assert tenants.list_tenants() == ['jones', 'smith']
+    assert not (tmp_path / 'unused.db').exists()
+
+
+def test_sessions_without_a_family_are_signed_out(app):
+    for family in (None, 'gone'):
+        # Signed in before TENANTS_DIR was set, or to a family since removed
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update(user_id=1, username='admin', role='parent')
+            if family:
+                session['tenant'] = family
+
+        assert client.get('/api/auth/me').status_code == 401
+        assert client.get('/api/dashboard').status_code == 401
+        assert client.get('/dashboard').status_code == 302
+        with client.session_transaction() as session:
+            assert 'user_id' not in session
+
+
+def test_scheduler_runs_every_family(app):
+    for family in ('smith', 'jones'):
+        client, _ = login(app, family)
+        client.post('/api/admin/users', json={'username': 'kid', 'display_name': 'Kid', 'password': 'kid123', 'role': 'kid'})
+        with tenants.use_tenant(family):
+            db = models.get_db()
+            db.execute('UPDATE allowance_config SET amount = 500, active = 1, next_payment_date = ?',
+                       (date.today().isoformat(),))
+            db.commit()
+            db.close()
+
+    runs = scheduler.run_once()
+
+    assert [(name, status, result) for name, status, result, _ in runs].count(('allowances', 'ok', 1)) == 2
+    for family in ('smith', 'jones'):
+        client, _ = login(app, family)
+        checking = next(a for a in client.get('/api/accounts').get_json() if a['account_type'] == 'checking')
+        assert checking['balance'] == 5.0
+
+
+def test_events_stay_within_a_family():
+    bus = ChangeBus(max_streams=2)
+    smith_parent = bus.subscribe(1, 'parent', scope='smith')
+    jones_parent = bus.subscribe(1, 'parent', scope='jones')
+
+    bus.publish('pending', {'count': 1}, parents=True, scope='smith')
+
+    assert smith_parent.queue.qsize() == 1
+    assert jones_parent.queue.qsize() == 0